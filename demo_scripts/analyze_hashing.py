@@ -69,7 +69,7 @@ design_names = []
 dataset_names = []
 n_modules = []
 for design in test_dataset.index:
-    num_modules_fp = test_dataset.designs_dir / design["design_name"] / "flows" / "module_count" / "num_modules.txt"
+    num_modules_fp = test_dataset.design_dir(design["design_name"]) / "flows" / "module_count" / "num_modules.txt"
     n_modules.append(int(num_modules_fp.read_text().strip()))
     source_files = test_dataset.get_design_source_files(design["design_name"])
     for fp in source_files:
@@ -3,7 +3,6 @@ from pathlib import Path
 from dotenv import dotenv_values
 
 from digital_design_dataset.data_sources.data_retrievers import (
-    DataRetriever,
     EPFLDatasetRetriever,
     HW2VecDatasetRetriever,
     ISCAS85DatasetRetriever,
@@ -27,6 +26,7 @@ from digital_design_dataset.data_sources.data_retrievers import (
 from digital_design_dataset.data_sources.hls_data import (
     PolybenchRetriever
 )
+from digital_design_dataset.data_sources.orchestrator import RetrieverOrchestrator
 from digital_design_dataset.design_dataset import (
     DesignDataset,
 )
@@ -39,10 +39,13 @@ if "GITHUB_TOKEN" in env_config:
     gh_token = env_config["GITHUB_TOKEN"]
 
 test_db_dir = DIR_CURRENT / "test_dataset_v2"
+# rerunning after an interruption resumes the build, designs that are already
+# complete are skipped, delete test_db_dir to start from scratch
 d = DesignDataset(
     test_db_dir,
-    overwrite=True,
+    overwrite=False,
     gh_token=gh_token,
+    cache_dir=DIR_CURRENT / "download_cache",
 )
 
 retrivers = [    EPFLDatasetRetriever,
@@ -67,7 +70,8 @@ retrivers = [    EPFLDatasetRetriever,
     PolybenchRetriever,
 ]
 
-for retriver_cls in retrivers:
-    print(f"Retrieving dataset: {retriver_cls.__name__}")
-    retriver: DataRetriever = retriver_cls(d)
-    retriver.get_dataset()
\ No newline at end of file
+orchestrator = RetrieverOrchestrator(d, retrivers)
+report = orchestrator.run()
+print(report)
+print(f"git mirror cache: {d.git_mirror_cache.stats}")
+print(f"http download cache: {d.download_cache.stats}")
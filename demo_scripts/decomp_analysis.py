@@ -52,7 +52,7 @@ opencores_designs = test_dataset.get_design_metadata_by_dataset_name("opencores"
 
 def process_design(design: dict):
     design_name = design["design_name"]
-    design_dir = test_dataset.designs_dir / design_name
+    design_dir = test_dataset.design_dir(design_name)
 
     data = {}
     data["design_name"] = design_name
@@ -0,0 +1,27 @@
+import argparse
+import json
+from pathlib import Path
+
+from digital_design_dataset.data_sources.github_repos import GithubReposDatasetRetriever
+from digital_design_dataset.data_sources.github_scraper import index_all_verilog_repos
+from digital_design_dataset.design_dataset import DesignDataset
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index all Verilog and SystemVerilog repos on GitHub")
+    parser.add_argument("-d", "--database", type=Path, required=True, help="Directory to keep the index in")
+    parser.add_argument("-t", "--gh-token", default=None, help="GitHub token, raises the rate limit")
+    parser.add_argument("--refresh", action="store_true", help="Revalidate pages that are already indexed")
+    parser.add_argument("--fetch", type=Path, default=None, help="Fetch the indexed repos into this design dataset")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="Number of repos to fetch at the same time")
+    args = parser.parse_args()
+
+    repos = index_all_verilog_repos(args.database, gh_token=args.gh_token, refresh=args.refresh)
+    repos_fp = args.database / "github" / "repos.json"
+    repos_fp.write_text(json.dumps(sorted(repos, key=lambda repo: repo["id"]), indent=4))
+    print(f"Wrote {len(repos)} repos to {repos_fp}")  # noqa: T201
+
+    if args.fetch is not None:
+        d = DesignDataset(args.fetch, gh_token=args.gh_token)
+        retriever = GithubReposDatasetRetriever(d, repos, n_workers=args.jobs)
+        retriever.get_dataset()
+        print(f"Fetched {retriever.fetch_stats}")  # noqa: T201
@@ -0,0 +1,16 @@
+import argparse
+from pathlib import Path
+
+from digital_design_dataset.design_dataset import DesignDataset
+from digital_design_dataset.design_layout import DESIGN_LAYOUTS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the designs of a dataset into a different directory layout")
+    parser.add_argument("-d", "--dataset", type=Path, required=True, help="Path to the dataset directory")
+    parser.add_argument("-l", "--layout", choices=DESIGN_LAYOUTS, default="fanout", help="Layout to migrate to")
+    args = parser.parse_args()
+
+    dataset = DesignDataset(args.dataset)
+    print(f"Migrating {args.dataset} from the {dataset.layout} layout to the {args.layout} layout")  # noqa: T201
+    dataset.migrate_layout(args.layout)
+    dataset.print_summary()
@@ -0,0 +1,142 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import stat
+import threading
+from pathlib import Path
+
+# linux ioctl to clone (reflink) a whole file, see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(fp: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with fp.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def try_reflink(src: Path, dst: Path) -> bool:
+    try:
+        with src.open("rb") as f_src, dst.open("wb") as f_dst:
+            fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def break_link(fp: Path) -> None:
+    """Replace a hardlinked file with a private, writable copy of itself, so
+    it can be edited in place without changing the other designs sharing
+    its blob.
+    """
+    st = fp.stat()
+    if st.st_nlink == 1 and st.st_mode & stat.S_IWUSR:
+        return
+    tmp_fp = fp.with_name(f".{fp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.copyfile(fp, tmp_fp)
+    tmp_fp.replace(fp)
+
+
+class BlobStore:
+    """Content-addressed store for files that are shared between designs.
+
+    Blobs are keyed by the SHA-256 of their content and placed into design
+    directories as reflinks (copy-on-write clones) when the filesystem
+    supports it, or as hardlinks otherwise. A hardlinked file is the same
+    inode in every design that uses it. Blobs are stored read-only, but that
+    does not stop root, so a design file must never be rewritten in place:
+    unlink it first, as `DesignDataset.write_design_file` does, or call
+    `break_link` before editing it.
+    """
+
+    def __init__(self, root: Path, link_mode: str = "auto") -> None:
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"link_mode must be one of {LINK_MODES}, got {link_mode}")
+        self.root = root
+        self.link_mode = link_mode
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def has(self, digest: str) -> bool:
+        return self.blob_path(digest).exists()
+
+    def _commit_tmp(self, tmp_fp: Path, digest: str) -> None:
+        blob_fp = self.blob_path(digest)
+        blob_fp.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fp.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        # atomic, if another process stored the same blob first this is a no-op
+        tmp_fp.replace(blob_fp)
+
+    def _tmp_path(self) -> Path:
+        return self.root / f".tmp.{os.getpid()}.{threading.get_ident()}"
+
+    def put_bytes(self, data: bytes) -> str:
+        digest = hash_bytes(data)
+        if not self.has(digest):
+            tmp_fp = self._tmp_path()
+            tmp_fp.write_bytes(data)
+            self._commit_tmp(tmp_fp, digest)
+        return digest
+
+    def put_file(self, src: Path) -> str:
+        digest = hash_file(src)
+        if not self.has(digest):
+            tmp_fp = self._tmp_path()
+            shutil.copyfile(src, tmp_fp)
+            self._commit_tmp(tmp_fp, digest)
+        return digest
+
+    def link(self, digest: str, dst: Path) -> str:
+        """Place the blob `digest` at `dst`, returning the link mode that was used."""
+        blob_fp = self.blob_path(digest)
+        if not blob_fp.exists():
+            raise FileNotFoundError(f"Blob {digest} not found in store {self.root}")
+        dst.unlink(missing_ok=True)
+
+        if self.link_mode in {"auto", "reflink"} and try_reflink(blob_fp, dst):
+            return "reflink"
+        if self.link_mode in {"auto", "hardlink"}:
+            try:
+                os.link(blob_fp, dst)
+            except OSError:
+                # cross-device or too many links, fall back to a plain copy
+                pass
+            else:
+                return "hardlink"
+        shutil.copyfile(blob_fp, dst)
+        return "copy"
+
+    def add_bytes(self, data: bytes, dst: Path) -> str:
+        digest = self.put_bytes(data)
+        self.link(digest, dst)
+        return digest
+
+    def add_file(self, src: Path, dst: Path) -> str:
+        digest = self.put_file(src)
+        self.link(digest, dst)
+        return digest
+
+    def gc(self) -> int:
+        """Remove blobs that are no longer hardlinked into any design.
+
+        Reflinked copies do not hold a reference to the blob, so their blobs
+        are also removed; the copies themselves are unaffected.
+        """
+        n_removed = 0
+        for blob_fp in self.root.glob("??/*"):
+            if blob_fp.stat().st_nlink == 1:
+                blob_fp.unlink()
+                n_removed += 1
+        return n_removed
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from digital_design_dataset.metadata_loader import DEFAULT_N_THREADS
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+    from digital_design_dataset.design_dataset import DesignDataset
+
+PARQUET_MANIFEST_FILENAME = "manifest.json"
+PARQUET_MANIFEST_VERSION = 1
+
+DEFAULT_ROW_GROUP_BYTES = 64 << 20
+DEFAULT_MAX_PARQUET_SHARD_BYTES = 1 << 30
+
+
+def import_pyarrow() -> tuple:
+    try:
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is needed for the Parquet export, install it with `pip install digital-design-dataset[parquet]`",
+        ) from e
+    return pa, pq
+
+
+def parquet_schema() -> "pa.Schema":
+    pa, _ = import_pyarrow()
+    return pa.schema([
+        ("design_name", pa.string()),
+        ("dataset_name", pa.string()),
+        ("dataset_tags", pa.list_(pa.string())),
+        ("file_name", pa.string()),
+        ("size", pa.int64()),
+        ("content", pa.binary()),
+    ])
+
+
+def design_fingerprint(metadata: dict, source_fps: list[Path], stats: list[os.stat_result]) -> str:
+    # cheap change detection from the metadata and the stat of each source
+    # file, so unchanged designs can be skipped without reading them
+    h = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode())
+    for fp, st in zip(source_fps, stats, strict=True):
+        h.update(f"\0{fp.name}\0{st.st_size}\0{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+@dataclass
+class DesignRows:
+    metadata: dict
+    fingerprint: str
+    # None if the design is unchanged since the last export
+    files: list[tuple[str, bytes]] | None
+
+    @property
+    def n_bytes(self) -> int:
+        return sum(len(content) for _, content in self.files or [])
+
+
+@dataclass
+class ParquetExportStats:
+    n_designs_written: int = 0
+    n_designs_unchanged: int = 0
+    n_designs_removed: int = 0
+    n_files: int = 0
+    n_bytes: int = 0
+    elapsed_time: float = 0.0
+    shards_written: list[Path] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.n_designs_written} designs written ({self.n_files} files, {self.n_bytes} bytes) "
+            f"to {len(self.shards_written)} shards, {self.n_designs_unchanged} unchanged, "
+            f"{self.n_designs_removed} removed, in {self.elapsed_time:.3f}s"
+        )
+
+
+class ParquetManifest:
+    """Tracks which shard holds the live copy of each design.
+
+    Incremental exports only append shards, so an older shard can still
+    contain rows for a design that has since been re-exported or removed; the
+    manifest is the source of truth for which rows are current.
+    """
+
+    def __init__(self, out_dir: Path) -> None:
+        self.fp = out_dir / PARQUET_MANIFEST_FILENAME
+        self.generation = 0
+        self.designs: dict[str, dict] = {}
+        if self.fp.exists():
+            data = json.loads(self.fp.read_text())
+            if data.get("version") != PARQUET_MANIFEST_VERSION:
+                raise ValueError(f"Unsupported Parquet manifest version in {self.fp}")
+            self.generation = data["generation"]
+            self.designs = data["designs"]
+
+    @property
+    def shards(self) -> set[str]:
+        return {entry["shard"] for entry in self.designs.values()}
+
+    def save(self) -> None:
+        data = {
+            "version": PARQUET_MANIFEST_VERSION,
+            "generation": self.generation,
+            "designs": self.designs,
+        }
+        tmp_fp = self.fp.with_name(f".{self.fp.name}.{os.getpid()}.tmp")
+        tmp_fp.write_text(json.dumps(data, separators=(",", ":")))
+        tmp_fp.replace(self.fp)
+
+
+class ParquetExporter:
+    """Streams the sources of every design into Parquet shards, one row per
+    source file.
+
+    Designs are read from a bounded thread pool and buffered until roughly
+    `row_group_bytes` of file content is pending, which is then written as a
+    single row group, so memory use stays flat regardless of dataset size. A
+    new shard is started once the current one holds more than
+    `max_shard_bytes` of uncompressed file content; the rows of a design never
+    span two shards. The manifest is saved after every shard, so an
+    interrupted export keeps the shards it finished.
+    """
+
+    def __init__(
+        self,
+        design_dataset: "DesignDataset",
+        out_dir: Path,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        max_shard_bytes: int = DEFAULT_MAX_PARQUET_SHARD_BYTES,
+        n_threads: int = DEFAULT_N_THREADS,
+        compression: str = "zstd",
+    ) -> None:
+        if n_threads < 1:
+            raise ValueError("n_threads must be greater than 0")
+        self.design_dataset = design_dataset
+        self.out_dir = out_dir
+        self.row_group_bytes = row_group_bytes
+        self.max_shard_bytes = max_shard_bytes
+        self.n_threads = n_threads
+        self.compression = compression
+
+    def _read_design(self, metadata: dict, known_fingerprint: str | None) -> DesignRows:
+        source_fps = sorted(
+            (fp for fp in self.design_dataset.get_design_source_files(metadata["design_name"]) if fp.is_file()),
+            key=lambda fp: fp.name,
+        )
+        stats = [fp.stat() for fp in source_fps]
+        fingerprint = design_fingerprint(metadata, source_fps, stats)
+        if fingerprint == known_fingerprint:
+            return DesignRows(metadata, fingerprint, None)
+        return DesignRows(metadata, fingerprint, [(fp.name, fp.read_bytes()) for fp in source_fps])
+
+    def _iter_design_rows(self, designs: list[dict], known: dict[str, str]) -> Iterator[DesignRows]:
+        # results are yielded in the order of `designs`, with at most
+        # `n_threads * 4` designs read ahead
+        max_in_flight = self.n_threads * 4
+        in_flight: deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=self.n_threads, thread_name_prefix="parquet_export") as executor:
+            for design in designs:
+                in_flight.append(executor.submit(self._read_design, design, known.get(design["design_name"])))
+                if len(in_flight) >= max_in_flight:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def export(self, incremental: bool = True) -> ParquetExportStats:
+        """Export every design in the dataset.
+
+        With `incremental=True`, designs whose metadata and source files did
+        not change since the last export are skipped and new shards are only
+        written for new or changed designs. Otherwise all previous shards are
+        removed and every design is exported again.
+        """
+        pa, pq = import_pyarrow()
+        schema = parquet_schema()
+        stats = ParquetExportStats()
+        t_start = time.monotonic()
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = ParquetManifest(self.out_dir)
+        if not incremental:
+            for shard_name in manifest.shards:
+                (self.out_dir / shard_name).unlink(missing_ok=True)
+            manifest.designs = {}
+        old_shards = manifest.shards
+        manifest.generation += 1
+
+        designs = self.design_dataset.index
+        known = {name: entry["fingerprint"] for name, entry in manifest.designs.items()}
+
+        columns: dict[str, list] = {name: [] for name in schema.names}
+        buffered_bytes = 0
+        shard_bytes = 0
+        writer = None
+        shard_name = ""
+        shard_designs: dict[str, dict] = {}
+
+        def flush_row_group() -> None:
+            nonlocal buffered_bytes
+            if not columns["design_name"]:
+                return
+            table = pa.Table.from_pydict(columns, schema=schema)
+            writer.write_table(table, row_group_size=table.num_rows)
+            for values in columns.values():
+                values.clear()
+            buffered_bytes = 0
+
+        def close_shard() -> None:
+            nonlocal writer
+            flush_row_group()
+            writer.close()
+            writer = None
+            manifest.designs.update(shard_designs)
+            shard_designs.clear()
+            manifest.save()
+
+        for rows in self._iter_design_rows(designs, known):
+            if rows.files is None:
+                stats.n_designs_unchanged += 1
+                continue
+
+            if writer is not None and shard_bytes >= self.max_shard_bytes:
+                close_shard()
+            if writer is None:
+                shard_bytes = 0
+                shard_name = f"part-{manifest.generation:05d}-{len(stats.shards_written):05d}.parquet"
+                writer = pq.ParquetWriter(self.out_dir / shard_name, schema, compression=self.compression)
+                stats.shards_written.append(self.out_dir / shard_name)
+
+            metadata = rows.metadata
+            for file_name, content in rows.files:
+                columns["design_name"].append(metadata["design_name"])
+                columns["dataset_name"].append(metadata["dataset_name"])
+                columns["dataset_tags"].append(metadata["dataset_tags"])
+                columns["file_name"].append(file_name)
+                columns["size"].append(len(content))
+                columns["content"].append(content)
+            buffered_bytes += rows.n_bytes
+            shard_bytes += rows.n_bytes
+            shard_designs[metadata["design_name"]] = {
+                "fingerprint": rows.fingerprint,
+                "shard": shard_name,
+                "n_files": len(rows.files),
+            }
+            stats.n_designs_written += 1
+            stats.n_files += len(rows.files)
+            stats.n_bytes += rows.n_bytes
+
+            if buffered_bytes >= self.row_group_bytes:
+                flush_row_group()
+
+        if writer is not None:
+            close_shard()
+
+        live_design_names = {design["design_name"] for design in designs}
+        for design_name in list(manifest.designs):
+            if design_name not in live_design_names:
+                del manifest.designs[design_name]
+                stats.n_designs_removed += 1
+        manifest.save()
+
+        # shards whose designs were all re-exported or removed are dead
+        for dead_shard in old_shards - manifest.shards:
+            (self.out_dir / dead_shard).unlink(missing_ok=True)
+
+        stats.elapsed_time = time.monotonic() - t_start
+        return stats
+
+
+def read_parquet_export(out_dir: Path, columns: list[str] | None = None) -> "pa.Table":
+    """Read the current snapshot of a Parquet export, skipping stale rows
+    left behind in older shards by incremental exports.
+    """
+    pa, pq = import_pyarrow()
+    import pyarrow.compute as pc  # noqa: PLC0415
+
+    manifest = ParquetManifest(out_dir)
+    shard_to_designs: dict[str, list[str]] = {}
+    for design_name, entry in manifest.designs.items():
+        shard_to_designs.setdefault(entry["shard"], []).append(design_name)
+
+    read_columns = columns
+    if read_columns is not None and "design_name" not in read_columns:
+        read_columns = [*read_columns, "design_name"]
+
+    tables = []
+    for shard_name in sorted(shard_to_designs):
+        table = pq.read_table(out_dir / shard_name, columns=read_columns)
+        mask = pc.is_in(table["design_name"], value_set=pa.array(shard_to_designs[shard_name]))
+        tables.append(table.filter(mask))
+    if not tables:
+        return parquet_schema().empty_table() if columns is None else parquet_schema().empty_table().select(columns)
+    table = pa.concat_tables(tables)
+    if columns is not None:
+        table = table.select(columns)
+    return table
@@ -0,0 +1,213 @@
+from collections.abc import Iterator
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import TextIO
+
+# initial values of a `.latch <input> <output> <init>` without a type and
+# control signal
+LATCH_INIT_VALUES = {"0", "1", "2", "3"}
+CONSTANT_COVERS = {"0", "1", "-"}
+
+
+@dataclass
+class BlifFixes:
+    # constant `.names` moved to the end of their model
+    n_constants_moved: int = 0
+    # `.names` with a "-" cover, which drive nothing
+    n_constants_dropped: int = 0
+    n_duplicate_models_removed: int = 0
+    n_exdc_sections_removed: int = 0
+    # latches without a control signal, connected to a new global "clk" input
+    n_latches_clocked: int = 0
+    n_ends_added: int = 0
+
+    @property
+    def fired(self) -> list[str]:
+        return [f.name.removeprefix("n_") for f in fields(self) if getattr(self, f.name) > 0]
+
+
+def iter_blif_commands(f: TextIO) -> Iterator[tuple[list[str], list[str]]]:
+    # yields the raw lines of every logical line, lines ending in "\" are
+    # continued on the next one, together with its tokens without comments
+    raw_lines: list[str] = []
+    for line in f:
+        raw_lines.append(line.rstrip("\r\n"))
+        if raw_lines[-1].endswith("\\"):
+            continue
+        text = " ".join(raw.removesuffix("\\") for raw in raw_lines)
+        yield raw_lines, text.split("#", 1)[0].split()
+        raw_lines = []
+    if raw_lines:
+        text = " ".join(raw.removesuffix("\\") for raw in raw_lines)
+        yield raw_lines, text.split("#", 1)[0].split()
+
+
+def is_implicit_latch(tokens: list[str]) -> bool:
+    return len(tokens) == 4 and tokens[0] == ".latch" and tokens[3] in LATCH_INIT_VALUES  # noqa: PLR2004
+
+
+def find_models_with_implicit_latches(fp: Path) -> set[str | None]:
+    # model names, None for statements before the first `.model`
+    models: set[str | None] = set()
+    seen_models: set[str] = set()
+    model_name = None
+    skip = False
+    with fp.open() as f:
+        for _, tokens in iter_blif_commands(f):
+            if not tokens:
+                continue
+            if tokens[0] == ".model":
+                model_name = tokens[1] if len(tokens) > 1 else ""
+                skip = model_name in seen_models
+                seen_models.add(model_name)
+            elif tokens[0] == ".exdc":
+                skip = True
+            elif tokens[0] == ".end":
+                model_name = None
+                skip = False
+            elif not skip and is_implicit_latch(tokens):
+                models.add(model_name)
+    return models
+
+
+class BlifNormalizer:
+    def __init__(self, out: TextIO, clocked_models: set[str | None]) -> None:
+        self.out = out
+        self.clocked_models = clocked_models
+        self.fixes = BlifFixes()
+        self.seen_models: set[str] = set()
+        self.in_model = False
+        self.clock_pending = False
+        # "model" while dropping a duplicate model, "exdc" while dropping an
+        # external don't care section
+        self.skip: str | None = None
+        self.constants: list[str] = []
+        # constants followed by another statement of their model, the
+        # others already are at the end and are not counted as moved
+        self.n_constants_passed = 0
+        # a `.names` is held back until the next line shows if it is a constant
+        self.held_names: tuple[list[str], list[str]] | None = None
+
+    def write(self, raw_lines: list[str], is_statement: bool = True) -> None:
+        if is_statement:
+            self.n_constants_passed = len(self.constants)
+        for raw in raw_lines:
+            self.out.write(raw)
+            self.out.write("\n")
+
+    def start_model(self, model_name: str | None) -> None:
+        self.in_model = True
+        self.clock_pending = model_name in self.clocked_models
+
+    def end_model(self) -> None:
+        for constant in self.constants:
+            self.out.write(constant)
+        self.fixes.n_constants_moved += self.n_constants_passed
+        self.constants = []
+        self.n_constants_passed = 0
+        self.out.write(".end\n")
+        self.in_model = False
+        self.clock_pending = False
+
+    def feed(self, raw_lines: list[str], tokens: list[str]) -> None:
+        if self.held_names is not None:
+            held_raw_lines, held_tokens = self.held_names
+            self.held_names = None
+            if len(tokens) == 1 and tokens[0] in CONSTANT_COVERS and len(raw_lines) == 1:
+                if tokens[0] == "-":
+                    self.fixes.n_constants_dropped += 1
+                else:
+                    self.constants.append(f"{' '.join(held_tokens)}\n{tokens[0]}\n")
+                return
+            self.write(held_raw_lines)
+
+        cmd = tokens[0] if tokens else None
+        if self.skip is not None:
+            if cmd == ".end":
+                if self.skip == "exdc":
+                    self.end_model()
+                self.skip = None
+            return
+
+        if cmd == ".model":
+            model_name = tokens[1] if len(tokens) > 1 else ""
+            if model_name in self.seen_models:
+                self.skip = "model"
+                self.fixes.n_duplicate_models_removed += 1
+                return
+            self.seen_models.add(model_name)
+            self.start_model(model_name)
+            self.write(raw_lines)
+            return
+        if cmd is None:
+            self.write(raw_lines, is_statement=False)
+            return
+
+        if not self.in_model and cmd != ".end" and cmd.startswith("."):
+            # statements without a `.model` line belong to an unnamed model
+            self.start_model(None)
+        if self.clock_pending and cmd.startswith(".") and cmd != ".inputs":
+            self.write([".inputs clk"])
+            self.clock_pending = False
+
+        if cmd == ".exdc":
+            self.skip = "exdc"
+            self.fixes.n_exdc_sections_removed += 1
+        elif cmd == ".end":
+            self.end_model()
+        elif cmd == ".names":
+            self.held_names = (raw_lines, tokens)
+        elif is_implicit_latch(tokens):
+            self.write([f".latch {tokens[1]} {tokens[2]} re clk {tokens[3]}"])
+            self.fixes.n_latches_clocked += 1
+        else:
+            self.write(raw_lines)
+
+    def close(self) -> None:
+        if self.held_names is not None:
+            self.write(self.held_names[0])
+            self.held_names = None
+        if self.skip == "model":
+            return
+        if self.in_model or self.skip == "exdc":
+            self.fixes.n_ends_added += 1
+            self.end_model()
+
+
+def normalize_blif(fp: Path, out_fp: Path | None = None) -> BlifFixes:
+    """Fix the BLIF quirks of the MCNC, IWLS93, and similar benchmarks that
+    yosys cannot read.
+
+    - constant `.names` are moved to the end of their model, "-" constants
+    are dropped
+    - repeated definitions of a model are removed
+    - `.exdc` sections are removed
+    - latches without a control signal are clocked by a new "clk" input of
+    their model
+    - a missing `.end` of the last model is added
+
+    The file is streamed line by line, after a first streaming pass to find
+    the models that need a clock input, so memory use does not depend on the
+    size of the file.
+
+    Args:
+    ----
+        fp (Path): The BLIF file.
+        out_fp (Path | None): Where to write the fixed file, `fp` is
+        replaced if None.
+
+    Returns:
+    -------
+        BlifFixes: How many times each fix was applied.
+
+    """
+    out_fp = out_fp or fp
+    clocked_models = find_models_with_implicit_latches(fp)
+    tmp_fp = out_fp.with_name(f".{out_fp.name}.tmp")
+    with fp.open() as f_in, tmp_fp.open("w") as f_out:
+        normalizer = BlifNormalizer(f_out, clocked_models)
+        for raw_lines, tokens in iter_blif_commands(f_in):
+            normalizer.feed(raw_lines, tokens)
+        normalizer.close()
+    tmp_fp.replace(out_fp)
+    return normalizer.fixes
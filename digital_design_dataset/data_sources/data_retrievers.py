@@ -1,32 +1,43 @@
 import base64
-import io
-import json
+import hashlib
+import os
 import re
 import shutil
 import subprocess
 import tarfile
+import threading
 import zipfile
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import ClassVar
+from typing import TYPE_CHECKING, ClassVar
 
-import py7zr
 import requests
-from github import Github
-from github.ContentFile import ContentFile
 
+from digital_design_dataset.data_sources import downloader
+from digital_design_dataset.data_sources.blif import normalize_blif
 from digital_design_dataset.data_sources.github_fast_downloader import GithubFastDownloader
+from digital_design_dataset.data_sources.yosys_converter import YosysBatchConverter, YosysJob
 from digital_design_dataset.design_dataset import (
     SOURCE_FILES_EXTENSIONS_SET,
     DesignDataset,
-    build_design_scaffolding,
+    StagedDesign,
 )
 from digital_design_dataset.utils import auto_find_bin
 
+if TYPE_CHECKING:
+    import py7zr
+    from github import Github
+    from github.ContentFile import ContentFile
+
+    from digital_design_dataset.data_sources.download_cache import CachedDownload
+
 
 def get_file_from_github(
-    gh_api: Github,
+    gh_api: "Github",
     owner: str,
     repo: str,
     path: str,
@@ -53,7 +64,7 @@ def get_file_from_github(
 
 
 def get_file_from_github_binary(
-    gh_api: Github,
+    gh_api: "Github",
     owner: str,
     repo: str,
     path: str,
@@ -78,7 +89,7 @@ def get_file_from_github_binary(
 
 
 def get_file_download_url_from_github(
-    gh_api: Github,
+    gh_api: "Github",
     owner: str,
     repo: str,
     path: str,
@@ -94,33 +105,238 @@ def get_file_download_url_from_github(
 
 
 def get_listing_from_github(
-    gh_api: Github,
+    gh_api: "Github",
     owner: str,
     repo: str,
     path: str,
-) -> list[ContentFile]:
+) -> list["ContentFile"]:
     repo_ = gh_api.get_repo(f"{owner}/{repo}")
     listing = repo_.get_contents(path)
     listing = listing if isinstance(listing, list) else [listing]
     return listing
 
 
+def get_7z_member_crcs(archive: "py7zr.SevenZipFile") -> dict[str, int | None]:
+    # read from the archive header, without decompressing anything
+    return {info.filename: info.crc32 for info in archive.list()}
+
+
+DEFAULT_MAX_NETWORK_JOBS = 4
+DEFAULT_MAX_CPU_JOBS = os.cpu_count() or 1
+
+
+class RetrieverLimits:
+    """Concurrency limits shared by retrievers that run at the same time,
+    with separate slots for network fetches and CPU-bound conversions.
+    """
+
+    def __init__(
+        self,
+        max_network_jobs: int = DEFAULT_MAX_NETWORK_JOBS,
+        max_cpu_jobs: int = DEFAULT_MAX_CPU_JOBS,
+    ) -> None:
+        if max_network_jobs < 1 or max_cpu_jobs < 1:
+            raise ValueError("max_network_jobs and max_cpu_jobs must be greater than 0")
+        self.max_network_jobs = max_network_jobs
+        self.max_cpu_jobs = max_cpu_jobs
+        self.network = threading.BoundedSemaphore(max_network_jobs)
+        self.cpu = threading.BoundedSemaphore(max_cpu_jobs)
+
+
+@dataclass
+class RetrieverStats:
+    dataset_name: str
+    n_designs_built: int = 0
+    n_designs_skipped: int = 0
+    bytes_fetched: int = 0
+    elapsed_time: float = 0.0
+    error: str | None = None
+
+
 class DataRetriever(ABC):
     dataset_name: str
     dataset_tags: ClassVar[list[str]]
 
-    def __init__(self, design_dataset: DesignDataset) -> None:
+    # bump to invalidate every design this retriever built before, e.g. after
+    # changing how the sources are post-processed
+    retriever_version: ClassVar[int] = 1
+
+    def __init__(self, design_dataset: DesignDataset, limits: RetrieverLimits | None = None) -> None:
         self.design_dataset = design_dataset
+        self.limits = limits
+        self.stats = RetrieverStats(self.dataset_name)
 
     @abstractmethod
-    def get_dataset(self, overwrite: bool = False) -> None: ...
+    def get_dataset(self, overwrite: bool = False) -> None:
+        # with overwrite=False, designs that were committed by an earlier run
+        # from the same inputs are skipped, so an interrupted build resumes
+        ...
+
+    def design_fingerprint(self, *parts: str | bytes | int) -> str:
+        h = hashlib.sha256(f"{self.dataset_name}\0{self.retriever_version}".encode())
+        for part in parts:
+            h.update(b"\0")
+            h.update(part if isinstance(part, bytes) else str(part).encode())
+        return h.hexdigest()
+
+    def is_design_up_to_date(self, design_name: str, fingerprint: str, overwrite: bool) -> bool:
+        if not overwrite and self.design_dataset.is_design_complete(design_name, fingerprint):
+            self.stats.n_designs_skipped += 1
+            return True
+        return False
+
+    def stage_design(self, design_name: str, fingerprint: str | None = None) -> StagedDesign:
+        self.stats.n_designs_built += 1
+        return self.design_dataset.stage_design(
+            design_name,
+            self.dataset_name,
+            self.dataset_tags,
+            fingerprint=fingerprint,
+        )
+
+    def ingest_7z(
+        self,
+        archive_fp: Path,
+        plan_designs: Callable[[list[str]], dict[str, list[str]]],
+        overwrite: bool = False,
+        commit: bool = True,
+    ) -> Iterator[tuple[StagedDesign, dict[str, Path]]]:
+        """Stage designs built from members of a 7z archive.
+
+        7z archives are usually solid, so extracting members one at a time
+        decompresses the stream from the start for every member. Instead, the
+        members of all designs that are not up to date are extracted in a
+        single pass into a scratch dir, then every design is staged and
+        yielded with the paths of its members. A design is committed when the
+        caller asks for the next one, or discarded if the caller raises.
+
+        Args:
+        ----
+            archive_fp (Path): The 7z archive.
+            plan_designs (Callable[[list[str]], dict[str, list[str]]]): Maps
+            the member names of the archive to the members each design is
+            built from, by design name. A member may be shared by several
+            designs.
+            overwrite (bool): Rebuild designs that are already up to date.
+            commit (bool): With False, committing or aborting the yielded
+            designs is left to the caller, e.g. to convert them in a batch
+            first. The member paths are only valid while iterating.
+
+        Returns:
+        -------
+            Iterator[tuple[StagedDesign, dict[str, Path]]]: Each staged
+            design with the extracted paths of its members, by member name.
+
+        """
+        import py7zr  # noqa: PLC0415
+
+        with py7zr.SevenZipFile(archive_fp, "r") as archive_7z:
+            member_crcs = get_7z_member_crcs(archive_7z)
+            designs = plan_designs(archive_7z.getnames())
+            stale_designs = {}
+            for design_name, members in designs.items():
+                fingerprint = self.design_fingerprint(*(f"{m}:{member_crcs[m]}" for m in members))
+                if not self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                    stale_designs[design_name] = fingerprint
+            if not stale_designs:
+                return
+
+            self.design_dataset.staging_dir.mkdir(exist_ok=True)
+            with TemporaryDirectory(prefix=f"7z.{os.getpid()}.", dir=self.design_dataset.staging_dir) as temp_dir:
+                extract_dir = Path(temp_dir)
+                targets = sorted({m for design_name in stale_designs for m in designs[design_name]})
+                with self.cpu_slot():
+                    archive_7z.extract(path=extract_dir, targets=targets)
+
+                for design_name, fingerprint in stale_designs.items():
+                    members = {m: extract_dir / m for m in designs[design_name]}
+                    if not commit:
+                        yield self.stage_design(design_name, fingerprint), members
+                        continue
+                    with self.stage_design(design_name, fingerprint) as scaffold:
+                        yield scaffold, members
+
+    @contextmanager
+    def yosys_batch(
+        self,
+        yosys_bin: str | Path,
+        plugins: tuple[str, ...] = (),
+    ) -> Iterator[list[tuple[StagedDesign, YosysJob]]]:
+        """Collect staged designs together with the yosys job that completes
+        each of them, and run all jobs in batches when the block exits.
+
+        Designs whose job succeeds are committed. A failed job only discards
+        its own design, the failures are raised together after the other
+        designs are committed. If the block raises, all collected designs are
+        discarded.
+        """
+        pending: list[tuple[StagedDesign, YosysJob]] = []
+        try:
+            yield pending
+        except BaseException:
+            for scaffold, _ in pending:
+                scaffold.abort()
+            raise
+
+        n_workers = self.limits.max_cpu_jobs if self.limits is not None else DEFAULT_MAX_CPU_JOBS
+        converter = YosysBatchConverter(yosys_bin, plugins=plugins, n_workers=n_workers, slot=self.cpu_slot)
+        results = converter.run([job for _, job in pending])
+        failed = []
+        for (scaffold, _), result in zip(pending, results, strict=True):
+            if result.ok:
+                scaffold.commit()
+            else:
+                scaffold.abort()
+                self.stats.n_designs_built -= 1
+                failed.append(result)
+        if failed:
+            errors = "\n".join(f"{result.job.name}:\n{result.error}" for result in failed)
+            raise RuntimeError(f"Yosys failed to convert {len(failed)} of {len(pending)} designs:\n{errors}")
+
+    def network_slot(self) -> threading.BoundedSemaphore | nullcontext:
+        return self.limits.network if self.limits is not None else nullcontext()
+
+    def cpu_slot(self) -> threading.BoundedSemaphore | nullcontext:
+        return self.limits.cpu if self.limits is not None else nullcontext()
+
+    def download_file(self, url: str, fp: Path, timeout: int | None = None) -> None:
+        if self.design_dataset.download_cache is not None:
+            cached = self.fetch_cached(url, timeout=timeout)
+            # the blob is never modified in place, so a hard link is safe
+            try:
+                os.link(cached.fp, fp)
+            except OSError:
+                shutil.copyfile(cached.fp, fp)
+            return
+        with self.network_slot():
+            result = downloader.download_file(url, fp, timeout=timeout)
+        self.stats.bytes_fetched += result.bytes_fetched
+
+    def fetch_cached(self, url: str, timeout: int | None = None) -> "CachedDownload":
+        download_cache = self.design_dataset.download_cache
+        if download_cache is None:
+            raise RuntimeError("The design dataset has no cache_dir, there is no download cache to fetch from")
+        with self.network_slot():
+            cached = download_cache.get(url, timeout=timeout)
+        self.stats.bytes_fetched += cached.bytes_fetched
+        return cached
+
+    def github_downloader(self, repo_name: str, repo_owner: str) -> GithubFastDownloader:
+        return GithubFastDownloader(repo_name, repo_owner, mirror_cache=self.design_dataset.git_mirror_cache)
+
+    def checkout_github_paths(self, gfd: GithubFastDownloader, paths: list[str], reset: bool = True) -> None:
+        # clones on first use, later calls only fetch the blobs of the new paths
+        bytes_fetched = gfd.bytes_fetched
+        with self.network_slot():
+            if not gfd.is_cloned:
+                gfd.clone_repo()
+                gfd.enable_sparse_checkout()
+            gfd.checkout_stuff(paths, reset=reset)
+        self.stats.bytes_fetched += gfd.bytes_fetched - bytes_fetched
 
     def remove_dataset(self) -> None:
-        designs = [d for d in self.design_dataset.index if d["dataset_name"] == self.dataset_name]
-        for design in designs:
-            design_dir = self.design_dataset.designs_dir / design["design_name"]
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
+        designs = self.design_dataset.get_design_metadata_by_dataset_name(self.dataset_name)
+        self.design_dataset.delete_multiple_designs([design["design_name"] for design in designs])
 
 
 class OpencoresDatasetRetriever(DataRetriever):
@@ -131,71 +347,77 @@ class OpencoresDatasetRetriever(DataRetriever):
         "6809_6309_compatible_core",
     ]
 
+    # top.txt is no longer also copied into aux_files
+    retriever_version: ClassVar[int] = 2
+
+    def _finish_design(self, staged: StagedDesign, fingerprint_parts: list[str], overwrite: bool) -> None:
+        fingerprint = self.design_fingerprint(*fingerprint_parts)
+        if self.is_design_up_to_date(staged.design_name, fingerprint, overwrite):
+            staged.abort()
+            return
+        staged.fingerprint = fingerprint
+        staged.commit()
+        self.stats.n_designs_built += 1
+
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "hardware-design-dataset-opencores",
             "stefanpie",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/designs.tar.gz"])
-        tar_fp = gfd.get_path_on_disk("designs.tar.gz")
-
-        tar = tarfile.open(tar_fp, mode="r:gz")
-
-        designs = []
-        for member in tar.getmembers():
-            # get only top level folders "designs/*/"
-            # folders may be nested, so we need to check if the folder
-            # is a top level folder
-            if member.isdir() and member.name.count("/") == 1:
-                designs.append(member.name)
+        self.checkout_github_paths(gfd, ["/designs.tar.gz"])
+        self.import_archive(gfd.get_path_on_disk("designs.tar.gz"), overwrite=overwrite)
+        gfd.cleanup()
 
-        for fn in designs:
-            base_name = fn.split("/")[1]
-            if base_name in self.BLACKLIST:
-                continue
-            design_name = f"opencores__{base_name}"
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {
-                "design_name": design_name,
-                "dataset_name": self.dataset_name,
-                "dataset_tags": self.dataset_tags,
-            }
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            aux_files_dir = design_dir / "aux_files"
-            aux_files_dir.mkdir(parents=True, exist_ok=True)
-
-            source_file_dir = design_dir / "sources"
-            source_file_dir.mkdir(parents=True, exist_ok=True)
-
-            for member in tar.getmembers():
-                if member.isfile() and member.name.startswith(f"designs/{base_name}/"):
-                    file_name = member.name.split("/")[-1]
-                    extension = file_name.split(".")[-1]
+    def import_archive(self, tar_fp: Path, overwrite: bool = False) -> None:
+        # a single pass over the gzip stream, the members of a design are
+        # contiguous in the archive ("designs/<design>/..."), so a design is
+        # committed as soon as the first member of the next one shows up
+        staged: StagedDesign | None = None
+        fingerprint_parts: list[str] = []
+        finished: set[str] = set()
+        with tarfile.open(tar_fp, mode="r|gz") as tar:
+            try:
+                for member in tar:
+                    name_parts = member.name.split("/")
+                    if len(name_parts) < 2 or not name_parts[1]:  # noqa: PLR2004
+                        continue
+                    base_name = name_parts[1]
+                    if base_name in self.BLACKLIST:
+                        continue
+                    design_name = f"opencores__{base_name}"
+
+                    if staged is None or staged.design_name != design_name:
+                        if staged is not None:
+                            self._finish_design(staged, fingerprint_parts, overwrite)
+                            finished.add(staged.design_name)
+                        if design_name in finished:
+                            raise ValueError(f"Members of {design_name} are not contiguous in {tar_fp}")
+                        staged = self.design_dataset.stage_design(design_name, self.dataset_name, self.dataset_tags)
+                        (staged.design_dir_fp / "aux_files").mkdir(parents=True, exist_ok=True)
+                        fingerprint_parts = []
+
+                    if not member.isfile() or len(name_parts) < 3:  # noqa: PLR2004
+                        continue
+                    fingerprint_parts.append(f"{member.name}:{member.size}:{member.mtime}")
+                    file_name = name_parts[-1]
+                    if file_name == "top.txt":
+                        fp = staged.design_dir_fp / "top.txt"
+                    elif f".{file_name.split('.')[-1]}" in SOURCE_FILES_EXTENSIONS_SET:
+                        fp = staged.source_dir / file_name
+                    else:
+                        fp = staged.design_dir_fp / "aux_files" / file_name
                     file_buffer = tar.extractfile(member)
                     if file_buffer is None:
                         raise ValueError(f"Failed to extract file {file_name}")
-                    file_content = file_buffer.read().decode("utf-8")
-                    if file_name == "top.txt":
-                        fp = design_dir / "top.txt"
-                        fp.write_text(file_content)
-                    if f".{extension}" in SOURCE_FILES_EXTENSIONS_SET:
-                        fp = source_file_dir / file_name
-                        fp.write_text(file_content)
-                    else:
-                        fp = aux_files_dir / file_name
-                        fp.write_text(file_content)
+                    with file_buffer, fp.open("wb") as f:
+                        shutil.copyfileobj(file_buffer, f)
 
-        # Close the tar file
-        tar.close()
-        gfd.cleanup()
+                if staged is not None:
+                    self._finish_design(staged, fingerprint_parts, overwrite)
+            except BaseException:
+                if staged is not None:
+                    staged.abort()
+                raise
 
 
 class HW2VecDatasetRetriever(DataRetriever):
@@ -205,14 +427,12 @@ class HW2VecDatasetRetriever(DataRetriever):
     BLACKLIST = "RS232-T100"
 
     def get_dataset(self, overwrite: bool = False, timeout: int = 30) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "hw2vec",
             "AICPS",
         )
 
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/assets/datasets.zip"])
+        self.checkout_github_paths(gfd, ["/assets/datasets.zip"])
         zip_fp = gfd.get_path_on_disk("assets/datasets.zip")
 
         z = zipfile.ZipFile(zip_fp)
@@ -228,23 +448,14 @@ class HW2VecDatasetRetriever(DataRetriever):
 
             if base_name in self.BLACKLIST:
                 continue
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {}
-            metadata["design_name"] = design_name
-            metadata["dataset_name"] = self.dataset_name
-            metadata["dataset_tags"] = self.dataset_tags
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            source_file_dir = design_dir / "sources"
-            source_file_dir.mkdir(parents=True, exist_ok=True)
+            fingerprint = self.design_fingerprint(fn, z.getinfo(fn).CRC)
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
 
-            design_fp = source_file_dir / fn.split("/")[-1]
-            design_fp.write_text(z.read(fn).decode("utf-8"))
+                design_fp = source_file_dir / fn.split("/")[-1]
+                design_fp.write_text(z.read(fn).decode("utf-8"))
 
         z.close()
         gfd.cleanup()
@@ -265,15 +476,12 @@ class VTRDatasetRetriever(DataRetriever):
     # leading to long runtime and out-of-memory issues
     # TODO: find workaround in the future
 
-    def get_dataset(self, overwrite: bool = True) -> None:
-        gfd = GithubFastDownloader(
+    def get_dataset(self, overwrite: bool = False) -> None:
+        gfd = self.github_downloader(
             "vtr-verilog-to-routing",
             "verilog-to-routing",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-
-        gfd.checkout_stuff(["/vtr_flow/benchmarks/verilog", "/vtr_flow/primitives.v"])
+        self.checkout_github_paths(gfd, ["/vtr_flow/benchmarks/verilog", "/vtr_flow/primitives.v"])
 
         dir_on_disk = gfd.get_path_on_disk("vtr_flow/benchmarks/verilog")
         listing = sorted(dir_on_disk.iterdir())
@@ -304,26 +512,17 @@ class VTRDatasetRetriever(DataRetriever):
             design_name = f"vtr__{base_name}"
             if base_name in self.BLACKLIST:
                 continue
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {}
-            metadata["design_name"] = design_name
-            metadata["dataset_name"] = self.dataset_name
-            metadata["dataset_tags"] = self.dataset_tags
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            source_file_dir = design_dir / "sources"
-            source_file_dir.mkdir(parents=True, exist_ok=True)
+            fingerprint = self.design_fingerprint(file[1].read_bytes(), primitives_file_txt)
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
 
-            design_fp = source_file_dir / file[0]
-            shutil.copy(file[1], design_fp)
+                design_fp = source_file_dir / file[0]
+                shutil.copy(file[1], design_fp)
 
-            design_primitives_fp = source_file_dir / "primitives.v"
-            design_primitives_fp.write_text(primitives_file_txt)
+                design_primitives_fp = source_file_dir / "primitives.v"
+                self.design_dataset.write_design_file(design_primitives_fp, primitives_file_txt.encode())
 
         gfd.cleanup()
 
@@ -333,13 +532,11 @@ class KoiosDatasetRetriever(DataRetriever):
     dataset_tags: ClassVar[list[str]] = ["benchmark"]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "vtr-verilog-to-routing",
             "verilog-to-routing",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/vtr_flow/benchmarks/verilog/koios"])
+        self.checkout_github_paths(gfd, ["/vtr_flow/benchmarks/verilog/koios"])
 
         dir_on_disk = gfd.get_path_on_disk("vtr_flow/benchmarks/verilog/koios")
         listing = sorted(dir_on_disk.iterdir())
@@ -354,23 +551,14 @@ class KoiosDatasetRetriever(DataRetriever):
         for file in file_list:
             base_name = file[0].replace(".v", "")
             design_name = f"koios__{base_name}"
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {}
-            metadata["design_name"] = design_name
-            metadata["dataset_name"] = self.dataset_name
-            metadata["dataset_tags"] = self.dataset_tags
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            source_file_dir = design_dir / "sources"
-            source_file_dir.mkdir(parents=True, exist_ok=True)
+            fingerprint = self.design_fingerprint(file[1].read_bytes())
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
 
-            design_fp = source_file_dir / file[0]
-            shutil.copy(file[1], design_fp)
+                design_fp = source_file_dir / file[0]
+                shutil.copy(file[1], design_fp)
 
         gfd.cleanup()
 
@@ -380,13 +568,11 @@ class EPFLDatasetRetriever(DataRetriever):
     dataset_tags: ClassVar[list[str]] = ["benchmark"]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "benchmarks",
             "lsils",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/arithmetic", "/random_control"])
+        self.checkout_github_paths(gfd, ["/arithmetic", "/random_control"])
 
         dir_on_disk_arithmetic = gfd.get_path_on_disk("arithmetic")
         listing_arithmetic = sorted(dir_on_disk_arithmetic.iterdir())
@@ -410,25 +596,16 @@ class EPFLDatasetRetriever(DataRetriever):
                 raise TypeError(f"Expected str, got {type(file['name'])}")
             base_name = file["name"].replace(".v", "")
             design_name = f"epfl__{base_name}"
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {}
-            metadata["design_name"] = design_name
-            metadata["dataset_name"] = self.dataset_name
-            metadata["dataset_tags"] = self.dataset_tags
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            source_file_dir = design_dir / "sources"
-            source_file_dir.mkdir(parents=True, exist_ok=True)
-
             if not isinstance(file["path_on_disk"], Path):
                 raise TypeError(f"Expected Path, got {type(file['path_on_disk'])}")
-            design_fp = source_file_dir / file["name"]
-            shutil.copy(file["path_on_disk"], design_fp)
+            fingerprint = self.design_fingerprint(file["path_on_disk"].read_bytes())
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
+
+                design_fp = source_file_dir / file["name"]
+                shutil.copy(file["path_on_disk"], design_fp)
 
         gfd.cleanup()
 
@@ -438,13 +615,11 @@ class OPDBDatasetRetriever(DataRetriever):
     dataset_tags: ClassVar[list[str]] = ["benchmark"]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "OPDB",
             "PrincetonUniversity",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/modules/piton_baseline_designs.txt"])
+        self.checkout_github_paths(gfd, ["/modules/piton_baseline_designs.txt"])
 
         design_list_fp = gfd.get_path_on_disk("modules/piton_baseline_designs.txt")
         design_list = design_list_fp.read_text()
@@ -452,28 +627,19 @@ class OPDBDatasetRetriever(DataRetriever):
         new_gh_paths = design_list.splitlines()
         new_gh_paths = [p for p in new_gh_paths if p.strip()]
 
-        gfd.checkout_stuff(new_gh_paths, reset=False)
+        self.checkout_github_paths(gfd, new_gh_paths, reset=False)
 
         for design in design_list.splitlines():
             base_name = "_".join(design.split("/")[1:]).replace(".v", "").replace(".pickle", "")
             design_name = f"opdb__{base_name}"
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {}
-            metadata["design_name"] = design_name
-            metadata["dataset_name"] = self.dataset_name
-            metadata["dataset_tags"] = self.dataset_tags
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            source_file_dir = design_dir / "sources"
-            source_file_dir.mkdir(parents=True, exist_ok=True)
-
             design_fp = gfd.get_path_on_disk(design)
-            shutil.copy(design_fp, source_file_dir / (base_name + ".v"))
+            fingerprint = self.design_fingerprint(design_fp.read_bytes())
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
+
+                shutil.copy(design_fp, source_file_dir / (base_name + ".v"))
 
         gfd.cleanup()
 
@@ -488,42 +654,23 @@ class ISCAS85DatasetRetriever(DataRetriever):
         temp_dir = TemporaryDirectory()
         temp_dir_fp = Path(temp_dir.name)
         temp_file_fp = temp_dir_fp / "iscas.7z"
-        with (
-            requests.get(self.ISCAS_85_89_URL, stream=True, timeout=timeout) as r,
-            temp_file_fp.open("wb") as f,
-        ):
-            shutil.copyfileobj(r.raw, f)
+        self.download_file(self.ISCAS_85_89_URL, temp_file_fp, timeout=timeout)
 
         filter_pattern = re.compile(r"Verilog/c.*?\.v")
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            isca85_verilog_files = [n for n in archive.getnames() if filter_pattern.match(n)]
 
-            for file_name in isca85_verilog_files:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            designs = {}
+            for file_name in names:
+                if not filter_pattern.match(file_name):
+                    continue
                 case_name = file_name.split("/")[-1].replace(".v", "")
                 case_name = case_name.upper()
-                design_name = f"iscas85__{case_name}"
+                designs[f"iscas85__{case_name}"] = [file_name]
+            return designs
 
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
-
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
-                archive.extract(targets=[file_name], path=source_file_dir)
-                archive.reset()
-
-                current_fp = source_file_dir / Path(file_name)
-                new_fp = source_file_dir / Path(file_name).name
-                current_fp.rename(new_fp)
-                shutil.rmtree(source_file_dir / "Verilog")
+        for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite):
+            for fp in members.values():
+                self.design_dataset.copy_design_file(fp, scaffold.source_dir)
 
 
 class ISCAS89DatasetRetriever(DataRetriever):
@@ -537,51 +684,25 @@ class ISCAS89DatasetRetriever(DataRetriever):
         temp_dir_fp = Path(temp_dir.name)
         temp_file_fp = temp_dir_fp / "iscas.7z"
 
-        with (
-            requests.get(self.ISCAS_85_89_URL, stream=True, timeout=timeout) as r,
-            temp_file_fp.open("wb") as f,
-        ):
-            shutil.copyfileobj(r.raw, f)
-
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            extra_files = ["Verilog/lib.v", "Verilog/DFF2.v"]
-            for file_name in extra_files:
-                archive.extract(targets=[file_name], path=temp_dir_fp)
-                archive.reset()
+        self.download_file(self.ISCAS_85_89_URL, temp_file_fp, timeout=timeout)
 
+        # the cell library shared by every design
+        extra_files = ["Verilog/lib.v", "Verilog/DFF2.v"]
         filter_pattern = re.compile(r"Verilog/s.*?\.v")
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            isca85_verilog_files = [n for n in archive.getnames() if filter_pattern.match(n)]
 
-            for file_name in isca85_verilog_files:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            designs = {}
+            for file_name in names:
+                if not filter_pattern.match(file_name):
+                    continue
                 case_name = file_name.split("/")[-1].replace(".v", "")
                 case_name = case_name.upper()
-                design_name = f"iscas89__{case_name}"
-
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
+                designs[f"iscas89__{case_name}"] = [file_name, *extra_files]
+            return designs
 
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
-                archive.extract(targets=[file_name], path=source_file_dir)
-                archive.reset()
-
-                current_fp = source_file_dir / Path(file_name)
-                new_fp = source_file_dir / Path(file_name).name
-                current_fp.rename(new_fp)
-                shutil.rmtree(source_file_dir / "Verilog")
-
-                shutil.copy(temp_dir_fp / "Verilog" / "lib.v", source_file_dir)
-                shutil.copy(temp_dir_fp / "Verilog" / "DFF2.v", source_file_dir)
+        for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite):
+            for fp in members.values():
+                self.design_dataset.copy_design_file(fp, scaffold.source_dir)
 
 
 class LGSynth89DatasetRetriever(DataRetriever):
@@ -594,42 +715,22 @@ class LGSynth89DatasetRetriever(DataRetriever):
         temp_dir = TemporaryDirectory()
         temp_dir_fp = Path(temp_dir.name)
         temp_file_fp = temp_dir_fp / "lgsynth89.7z"
-        with (
-            requests.get(self.LGSYNTH89_URL, stream=True, timeout=10) as r,
-            temp_file_fp.open("wb") as f,
-        ):
-            shutil.copyfileobj(r.raw, f)
+        self.download_file(self.LGSYNTH89_URL, temp_file_fp, timeout=10)
 
         filter_pattern = re.compile(r"LGSynth89/Verilog/.*?_orig\.v")
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            verilog_files = [n for n in archive.getnames() if filter_pattern.match(n)]
 
-            for file_name in verilog_files:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            designs = {}
+            for file_name in names:
+                if not filter_pattern.match(file_name):
+                    continue
                 case_name = file_name.split("/")[-1].replace("_orig.v", "")
-                design_name = f"lgsynth89__{case_name}"
-
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
-
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
+                designs[f"lgsynth89__{case_name}"] = [file_name]
+            return designs
 
-                archive.extract(targets=[file_name], path=source_file_dir)
-                archive.reset()
-
-                current_fp = source_file_dir / Path(file_name)
-                new_fp = source_file_dir / Path(file_name).name
-                current_fp.rename(new_fp)
-                shutil.rmtree(source_file_dir / "LGSynth89")
+        for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite):
+            for fp in members.values():
+                self.design_dataset.copy_design_file(fp, scaffold.source_dir)
 
 
 class LGSynth91DatasetRetriever(DataRetriever):
@@ -642,105 +743,29 @@ class LGSynth91DatasetRetriever(DataRetriever):
         temp_dir = TemporaryDirectory()
         temp_dir_fp = Path(temp_dir.name)
         temp_file_fp = temp_dir_fp / "lgsynth89.7z"
-        with (
-            requests.get(self.LGSYNTH91_URL, stream=True, timeout=10) as r,
-            temp_file_fp.open("wb") as f,
-        ):
-            shutil.copyfileobj(r.raw, f)
+        self.download_file(self.LGSYNTH91_URL, temp_file_fp, timeout=10)
 
         filter_pattern = re.compile(r"LGSynth91/Verilog/.*?/.*?_orig\.v")
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            verilog_files = [n for n in archive.getnames() if filter_pattern.match(n)]
 
-            for file_name in verilog_files:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            designs = {}
+            for file_name in names:
+                if not filter_pattern.match(file_name):
+                    continue
                 case_name = file_name.split("/")[-1].replace("_orig.v", "").replace(".", "_")
-                design_name = f"lgsynth91__{case_name}"
-
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
-
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
-
-                archive.extract(targets=[file_name], path=source_file_dir)
-                archive.reset()
+                designs[f"lgsynth91__{case_name}"] = [file_name]
+            return designs
 
-                current_fp = source_file_dir / Path(file_name)
-                new_fp = source_file_dir / Path(file_name).name
-                current_fp.rename(new_fp)
-                shutil.rmtree(source_file_dir / "LGSynth91")
-
-
-RE_BLIF_BROKEN_CONSTANT = re.compile(r"(.names +.*? *\n) *([0,1,-]) *$", re.MULTILINE)
-
-
-def fix_blif_constant_expr(fp: Path) -> None:
-    t = fp.read_text()
-
-    const_exprs = []
-
-    matches = RE_BLIF_BROKEN_CONSTANT.finditer(t)
-    for match in matches:
-        _whole = match.group(0)
-        name_line = match.group(1)
-        const = match.group(2)
-        name_line = name_line.replace("  ", " ")
-        if const == "0":
-            new_str = name_line + f"{const}"
-        if const == "1":
-            new_str = name_line + f"{const}"
-        if const == "-":
-            new_str = " "
-        const_exprs.append(new_str)
-        t = t.replace(match.group(0), "")
-
-    lines = t.splitlines()
-    # find the ".end" line
-    end_line_idx = lines.index(".end")
-    # insert the new constant expressions before the ".end" line
-    for const_expr in const_exprs:
-        lines.insert(end_line_idx, const_expr)
-
-    t = "\n".join(lines)
-
-    fp.write_text(t)
-
-
-RE_BLIF_MODEL = re.compile(r"\.model +(.+)(:?.|\n)*?\.end", re.MULTILINE)
-
-
-def fix_blif_duplicate_model_definition(fp: Path) -> None:
-    t = fp.read_text()
-    models = RE_BLIF_MODEL.finditer(t)
-    model_data = [
-        (
-            match.group(0),
-            match.group(1),
-        )
-        for match in models
-    ]
-    seen_models = set()
-    for model_text, model_name in model_data:
-        if model_name in seen_models:
-            t = t.replace(model_text, "\n\n", 1)
-        else:
-            seen_models.add(model_name)
-
-    fp.write_text(t)
+        for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite):
+            for fp in members.values():
+                self.design_dataset.copy_design_file(fp, scaffold.source_dir)
 
 
 class IWLS93DatasetRetriever(DataRetriever):
     dataset_name: str = "iwls93"
     dataset_tags: ClassVar[list[str]] = ["benchmark"]
+    # BLIF files are fixed up by normalize_blif
+    retriever_version: ClassVar[int] = 2
 
     IWLS93_URL = "https://ddd.fit.cvut.cz/www/prj/Benchmarks/IWLS93.7z"
 
@@ -758,74 +783,38 @@ class IWLS93DatasetRetriever(DataRetriever):
         temp_dir = TemporaryDirectory()
         temp_dir_fp = Path(temp_dir.name)
         temp_file_fp = temp_dir_fp / "lgsynth89.7z"
-        with (
-            requests.get(self.IWLS93_URL, stream=True, timeout=10) as r,
-            temp_file_fp.open("wb") as f,
-        ):
-            shutil.copyfileobj(r.raw, f)
+        self.download_file(self.IWLS93_URL, temp_file_fp, timeout=10)
 
         filter_pattern = re.compile(r"blif/.*?\.blif")
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            blif_files = [n for n in archive.getnames() if filter_pattern.match(n)]
 
-            for file_name in blif_files:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            designs = {}
+            for file_name in names:
+                if not filter_pattern.match(file_name):
+                    continue
                 base_name = file_name.split("/")[-1].replace(".blif", "")
-
                 if base_name in self.BLACKLIST:
                     continue
+                designs[f"iwls93__{base_name}"] = [file_name]
+            return designs
 
-                design_name = f"iwls93__{base_name}"
-
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
-
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_file_dir = design_dir / "sources_blif"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
-                archive.extract(targets=[file_name], path=source_file_dir)
-                archive.reset()
-
-                current_fp = source_file_dir / Path(file_name)
-                new_fp = source_file_dir / Path(file_name).name
-                current_fp.rename(new_fp)
-                shutil.rmtree(source_file_dir / "blif")
-
-                fix_blif_constant_expr(new_fp)
-                fix_blif_duplicate_model_definition(new_fp)
-
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
+        with self.yosys_batch(yosys_bin) as pending:
+            for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite, commit=False):
+                [(file_name, extracted_fp)] = members.items()
+                base_name = file_name.split("/")[-1].replace(".blif", "")
+                source_blif_file_dir = scaffold.design_dir_fp / "sources_blif"
+                new_fp = source_blif_file_dir / extracted_fp.name
+                verilog_fp = scaffold.source_dir / f"{base_name}.v"
 
                 yosys_script = f"""
-                read_blif -sop {source_file_dir / new_fp}
+                read_blif -sop {new_fp}
                 techmap t:$sop
-                write_verilog {source_file_dir / base_name}.v
+                write_verilog {verilog_fp}
                 """
+                pending.append((scaffold, YosysJob(scaffold.design_name, yosys_script, [verilog_fp])))
 
-                temp_dir_yosys = TemporaryDirectory()
-                temp_dir_fp_yosys = Path(temp_dir_yosys.name)
-                temp_script_fp = temp_dir_fp_yosys / "script.ys"
-                temp_script_fp.write_text(yosys_script)
-
-                p = subprocess.run(
-                    [yosys_bin, "-s", temp_script_fp],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
-
-                if p.returncode != 0:
-                    raise RuntimeError(
-                        f"Yosys failed to convert {new_fp} to Verilog:\n{p.stdout}\n{p.stderr}\n",
-                    )
+                source_blif_file_dir.mkdir(parents=True, exist_ok=True)
+                normalize_blif(extracted_fp, new_fp)
 
 
 class I99TDatasetRetriever(DataRetriever):
@@ -859,68 +848,42 @@ class I99TDatasetRetriever(DataRetriever):
                 "Yosys is missing the ghdl module. Please install ghdl to be used with yosys.",
             )
 
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "I99T",
             "cad-polito-it",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/i99t"])
+        self.checkout_github_paths(gfd, ["/i99t"])
 
         dir_on_disk = gfd.get_path_on_disk("i99t")
         paths_on_disk = sorted([p for p in dir_on_disk.iterdir() if p.is_dir()])
         paths = [str(p.relative_to(gfd.repo_dir)) for p in paths_on_disk]
 
-        for path in paths:
-            base_name = path.split("/")[-1]
-            if base_name in self.BLACKLIST:
-                continue
-            design_name = f"i99t_{base_name}"
-
-            vhd_name = f"{base_name}.vhd"
-            vhdl_name = f"{base_name}.vhdl"
-
-            design_dir = self.design_dataset.designs_dir / design_name
-            if design_dir.exists():
-                shutil.rmtree(design_dir)
-            design_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata = {}
-            metadata["design_name"] = design_name
-            metadata["dataset_name"] = self.dataset_name
-            metadata["dataset_tags"] = self.dataset_tags
-            metadata_fp = design_dir / "design.json"
-            metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-            source_vhdl_file_dir = design_dir / "sources_vhdl"
-            source_vhdl_file_dir.mkdir(parents=True, exist_ok=True)
-
-            design_fp = gfd.get_path_on_disk(f"{path}/{vhd_name}")
-            shutil.copy(design_fp, source_vhdl_file_dir / vhdl_name)
-
-            sources_file_dir = design_dir / "sources"
-            sources_file_dir.mkdir(parents=True, exist_ok=True)
-
-            yosys_script = f"""
-            ghdl --ieee=synopsys --std=08 {source_vhdl_file_dir / vhdl_name} -e {base_name}
-            write_verilog {sources_file_dir / base_name}.v
-            """
-
-            temp_dir_yosys = TemporaryDirectory()
-            temp_dir_fp_yosys = Path(temp_dir_yosys.name)
-            temp_script_fp = temp_dir_fp_yosys / "script.ys"
-            temp_script_fp.write_text(yosys_script)
-
-            p = subprocess.run(
-                [yosys_bin, "-m", "ghdl", "-s", temp_script_fp],
-                text=True,
-                capture_output=True,
-                check=False,
-            )
-            if p.returncode != 0:
-                raise RuntimeError(
-                    f"Yosys failed to convert {vhdl_name} to Verilog:\n{p.stdout}\n{p.stderr}\n",
-                )
+        with self.yosys_batch(yosys_bin, plugins=("ghdl",)) as pending:
+            for path in paths:
+                base_name = path.split("/")[-1]
+                if base_name in self.BLACKLIST:
+                    continue
+                design_name = f"i99t_{base_name}"
+
+                vhd_name = f"{base_name}.vhd"
+                vhdl_name = f"{base_name}.vhdl"
+
+                design_fp = gfd.get_path_on_disk(f"{path}/{vhd_name}")
+                fingerprint = self.design_fingerprint(design_fp.read_bytes())
+                if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                    continue
+                scaffold = self.stage_design(design_name, fingerprint)
+                source_vhdl_file_dir = scaffold.design_dir_fp / "sources_vhdl"
+                verilog_fp = scaffold.source_dir / f"{base_name}.v"
+
+                yosys_script = f"""
+                ghdl --ieee=synopsys --std=08 {source_vhdl_file_dir / vhdl_name} -e {base_name}
+                write_verilog {verilog_fp}
+                """
+                pending.append((scaffold, YosysJob(design_name, yosys_script, [verilog_fp])))
+
+                source_vhdl_file_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copy(design_fp, source_vhdl_file_dir / vhdl_name)
 
         gfd.cleanup()
 
@@ -944,65 +907,34 @@ class AddersCVUTDatasetRetriever(DataRetriever):
         temp_dir = TemporaryDirectory()
         temp_dir_fp = Path(temp_dir.name)
         temp_file_fp = temp_dir_fp / "adders.7z"
-        with (
-            requests.get(self.ADDERS_CVUT_URL, stream=True, timeout=10) as r,
-            temp_file_fp.open("wb") as f,
-        ):
-            shutil.copyfileobj(r.raw, f)
-
-        with py7zr.SevenZipFile(temp_file_fp, "r") as archive:
-            files = [p for p in archive.getnames() if p.endswith(".blif") and not p.endswith("_col.blif")]
+        self.download_file(self.ADDERS_CVUT_URL, temp_file_fp, timeout=10)
 
-            for file_name in files:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            designs = {}
+            for file_name in names:
+                if not file_name.endswith(".blif") or file_name.endswith("_col.blif"):
+                    continue
                 base_name = file_name.split("/")[-1].replace(".blif", "").replace("-", "_")
-                design_name = f"adders_cvut__{base_name}"
-
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
-
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_blif_file_dir = design_dir / "sources_blif"
-                source_blif_file_dir.mkdir(parents=True, exist_ok=True)
-                archive.extract(targets=[file_name], path=source_blif_file_dir)
-                archive.reset()
-
-                current_fp = source_blif_file_dir / Path(file_name)
-                new_fp = source_blif_file_dir / Path(file_name).name
-                current_fp.rename(new_fp)
+                designs[f"adders_cvut__{base_name}"] = [file_name]
+            return designs
 
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
+        with self.yosys_batch(yosys_bin) as pending:
+            for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite, commit=False):
+                [(file_name, extracted_fp)] = members.items()
+                base_name = file_name.split("/")[-1].replace(".blif", "").replace("-", "_")
+                source_blif_file_dir = scaffold.design_dir_fp / "sources_blif"
+                new_fp = source_blif_file_dir / extracted_fp.name
+                verilog_fp = scaffold.source_dir / f"{base_name}.v"
 
                 yosys_script = f"""
-                read_blif -sop {source_blif_file_dir / new_fp}
+                read_blif -sop {new_fp}
                 techmap t:$sop
-                write_verilog {source_file_dir / base_name}.v
+                write_verilog {verilog_fp}
                 """
+                pending.append((scaffold, YosysJob(scaffold.design_name, yosys_script, [verilog_fp])))
 
-                temp_dir_yosys = TemporaryDirectory()
-                temp_dir_fp_yosys = Path(temp_dir_yosys.name)
-                temp_script_fp = temp_dir_fp_yosys / "script.ys"
-                temp_script_fp.write_text(yosys_script)
-
-                p = subprocess.run(
-                    [yosys_bin, "-s", temp_script_fp],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
-
-                if p.returncode != 0:
-                    raise RuntimeError(
-                        f"Yosys failed to convert {new_fp} to Verilog:\n{p.stdout}\n{p.stderr}\n",
-                    )
+                source_blif_file_dir.mkdir(parents=True, exist_ok=True)
+                self.design_dataset.copy_design_file(extracted_fp, new_fp)
 
 
 RE_CELL_ARRAY_INSTANCE = re.compile(r"[\w\d]+ +(?:#\(.*?\) +)*[\w\d]+\[\d+:\d+\]")
@@ -1104,33 +1036,29 @@ class VerilogAddersMongrelgemDatasetRetriever(DataRetriever):
     ]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "Verilog-Adders",
             "mongrelgem",
         )
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(self.DESIGN_FILES)
+        self.checkout_github_paths(gfd, self.DESIGN_FILES)
 
         for design_fp in self.DESIGN_FILES:
             base_name = design_fp.split("/")[-1].replace(".v", "")
-
-            scaffold = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                base_name,
-                "verilog_adders_mongrelgem",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-            source_file_dir = scaffold.source_dir
+            design_name = f"verilog_adders_mongrelgem__{base_name}"
 
             fp_on_disk = gfd.get_path_on_disk(design_fp)
             text = fp_on_disk.read_text()
 
-            design_fp_local = source_file_dir / design_fp.split("/")[-1]
-            design_fp_local.write_text(text)
+            fingerprint = self.design_fingerprint(text)
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
+
+                design_fp_local = source_file_dir / design_fp.split("/")[-1]
+                design_fp_local.write_text(text)
 
-            unroll_cell_array_instances(design_fp_local)
+                unroll_cell_array_instances(design_fp_local)
 
         gfd.cleanup()
 
@@ -1146,69 +1074,11 @@ class Texas97DatasetRetriever(DataRetriever):
         raise NotImplementedError
 
 
-RE_EXDC = re.compile(r"\.exdc[\S\s]*?\.end", re.MULTILINE)
-
-
-def remove_exdc(fp: Path) -> None:
-    t = fp.read_text()
-    t = RE_EXDC.sub(".end", t)
-    fp.write_text(t)
-
-
-RE_LATCH_IMPLICIT_CONTROL = re.compile(r"\.latch\s+(\S+)\s+(\S+)\s+([0,1,2,3])")
-
-
-def find_implicit_latches(fp: Path) -> list[re.Match]:
-    t = fp.read_text()
-    matches = list(RE_LATCH_IMPLICIT_CONTROL.finditer(t))
-    return matches
-
-
-def add_implicit_global_clock(fp: Path) -> None:
-    t = fp.read_text()
-    lines = t.splitlines()
-    lines_striped = [line.strip() for line in lines]
-    matches = find_implicit_latches(fp)
-    models = set()
-    for match in matches:
-        model_line = None
-        for line in t[: match.start()].splitlines()[::-1]:
-            if line.startswith(".model"):
-                model_line = line
-                break
-        if model_line is None:
-            raise ValueError("Could not find model line for latch")
-        model_name = model_line.split(" ")[1]
-        models.add(model_name)
-
-    # for each model, add a global clock
-    for model in models:
-        model_line_idx = lines_striped.index(f".model {model}")
-        # find the next line that starts with .outputs
-        outputs_line_idx = model_line_idx
-        for i in range(model_line_idx + 1, len(lines_striped)):
-            if lines_striped[i].startswith(".") and not lines_striped[i].startswith(".inputs"):
-                outputs_line_idx = i
-                break
-        if outputs_line_idx == model_line_idx:
-            raise ValueError("Could not find .outputs line for latch")
-
-        # insert the global clock
-        lines.insert(outputs_line_idx, ".inputs clk")
-
-    t = "\n".join(lines)
-
-    # for each latch, add the global clock
-    for match in matches:
-        latch_line_new = f".latch {match.group(1)} {match.group(2)} re clk {match.group(3)}"
-        t = t.replace(match.group(0), latch_line_new)
-
-    fp.write_text(t)
-
-
 class MCNC20DatasetRetriever(DataRetriever):
     dataset_name: str = "mcnc20"
     dataset_tags: ClassVar[list[str]] = ["benchmark"]
+    # BLIF files are fixed up by normalize_blif
+    retriever_version: ClassVar[int] = 2
 
     DATA_URL: str = "https://ddd.fit.cvut.cz/www/prj/Benchmarks/MCNC.7z"
 
@@ -1216,12 +1086,6 @@ class MCNC20DatasetRetriever(DataRetriever):
         "alu3",
     ]
 
-    @staticmethod
-    def fix_missing_end(fp: Path) -> None:
-        t = fp.read_text()
-        t += "\n.end"
-        fp.write_text(t)
-
     def get_dataset(self, overwrite: bool = False, timeout: int = 30) -> None:
         # check for yosys
         yosys_bin = auto_find_bin("yosys")
@@ -1232,74 +1096,33 @@ class MCNC20DatasetRetriever(DataRetriever):
                 "YOSYS_PATH environment variable.",
             )
 
-        r = requests.get(self.DATA_URL, timeout=timeout)
-        if r.status_code != requests.codes.ok:
-            raise RuntimeError(f"Failed to download {self.dataset_name} dataset")
-
-        with py7zr.SevenZipFile(io.BytesIO(r.content), "r") as archive:
-            design_files = [p for p in archive.getnames() if p.endswith(".blif")]
-            for design_file in design_files:
-                name = design_file.split("/")[-1].removesuffix(".blif")
-                design_name = f"mcnc20__{name}"
-
-                design_dir = self.design_dataset.designs_dir / design_name
-                if design_dir.exists():
-                    shutil.rmtree(design_dir)
-                design_dir.mkdir(parents=True, exist_ok=True)
-
-                metadata = {}
-                metadata["design_name"] = design_name
-                metadata["dataset_name"] = self.dataset_name
-                metadata["dataset_tags"] = self.dataset_tags
-                metadata_fp = design_dir / "design.json"
-                metadata_fp.write_text(json.dumps(metadata, indent=4))
-
-                source_blif_file_dir = design_dir / "sources_blif"
-                source_blif_file_dir.mkdir(parents=True, exist_ok=True)
-                archive.extract(targets=[design_file], path=source_blif_file_dir)
-                archive.reset()
-
-                current_fp = source_blif_file_dir / Path(design_file)
-                new_fp = source_blif_file_dir / Path(design_file).name
-                current_fp.rename(new_fp)
-
-                if ".exdc" in new_fp.read_text():
-                    remove_exdc(new_fp)
-
-                if name in {"i10", "i2", "i3", "i4", "i5", "i6", "i7"}:
-                    self.fix_missing_end(new_fp)
+        temp_dir = TemporaryDirectory()
+        temp_file_fp = Path(temp_dir.name) / "mcnc.7z"
+        self.download_file(self.DATA_URL, temp_file_fp, timeout=timeout)
 
-                if find_implicit_latches(new_fp):
-                    add_implicit_global_clock(new_fp)
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            return {f"mcnc20__{p.split('/')[-1].removesuffix('.blif')}": [p] for p in names if p.endswith(".blif")}
 
-                source_file_dir = design_dir / "sources"
-                source_file_dir.mkdir(parents=True, exist_ok=True)
+        with self.yosys_batch(yosys_bin) as pending:
+            for scaffold, members in self.ingest_7z(temp_file_fp, plan_designs, overwrite, commit=False):
+                [(design_file, extracted_fp)] = members.items()
+                name = design_file.split("/")[-1].removesuffix(".blif")
+                source_blif_file_dir = scaffold.design_dir_fp / "sources_blif"
+                new_fp = source_blif_file_dir / extracted_fp.name
+                verilog_fp = scaffold.source_dir / f"{name}.v"
 
                 yosys_script = f"""
-                read_blif -sop {source_blif_file_dir / new_fp}
+                read_blif -sop {new_fp}
                 proc
                 techmap t:$sop
                 # techmap t:$ff
                 # check
-                write_verilog {source_file_dir / name}.v
+                write_verilog {verilog_fp}
                 """
+                pending.append((scaffold, YosysJob(scaffold.design_name, yosys_script, [verilog_fp])))
 
-                temp_dir_yosys = TemporaryDirectory()
-                temp_dir_fp_yosys = Path(temp_dir_yosys.name)
-                temp_script_fp = temp_dir_fp_yosys / "script.ys"
-                temp_script_fp.write_text(yosys_script)
-
-                p = subprocess.run(
-                    [yosys_bin, "-s", temp_script_fp],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
-
-                if p.returncode != 0:
-                    raise RuntimeError(
-                        f"Yosys failed to convert {new_fp} to Verilog:\n{p.stdout}\n{p.stderr}\n",
-                    )
+                source_blif_file_dir.mkdir(parents=True, exist_ok=True)
+                normalize_blif(extracted_fp, new_fp)
 
 
 class DeepBenchVerilogDatasetRetriever(DataRetriever):
@@ -1349,10 +1172,8 @@ class DeepBenchVerilogDatasetRetriever(DataRetriever):
     ]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader("DeepBenchVerilog", "raminrasoulinezhad")
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(self.DESIGN_PATHS)
+        gfd = self.github_downloader("DeepBenchVerilog", "raminrasoulinezhad")
+        self.checkout_github_paths(gfd, self.DESIGN_PATHS)
 
         for gh_path in self.DESIGN_PATHS:
             if "inference/Conv" in gh_path:
@@ -1360,22 +1181,23 @@ class DeepBenchVerilogDatasetRetriever(DataRetriever):
                 base_name = "_".join(base_name_split)
             else:
                 base_name = gh_path.split("/")[-1]
-
-            scaffold = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                base_name,
-                "deepbenchverilog",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-            source_file_dir = scaffold.source_dir
+            design_name = f"deepbenchverilog__{base_name}"
 
             path_on_disk = gfd.get_path_on_disk(gh_path)
             listing = sorted(path_on_disk.iterdir())
-            for file in listing:
-                if file.is_dir():
-                    raise ValueError("Expected a file, got a directory")
-                shutil.copy(file, source_file_dir)
+            if any(file.is_dir() for file in listing):
+                raise ValueError("Expected a file, got a directory")
+
+            fingerprint = self.design_fingerprint(
+                *(part for file in listing for part in (file.name, file.read_bytes())),
+            )
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
+
+                for file in listing:
+                    shutil.copy(file, source_file_dir)
 
         gfd.cleanup()
 
@@ -1385,32 +1207,29 @@ class RegexFsmVerilogDatasetRetriever(DataRetriever):
     dataset_tags: ClassVar[list[str]] = ["synthetic"]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader("regex-fsm-verilog", "stefanpie")
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/generated_designs.tar.gz"])
+        gfd = self.github_downloader("regex-fsm-verilog", "stefanpie")
+        self.checkout_github_paths(gfd, ["/generated_designs.tar.gz"])
 
         file_on_disk = gfd.get_path_on_disk("generated_designs.tar.gz")
         archive = tarfile.open(file_on_disk)
 
         design_dirs = [p.split("/")[1] for p in archive.getnames() if p.count("/") == 1]
         for design_dir in design_dirs:
-            scaffold = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                design_dir,
-                "regex_fsm_verilog",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-            source_file_dir = scaffold.source_dir
+            design_name = f"regex_fsm_verilog__{design_dir}"
+            member = archive.getmember(f"generated_designs/{design_dir}/fsm.v")
+            fingerprint = self.design_fingerprint(member.name, member.size, member.mtime)
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
 
-            v_str_io = archive.extractfile(f"generated_designs/{design_dir}/fsm.v")
-            if v_str_io is None:
-                raise ValueError(f"Could not find fsm.v for {design_dir}")
-            v_str = v_str_io.read().decode()
+                v_str_io = archive.extractfile(member)
+                if v_str_io is None:
+                    raise ValueError(f"Could not find fsm.v for {design_dir}")
+                v_str = v_str_io.read().decode()
 
-            design_fp = source_file_dir / "fsm.v"
-            design_fp.write_text(v_str)
+                design_fp = source_file_dir / "fsm.v"
+                design_fp.write_text(v_str)
 
         archive.close()
         gfd.cleanup()
@@ -1421,10 +1240,8 @@ class XACTDatasetRetriever(DataRetriever):
     dataset_tags: ClassVar[list[str]] = ["benchmark", "reference"]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader("xact-designs", "stefanpie")
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/designs_converted.zip"])
+        gfd = self.github_downloader("xact-designs", "stefanpie")
+        self.checkout_github_paths(gfd, ["/designs_converted.zip"])
 
         file_on_disk = gfd.get_path_on_disk("designs_converted.zip")
         archive = zipfile.ZipFile(file_on_disk)
@@ -1433,32 +1250,30 @@ class XACTDatasetRetriever(DataRetriever):
         design_dirs = sorted(design_dirs_set)
 
         for design_dir in design_dirs:
-            scaffold = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                design_dir,
-                "xact",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-            source_file_dir = scaffold.source_dir
-            design_dir_fp = scaffold.design_dir_fp
-
+            design_name = f"xact__{design_dir}"
             verilog_files = [
                 "vlib.v",
                 f"{design_dir}.v",
             ]
 
-            for verilog_file in verilog_files:
-                v_str_io = archive.open(f"{design_dir}/{verilog_file}")
-                v_str = v_str_io.read().decode()
+            fingerprint = self.design_fingerprint(
+                *(archive.getinfo(f"{design_dir}/{fn}").CRC for fn in [*verilog_files, "top.txt"]),
+            )
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold:
+                source_file_dir = scaffold.source_dir
+                design_dir_fp = scaffold.design_dir_fp
 
-                design_fp = source_file_dir / verilog_file
-                design_fp.write_text(v_str)
+                for verilog_file in verilog_files:
+                    v_bytes = archive.read(f"{design_dir}/{verilog_file}")
+                    design_fp = source_file_dir / verilog_file
+                    self.design_dataset.write_design_file(design_fp, v_bytes)
 
-            top_str_io = archive.open(f"{design_dir}/top.txt")
-            top_str = top_str_io.read().decode()
-            top_fp = design_dir_fp / "top.txt"
-            top_fp.write_text(top_str)
+                top_str_io = archive.open(f"{design_dir}/top.txt")
+                top_str = top_str_io.read().decode()
+                top_fp = design_dir_fp / "top.txt"
+                top_fp.write_text(top_str)
 
         archive.close()
         gfd.cleanup()
@@ -1469,38 +1284,35 @@ class EspressoPLADatasetRetriever(DataRetriever):
     dataset_tags: ClassVar[list[str]] = ["benchmark", "reference"]
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader("espresso-pla-designs-verilog", "stefanpie")
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(["/generated_designs.tar.gz"])
+        gfd = self.github_downloader("espresso-pla-designs-verilog", "stefanpie")
+        self.checkout_github_paths(gfd, ["/generated_designs.tar.gz"])
 
         file_on_disk = gfd.get_path_on_disk("generated_designs.tar.gz")
         archive = tarfile.open(file_on_disk)
 
         design_dirs = [p.split("/")[1] for p in archive.getnames() if p.count("/") == 2]
         for design_dir in design_dirs:
-            scaffolding = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                design_dir,
-                "espresso_pla",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-            source_file_dir = scaffolding.source_dir
-            design_dir_fp = scaffolding.design_dir_fp
-
-            # each is a dir with verilog files in it
-            v_str_io = archive.extractfile(f"generated_designs/{design_dir}/{design_dir}.v")
-            if v_str_io is None:
-                raise ValueError(f"Could not find {design_dir}.v for {design_dir}")
-            v_str = v_str_io.read().decode()
+            design_name = f"espresso_pla__{design_dir}"
+            member = archive.getmember(f"generated_designs/{design_dir}/{design_dir}.v")
+            fingerprint = self.design_fingerprint(member.name, member.size, member.mtime)
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffolding:
+                source_file_dir = scaffolding.source_dir
+                design_dir_fp = scaffolding.design_dir_fp
+
+                # each is a dir with verilog files in it
+                v_str_io = archive.extractfile(member)
+                if v_str_io is None:
+                    raise ValueError(f"Could not find {design_dir}.v for {design_dir}")
+                v_str = v_str_io.read().decode()
 
-            design_fp = source_file_dir / f"{design_dir}.v"
-            design_fp.write_text(v_str)
+                design_fp = source_file_dir / f"{design_dir}.v"
+                design_fp.write_text(v_str)
 
-            # write a top_file with the top module name
-            top_fp = design_dir_fp / "top.txt"
-            top_fp.write_text(f"{design_dir}")
+                # write a top_file with the top module name
+                top_fp = design_dir_fp / "top.txt"
+                top_fp.write_text(f"{design_dir}")
 
         archive.close()
         gfd.cleanup()
@@ -1597,33 +1409,25 @@ class FPGAMicroBenchmarksDatasetRetriever(DataRetriever):
 
     def get_single_file_designs(self, gfd: GithubFastDownloader, overwrite: bool = False) -> None:
         for gh_path in self.DESIGN_PATHS_SINGLE_FILE:
-            scaffolding = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                Path(gh_path).stem,
-                "fpga_micro_benchmarks",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-
-            source_file_dir = scaffolding.source_dir
-
-            text_fp = gfd.get_path_on_disk(gh_path)
-            shutil.copy(text_fp, source_file_dir)
+            self.get_one_design(Path(gh_path).stem, [gfd.get_path_on_disk(gh_path)], overwrite=overwrite)
 
     def get_multi_file_designs(self, gfd: GithubFastDownloader, overwrite: bool = False) -> None:
         for d_name, gh_paths in self.DESIGN_PATHS_MULTI_FILE.items():
-            scaffolding = build_design_scaffolding(
-                self.design_dataset.designs_dir,
-                d_name,
-                "fpga_micro_benchmarks",
-                self.dataset_name,
-                self.dataset_tags,
-            )
-            source_file_dir = scaffolding.source_dir
+            self.get_one_design(d_name, [gfd.get_path_on_disk(gh_path) for gh_path in gh_paths], overwrite=overwrite)
 
-            for gh_path in gh_paths:
-                text_fp = gfd.get_path_on_disk(gh_path)
-                shutil.copy(text_fp, source_file_dir)
+    def get_one_design(
+        self,
+        design_name_base: str,
+        files: list[Path],
+        overwrite: bool = False,
+    ) -> None:
+        design_name = f"fpga_micro_benchmarks__{design_name_base}"
+        fingerprint = self.design_fingerprint(*(part for fp in files for part in (fp.name, fp.read_bytes())))
+        if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+            return
+        with self.stage_design(design_name, fingerprint) as scaffolding:
+            for fp in files:
+                shutil.copy(fp, scaffolding.source_dir)
 
     def get_one_single_dir(
         self,
@@ -1631,17 +1435,8 @@ class FPGAMicroBenchmarksDatasetRetriever(DataRetriever):
         design_name_base: str,
         gh_design_dir: str,
         ignore_tb_files: bool = False,
+        overwrite: bool = False,
     ) -> None:
-        scaffolding = build_design_scaffolding(
-            self.design_dataset.designs_dir,
-            design_name_base,
-            "fpga_micro_benchmarks",
-            self.dataset_name,
-            self.dataset_tags,
-        )
-
-        source_file_dir = scaffolding.source_dir
-
         path_on_disk = gfd.get_path_on_disk(gh_design_dir)
         listing = sorted(path_on_disk.iterdir())
 
@@ -1656,8 +1451,7 @@ class FPGAMicroBenchmarksDatasetRetriever(DataRetriever):
         if ignore_tb_files:
             files_hdl = [f for f in files_hdl if tb_filter(f)]
 
-        for file_hdl in files_hdl:
-            shutil.copy(file_hdl, source_file_dir)
+        self.get_one_design(design_name_base, files_hdl, overwrite=overwrite)
 
     def get_designs_single_dir(self, gfd: GithubFastDownloader, overwrite: bool = False) -> None:
         for design_name, gh_design_dir in self.DESIGN_PATHS_SINGLE_DIR:
@@ -1665,6 +1459,7 @@ class FPGAMicroBenchmarksDatasetRetriever(DataRetriever):
                 gfd,
                 design_name,
                 gh_design_dir,
+                overwrite=overwrite,
             )
 
     def get_designs_collections(self, gfd: GithubFastDownloader, overwrite: bool = False) -> None:
@@ -1678,13 +1473,13 @@ class FPGAMicroBenchmarksDatasetRetriever(DataRetriever):
                     design_subdir.name,
                     str(design_subdir.relative_to(gfd.repo_dir)),
                     ignore_tb_files=True,
+                    overwrite=overwrite,
                 )
 
     def get_dataset(self, overwrite: bool = False) -> None:
-        gfd = GithubFastDownloader(self.REPO_NAME, self.REPO_OWNER)
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-        gfd.checkout_stuff(
+        gfd = self.github_downloader(self.REPO_NAME, self.REPO_OWNER)
+        self.checkout_github_paths(
+            gfd,
             ["/dsp/", "/fsm/", "/interface/", "/processors/", "/ram/", "/simple_gates/", "/simple_registers/"],
         )
 
@@ -0,0 +1,148 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from digital_design_dataset.data_sources.downloader import download_file
+
+
+@dataclass
+class CachedDownload:
+    url: str
+    fp: Path
+    sha256: str
+    size: int
+    # False if the body was downloaded by this request
+    from_cache: bool
+    bytes_fetched: int = 0
+
+
+@dataclass
+class DownloadCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_fetched: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.bytes_fetched / 1e6:.1f} MB fetched"
+
+
+class DownloadCache:
+    """A persistent HTTP download cache shared by all retrievers.
+
+    Entries are keyed on the URL and point to a blob stored under the SHA-256
+    of its content, so identical archives served from different URLs are only
+    stored once. A cached entry is revalidated with its ETag and
+    Last-Modified headers before it is reused, and only downloaded again if
+    the server reports a change. In offline mode the server is never
+    contacted and only cached entries can be served.
+    """
+
+    def __init__(self, cache_dir: Path, offline: bool = False) -> None:
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.stats = DownloadCacheStats()
+        self._stats_lock = threading.Lock()
+        for sub_dir in ("blobs", "entries", "tmp"):
+            (self.cache_dir / sub_dir).mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def blob_fp(self, sha256: str) -> Path:
+        return self.cache_dir / "blobs" / sha256[:2] / sha256
+
+    def entry_fp(self, url: str) -> Path:
+        return self.cache_dir / "entries" / f"{self.url_key(url)}.json"
+
+    def read_entry(self, url: str) -> dict | None:
+        try:
+            entry = json.loads(self.entry_fp(url).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not self.blob_fp(entry["sha256"]).exists():
+            return None
+        return entry
+
+    def _write_entry(self, url: str, entry: dict) -> None:
+        entry_fp = self.entry_fp(url)
+        tmp_fp = entry_fp.with_name(f".{entry_fp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_fp.write_text(json.dumps(entry, indent=4))
+        tmp_fp.replace(entry_fp)
+
+    @contextmanager
+    def _lock(self, url: str) -> Iterator[None]:
+        # only one thread or process downloads a given URL at a time, the
+        # others then find it in the cache
+        lock_fp = self.cache_dir / "tmp" / f"{self.url_key(url)}.lock"
+        with lock_fp.open("a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _hit(self, url: str, entry: dict) -> CachedDownload:
+        with self._stats_lock:
+            self.stats.hits += 1
+        return CachedDownload(url, self.blob_fp(entry["sha256"]), entry["sha256"], entry["size"], from_cache=True)
+
+    def get(self, url: str, timeout: float | None = None) -> CachedDownload:
+        """Fetch `url` through the cache.
+
+        Args:
+        ----
+            url (str): The URL to download.
+            timeout (float | None): Timeout for the HTTP request.
+
+        Returns:
+        -------
+            CachedDownload: Location, hash, and size of the cached blob.
+
+        """
+        with self._lock(url):
+            entry = self.read_entry(url)
+            if self.offline:
+                if entry is None:
+                    raise FileNotFoundError(f"{url} is not in the download cache at {self.cache_dir} (offline mode)")
+                return self._hit(url, entry)
+
+            headers = {}
+            if entry is not None:
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+            # a stable name per URL, so an interrupted download is resumed by
+            # the next call
+            download_fp = self.cache_dir / "tmp" / f"{self.url_key(url)}.download"
+            result = download_file(url, download_fp, timeout=timeout, headers=headers)
+            if result.not_modified and entry is not None:
+                return self._hit(url, entry)
+            if result.not_modified:
+                raise RuntimeError(f"Unexpected 304 response from {url} to an unconditional request")
+            sha256, size = result.sha256, result.size
+            blob_fp = self.blob_fp(sha256)
+            blob_fp.parent.mkdir(exist_ok=True)
+            download_fp.replace(blob_fp)
+            entry = {
+                "url": url,
+                "sha256": sha256,
+                "size": size,
+                "etag": result.headers.get("ETag"),
+                "last_modified": result.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }
+            self._write_entry(url, entry)
+            with self._stats_lock:
+                self.stats.misses += 1
+                self.stats.bytes_fetched += result.bytes_fetched
+            return CachedDownload(url, blob_fp, sha256, size, from_cache=False, bytes_fetched=result.bytes_fetched)
@@ -0,0 +1,171 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_S = 1.0
+
+# errors after which the transfer is resumed from the partial file
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    fp: Path
+    size: int = 0
+    sha256: str | None = None
+    # bytes transferred by this call, less than `size` if a partial file from
+    # an earlier call was resumed
+    bytes_fetched: int = 0
+    n_retries: int = 0
+    # True if the server answered a conditional request with 304, nothing is
+    # written to `fp` then
+    not_modified: bool = False
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def sha256_file(fp: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    h = hashlib.sha256()
+    with fp.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def total_size_from_response(r: requests.Response, offset: int) -> int | None:
+    # "Content-Range: bytes 100-199/200" for a resumed transfer
+    content_range = r.headers.get("Content-Range")
+    if content_range is not None and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    content_length = r.headers.get("Content-Length")
+    if content_length is not None and content_length.isdigit() and "Content-Encoding" not in r.headers:
+        return offset + int(content_length)
+    return None
+
+
+def download_file(
+    url: str,
+    fp: Path,
+    timeout: float | None = 30,
+    headers: dict[str, str] | None = None,
+    expected_size: int | None = None,
+    expected_sha256: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_s: float = DEFAULT_BACKOFF_S,
+) -> DownloadResult:
+    """Stream `url` to `fp` in fixed-size chunks, with constant memory use.
+
+    The body is written to `<fp>.part` first, and renamed to `fp` once it is
+    complete and verified. After a dropped connection, a timeout (applied to
+    every chunk), or a 5xx response, the transfer is retried with
+    exponential backoff and resumed with an HTTP Range request from the end
+    of the partial file, also if the partial file was left behind by an
+    earlier call. Servers that ignore the Range header restart the transfer.
+
+    Args:
+    ----
+        url (str): The URL to download.
+        fp (Path): Where to write the body.
+        timeout (float | None): Timeout for connecting and for every chunk.
+        headers (dict[str, str] | None): Extra request headers, e.g.
+        If-None-Match for a conditional request.
+        expected_size (int | None): Size the body must have, otherwise the
+        size reported by the server is checked.
+        expected_sha256 (str | None): SHA-256 the body must have.
+        chunk_size (int): Size of the chunks written to disk.
+        max_retries (int): Retries before giving up.
+        backoff_s (float): Wait before the first retry, doubled every retry.
+
+    Returns:
+    -------
+        DownloadResult: Size, SHA-256, and transfer statistics.
+
+    """
+    part_fp = fp.with_name(f"{fp.name}.part")
+    # ETag or Last-Modified of the partial file, sent as If-Range on resume
+    validator_fp = fp.with_name(f"{fp.name}.part.validator")
+    result = DownloadResult(url, fp)
+    validator = validator_fp.read_text() if part_fp.exists() and validator_fp.exists() else None
+
+    while True:
+        offset = part_fp.stat().st_size if part_fp.exists() else 0
+        request_headers = {**(headers or {}), "Accept-Encoding": "identity"}
+        if offset > 0:
+            request_headers["Range"] = f"bytes={offset}-"
+            # only resume if the resource did not change in the meantime
+            if validator is not None:
+                request_headers["If-Range"] = validator
+
+        try:
+            with requests.get(url, headers=request_headers, stream=True, timeout=timeout) as r:
+                if r.status_code == requests.codes.not_modified:
+                    result.not_modified = True
+                    result.headers = dict(r.headers)
+                    return result
+                if r.status_code == requests.codes.requested_range_not_satisfiable:
+                    # the partial file is stale or already complete
+                    if expected_size is not None and offset == expected_size:
+                        break
+                    part_fp.unlink()
+                    continue
+                if r.status_code in RETRYABLE_STATUS_CODES:
+                    raise requests.ConnectionError(f"{r.status_code} response from {url}")
+                if r.status_code not in {requests.codes.ok, requests.codes.partial_content}:
+                    raise RuntimeError(f"Failed to download {url}: {r.status_code}")
+
+                result.headers = dict(r.headers)
+                validator = r.headers.get("ETag") or r.headers.get("Last-Modified")
+                if validator is not None:
+                    validator_fp.write_text(validator)
+                else:
+                    validator_fp.unlink(missing_ok=True)
+                resumed = r.status_code == requests.codes.partial_content
+                if resumed and not r.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                    raise RuntimeError(f"Unexpected Content-Range from {url}: {r.headers.get('Content-Range')}")
+                if not resumed:
+                    offset = 0
+                total_size = total_size_from_response(r, offset)
+
+                with part_fp.open("ab" if resumed else "wb") as f:
+                    for chunk in r.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        result.bytes_fetched += len(chunk)
+                    size = f.tell()
+        except RETRYABLE_ERRORS:
+            if result.n_retries >= max_retries:
+                raise
+            time.sleep(backoff_s * 2**result.n_retries)
+            result.n_retries += 1
+            continue
+
+        if total_size is not None and size < total_size:
+            # the server closed the connection early, resume from here
+            if result.n_retries >= max_retries:
+                raise RuntimeError(f"Download of {url} ended at {size} of {total_size} bytes")
+            result.n_retries += 1
+            continue
+        break
+
+    result.size = part_fp.stat().st_size
+    result.sha256 = sha256_file(part_fp, chunk_size)
+    validator_fp.unlink(missing_ok=True)
+    if expected_size is not None and result.size != expected_size:
+        part_fp.unlink()
+        raise RuntimeError(f"Downloaded {result.size} bytes from {url}, expected {expected_size}")
+    if expected_sha256 is not None and result.sha256 != expected_sha256:
+        part_fp.unlink()
+        raise RuntimeError(f"SHA-256 of {url} is {result.sha256}, expected {expected_sha256}")
+    part_fp.replace(fp)
+    return result
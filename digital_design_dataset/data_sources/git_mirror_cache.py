@@ -0,0 +1,156 @@
+import fcntl
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from digital_design_dataset.utils import dir_size
+
+# a mirror fetched more recently than this is used as is, without asking the
+# remote for new commits
+DEFAULT_REFRESH_AFTER_S = 60 * 60
+
+
+@dataclass
+class GitMirrorCacheStats:
+    hits: int = 0
+    misses: int = 0
+    n_fetches: int = 0
+    n_fetch_errors: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, {self.n_fetches} fetches, "
+            f"{self.n_fetch_errors} failed fetches"
+        )
+
+
+class GitMirrorCache:
+    """A persistent directory of bare, partial (`--filter=blob:none`),
+    shallow mirrors of git repositories.
+
+    Checkouts are made as lightweight worktrees of a mirror, so the only
+    blobs that are downloaded are the ones a sparse checkout needs and that
+    no earlier checkout already fetched. Every mirror is guarded by a file
+    lock, so the cache can be shared by threads and processes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        git_bin: str = "git",
+        refresh_after_s: float = DEFAULT_REFRESH_AFTER_S,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.git_bin = git_bin
+        self.refresh_after_s = refresh_after_s
+        self.stats = GitMirrorCacheStats()
+        self._stats_lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def mirror_dir(self, repo_owner: str, repo_name: str) -> Path:
+        return self.cache_dir / f"{repo_owner}__{repo_name}.git"
+
+    @contextmanager
+    def lock(self, repo_owner: str, repo_name: str) -> Iterator[None]:
+        lock_fp = self.cache_dir / f"{repo_owner}__{repo_name}.lock"
+        with lock_fp.open("a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _git(self, *args: str, cwd: Path | None = None) -> str:
+        p = subprocess.run(
+            [self.git_bin, *args],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return p.stdout.strip()
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def objects_size(self, repo_owner: str, repo_name: str) -> int:
+        return dir_size(self.mirror_dir(repo_owner, repo_name) / "objects")
+
+    def ensure_mirror(self, repo_url: str, repo_owner: str, repo_name: str, branch: str | None = None) -> str:
+        """Clone the mirror if it is not cached yet, otherwise fetch `branch`
+        if the mirror was not refreshed recently. Must be called with the
+        lock held. Returns the branch, the remote's default branch if
+        `branch` is None.
+        """
+        mirror_dir = self.mirror_dir(repo_owner, repo_name)
+        fetch_stamp_fp = mirror_dir / "last_fetch"
+        if not (mirror_dir / "HEAD").exists():
+            self._count("misses")
+            tmp_dir = mirror_dir.with_name(f"{mirror_dir.name}.tmp")
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            clone_args = ["clone", "--bare", "--depth", "1", "--filter=blob:none"]
+            if branch is not None:
+                clone_args += ["--branch", branch]
+            self._git(*clone_args, repo_url, str(tmp_dir))
+            (tmp_dir / "last_fetch").touch()
+            tmp_dir.rename(mirror_dir)
+        else:
+            self._count("hits")
+
+        if branch is None:
+            branch = self._git("symbolic-ref", "--short", "HEAD", cwd=mirror_dir)
+
+        has_branch = (
+            subprocess.run(
+                [self.git_bin, "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"],
+                cwd=mirror_dir,
+                capture_output=True,
+                check=False,
+            ).returncode
+            == 0
+        )
+        is_stale = time.time() - fetch_stamp_fp.stat().st_mtime > self.refresh_after_s
+        if not has_branch or is_stale:
+            self._count("n_fetches")
+            try:
+                self._git(
+                    "fetch",
+                    "--depth",
+                    "1",
+                    "--filter=blob:none",
+                    "origin",
+                    f"+refs/heads/{branch}:refs/heads/{branch}",
+                    cwd=mirror_dir,
+                )
+                fetch_stamp_fp.touch()
+            except subprocess.CalledProcessError:
+                # keep working from the cached commit when the remote is
+                # unreachable, unless there is nothing cached for this branch
+                self._count("n_fetch_errors")
+                if not has_branch:
+                    raise
+        return branch
+
+    def add_worktree(self, repo_owner: str, repo_name: str, branch: str, worktree_dir: Path) -> None:
+        """Create a worktree of `branch` without checking out any files. Must
+        be called with the lock held.
+        """
+        mirror_dir = self.mirror_dir(repo_owner, repo_name)
+        # drop the records of worktrees whose temp dirs are gone
+        self._git("worktree", "prune", cwd=mirror_dir)
+        self._git(
+            "worktree",
+            "add",
+            "--no-checkout",
+            "--detach",
+            str(worktree_dir),
+            f"refs/heads/{branch}",
+            cwd=mirror_dir,
+        )
@@ -3,8 +3,13 @@ import shutil
 import signal
 import subprocess
 import tempfile
+import threading
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 
+from digital_design_dataset.data_sources.git_mirror_cache import GitMirrorCache
+from digital_design_dataset.utils import dir_size
+
 
 class GithubFastDownloader:
     def __init__(
@@ -13,6 +18,8 @@ class GithubFastDownloader:
         repo_owner: str,
         repo_branch: str | None = None,
         git_bin: str | None = "git",
+        mirror_cache: GitMirrorCache | None = None,
+        repo_url: str | None = None,
     ) -> None:
         if git_bin is None:
             git_bin_match = shutil.which("git")
@@ -24,16 +31,62 @@ class GithubFastDownloader:
 
         self.repo_name = repo_name
         self.repo_owner = repo_owner
-        self.repo_url = f"https://github.com/{self.repo_owner}/{self.repo_name}.git"
+        self.repo_url = repo_url or f"https://github.com/{self.repo_owner}/{self.repo_name}.git"
         self.repo_branch = repo_branch
+        # with a mirror cache, repo_dir is a worktree of the cached mirror
+        # instead of a fresh clone
+        self.mirror_cache = mirror_cache
         self.temp_dir = tempfile.TemporaryDirectory(prefix="github_fast_downloader__")
         self.repo_dir = Path(self.temp_dir.name) / "repo"
+        # size of the git objects downloaded so far
+        self.bytes_fetched = 0
 
         # Register the cleanup function for vaious terimnations
         atexit.register(self.cleanup)
-        signal.signal(signal.SIGINT, self.signal_handler)
+        # signal handlers can only be installed from the main thread, e.g. not
+        # when retrievers are run concurrently
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.signal_handler)
+
+    @property
+    def is_cloned(self) -> bool:
+        return (self.repo_dir / ".git").exists()
+
+    def _objects_size(self) -> int:
+        if self.mirror_cache is not None:
+            return self.mirror_cache.objects_size(self.repo_owner, self.repo_name)
+        return dir_size(self.repo_dir / ".git" / "objects")
+
+    def _lock(self) -> AbstractContextManager[None]:
+        if self.mirror_cache is not None:
+            return self.mirror_cache.lock(self.repo_owner, self.repo_name)
+        return nullcontext()
+
+    def _git_path(self, path: str) -> Path:
+        # resolves paths inside the git dir, which for a worktree is not
+        # repo_dir/.git
+        p = subprocess.run(
+            [self.git_bin, "-C", str(self.repo_dir), "rev-parse", "--git-path", path],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return self.repo_dir / p.stdout.strip()
 
     def clone_repo(self) -> None:
+        if self.mirror_cache is not None:
+            with self._lock():
+                objects_size = self._objects_size()
+                self.repo_branch = self.mirror_cache.ensure_mirror(
+                    self.repo_url,
+                    self.repo_owner,
+                    self.repo_name,
+                    self.repo_branch,
+                )
+                self.mirror_cache.add_worktree(self.repo_owner, self.repo_name, self.repo_branch, self.repo_dir)
+                self.bytes_fetched += self._objects_size() - objects_size
+            return
+
         if not self.repo_branch:
             self.repo_branch = self.get_default_branch()
 
@@ -55,6 +108,7 @@ class GithubFastDownloader:
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
+        self.bytes_fetched = self._objects_size()
 
     def get_default_branch(self) -> str:
         result = subprocess.run(
@@ -85,22 +139,43 @@ class GithubFastDownloader:
         )
 
     def checkout_stuff(self, files_or_dirs: list, reset: bool = True) -> None:
-        sparse_checkout_file = Path(self.repo_dir) / ".git" / "info" / "sparse-checkout"
+        sparse_checkout_file = self._git_path("info/sparse-checkout")
+        sparse_checkout_file.parent.mkdir(parents=True, exist_ok=True)
 
         mode = "w" if reset else "a"
         with sparse_checkout_file.open(mode, encoding="utf-8") as f:
             for item in files_or_dirs:
                 f.write(f"{item}\n")
 
-        subprocess.run(
-            [self.git_bin, "-C", str(self.repo_dir), "checkout"],
+        # missing blobs are fetched into the shared mirror, so checkouts of
+        # the same mirror are serialized
+        with self._lock():
+            objects_size = self._objects_size()
+            subprocess.run(
+                [self.git_bin, "-C", str(self.repo_dir), "checkout"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            self.bytes_fetched += self._objects_size() - objects_size
+
+    def checkout_extensions(self, extensions: list[str], reset: bool = True) -> None:
+        # patterns without a "/" match files in every directory
+        self.checkout_stuff([f"*{ext}" for ext in extensions], reset=reset)
+
+    def root_tree_sha(self) -> str:
+        # trees are part of a blobless clone, so this needs no checkout, and
+        # forks or mirrors with the same files have the same root tree
+        p = subprocess.run(
+            [self.git_bin, "-C", str(self.repo_dir), "rev-parse", "HEAD^{tree}"],
             check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
         )
+        return p.stdout.strip()
 
     def reset_sparse_checkout_list(self) -> None:
-        sparse_checkout_file = Path(self.repo_dir) / ".git" / "info" / "sparse-checkout"
+        sparse_checkout_file = self._git_path("info/sparse-checkout")
         sparse_checkout_file.write_text("", encoding="utf-8")
 
     def get_path_on_disk(self, item_path: str) -> Path:
@@ -0,0 +1,471 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from math import ceil
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from digital_design_dataset.logger import build_logger
+
+GITHUB_API_URL = "https://api.github.com"
+VERILOG_REPOS_QUERY = "language:verilog language:systemverilog"
+
+# the search API never returns more than the first 1000 results of a query
+SEARCH_RESULT_CAP = 1000
+SEARCH_PER_PAGE = 100
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BACKOFF_S = 1.0
+
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+# no repository on GitHub was created before this day
+GITHUB_EPOCH = date(2007, 10, 1)
+# size (KB) of the first split of a size range without an upper bound
+SIZE_SPLIT_KB = 1000
+
+
+@dataclass(frozen=True)
+class QuerySlice:
+    """A part of a search query, restricted to repos created in a date range
+    (inclusive) and, once a single day is still too large, to a size range
+    in KB (inclusive, open ended if `size_max` is None).
+    """
+
+    created_from: date
+    created_to: date
+    size_min: int | None = None
+    size_max: int | None = None
+
+    def qualify(self, query: str) -> str:
+        qualifiers = [f"created:{self.created_from.isoformat()}..{self.created_to.isoformat()}"]
+        if self.size_min is not None:
+            size = f"{self.size_min}..{self.size_max}" if self.size_max is not None else f">={self.size_min}"
+            qualifiers.append(f"size:{size}")
+        return " ".join([query, *qualifiers])
+
+    def split(self) -> list["QuerySlice"] | None:
+        # two halves covering the slice, None if it cannot be split further
+        if self.created_from < self.created_to:
+            mid = self.created_from + (self.created_to - self.created_from) // 2
+            return [
+                QuerySlice(self.created_from, mid),
+                QuerySlice(mid + timedelta(days=1), self.created_to),
+            ]
+        size_min = self.size_min or 0
+        if self.size_max is None:
+            size_mid = max(2 * size_min, SIZE_SPLIT_KB)
+        elif self.size_max > size_min:
+            size_mid = size_min + (self.size_max - size_min) // 2
+        else:
+            return None
+        return [
+            QuerySlice(self.created_from, self.created_to, size_min, size_mid),
+            QuerySlice(self.created_from, self.created_to, size_mid + 1, self.size_max),
+        ]
+
+
+@dataclass
+class PartitionPlan:
+    query: str
+    # (qualified query, number of results) of every slice
+    slices: list[tuple[str, int]] = field(default_factory=list)
+    # slices above the cap that could not be split further
+    n_truncated: int = 0
+    # the first page of every slice, fetched while planning
+    first_pages: dict[str, dict] = field(default_factory=dict)
+
+    @property
+    def total_count(self) -> int:
+        return sum(count for _, count in self.slices)
+
+
+def process_search_item(repo: dict) -> dict:
+    return {
+        "id": repo["id"],
+        "full_name": repo["full_name"],
+        "html_url": repo["html_url"],
+    }
+
+
+class PageCheckpointStore:
+    """Search result pages on disk, one JSON file per query and page, so an
+    interrupted index run resumes where it stopped and a refresh can
+    revalidate every page with its ETag.
+    """
+
+    def __init__(self, checkpoint_dir: Path) -> None:
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def query_key(query: str) -> str:
+        return hashlib.sha256(query.encode()).hexdigest()[:16]
+
+    def page_fp(self, query: str, page: int) -> Path:
+        return self.checkpoint_dir / self.query_key(query) / f"page_{page:04d}.json"
+
+    def read(self, query: str, page: int) -> dict | None:
+        try:
+            return json.loads(self.page_fp(query, page).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write(self, query: str, page: int, data: dict) -> None:
+        fp = self.page_fp(query, page)
+        fp.parent.mkdir(exist_ok=True)
+        (fp.parent / "query.txt").write_text(query)
+        tmp_fp = fp.with_name(f".{fp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_fp.write_text(json.dumps(data))
+        tmp_fp.replace(fp)
+
+
+@dataclass
+class IndexerStats:
+    n_requests: int = 0
+    n_not_modified: int = 0
+    n_from_checkpoint: int = 0
+    n_retries: int = 0
+    n_rate_limited: int = 0
+    rate_limit_wait_s: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.n_requests} requests, {self.n_not_modified} not modified, "
+            f"{self.n_from_checkpoint} pages from checkpoints, {self.n_retries} retries, "
+            f"{self.n_rate_limited} rate limited ({self.rate_limit_wait_s:.1f}s waiting)"
+        )
+
+
+class GithubIndexer:
+    """Indexes GitHub repository search results with concurrent requests.
+
+    Requests share a pooled HTTP session and run on worker threads, with at
+    most `max_concurrency` in flight. The `X-RateLimit-*` headers of every
+    response are tracked: requests are spread out as the remaining budget
+    runs low and wait for the reset once it is used up, and rate limited or
+    failed requests are retried with backoff. Every page is written to a
+    `PageCheckpointStore`, and pages are revalidated with their ETag on a
+    refresh, which does not count against the rate limit if unchanged.
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir: Path,
+        gh_token: str | None = None,
+        api_url: str = GITHUB_API_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_s: float = DEFAULT_BACKOFF_S,
+    ) -> None:
+        self.store = PageCheckpointStore(checkpoint_dir)
+        self.api_url = api_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.stats = IndexerStats()
+        self.logger = build_logger("GithubIndexer")
+
+        self.session = requests.Session()
+        self.session.mount(self.api_url, HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        if gh_token is not None:
+            self.session.headers["Authorization"] = f"Bearer {gh_token}"
+
+        self._rate_remaining: int | None = None
+        self._rate_reset: float | None = None
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "GithubIndexer":
+        return self
+
+    def __exit__(self, exc_type: object, exc_val: object, exc_tb: object) -> None:
+        self.close()
+
+    def _update_rate_limit(self, headers: CaseInsensitiveDict) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self._rate_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self._rate_reset = float(reset)
+
+    def _rate_limit_delay(self) -> float:
+        if self._rate_remaining is None or self._rate_reset is None:
+            return 0.0
+        until_reset = max(0.0, self._rate_reset - time.time())
+        if self._rate_remaining == 0:
+            return until_reset + 1
+        # spread the requests that are left over the rest of the window once
+        # the budget gets low, instead of running into the limit
+        if self._rate_remaining < 2 * self.max_concurrency:
+            return until_reset / (self._rate_remaining + 1)
+        return 0.0
+
+    async def _wait(self, delay: float, rate_limited: bool) -> None:
+        if rate_limited:
+            self.stats.n_rate_limited += 1
+            self.stats.rate_limit_wait_s += delay
+            self.logger.info(f"Rate limited, waiting {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def _get(
+        self,
+        semaphore: asyncio.Semaphore,
+        path: str,
+        params: dict,
+        etag: str | None = None,
+    ) -> requests.Response:
+        headers = {"If-None-Match": etag} if etag is not None else {}
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                delay = self._rate_limit_delay()
+                if delay > 0:
+                    await self._wait(delay, rate_limited=True)
+                self.stats.n_requests += 1
+                try:
+                    r = await asyncio.to_thread(
+                        self.session.get,
+                        f"{self.api_url}{path}",
+                        params=params,
+                        headers=headers,
+                        timeout=30,
+                    )
+                except (requests.ConnectionError, requests.Timeout):
+                    r = None
+                if r is not None:
+                    self._update_rate_limit(r.headers)
+
+            if r is not None and r.status_code in {requests.codes.ok, requests.codes.not_modified}:
+                return r
+            if r is not None and r.status_code not in {403, 429, *RETRYABLE_STATUS_CODES}:
+                raise RuntimeError(f"GitHub API request {path} {params} failed: {r.status_code} {r.text}")
+            is_rate_limited = r is not None and (
+                r.status_code == 429  # noqa: PLR2004
+                or "Retry-After" in r.headers
+                or self._rate_remaining == 0
+                or "rate limit" in r.text.lower()
+            )
+            if r is not None and r.status_code == 403 and not is_rate_limited:  # noqa: PLR2004
+                raise RuntimeError(f"GitHub API request {path} {params} failed: {r.status_code} {r.text}")
+            if attempt == self.max_retries:
+                break
+
+            self.stats.n_retries += 1
+            backoff = self.backoff_s * 2**attempt * (1 + random.random())  # noqa: S311
+            if is_rate_limited:
+                retry_after = r.headers.get("Retry-After")
+                if retry_after is not None and retry_after.isdigit():
+                    await self._wait(float(retry_after), rate_limited=True)
+                elif self._rate_remaining == 0:
+                    await self._wait(self._rate_limit_delay(), rate_limited=True)
+                else:
+                    # secondary rate limits come without a reset time
+                    await self._wait(backoff, rate_limited=True)
+            else:
+                await self._wait(backoff, rate_limited=False)
+        status = r.status_code if r is not None else "no response"
+        raise RuntimeError(f"GitHub API request {path} {params} failed after {self.max_retries} retries: {status}")
+
+    async def fetch_search_page(
+        self,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        page: int,
+        refresh: bool = False,
+    ) -> dict:
+        """Fetch one page of repository search results, from its checkpoint
+        unless `refresh` is set, then it is revalidated with its ETag.
+        """
+        checkpoint = self.store.read(query, page)
+        if checkpoint is not None and not refresh:
+            self.stats.n_from_checkpoint += 1
+            return checkpoint
+
+        params = {"q": query, "page": page, "per_page": SEARCH_PER_PAGE}
+        etag = checkpoint.get("etag") if checkpoint is not None else None
+        r = await self._get(semaphore, "/search/repositories", params, etag=etag)
+        if r.status_code == requests.codes.not_modified and checkpoint is not None:
+            self.stats.n_not_modified += 1
+            return checkpoint
+
+        data = r.json()
+        page_data = {
+            "query": query,
+            "page": page,
+            "etag": r.headers.get("ETag"),
+            "total_count": data["total_count"],
+            "incomplete_results": data.get("incomplete_results", False),
+            "items": [process_search_item(repo) for repo in data["items"]],
+            "fetched_at": time.time(),
+        }
+        self.store.write(query, page, page_data)
+        return page_data
+
+    async def index_query_async(
+        self,
+        query: str,
+        max_pages: int | None = None,
+        refresh: bool = False,
+        semaphore: asyncio.Semaphore | None = None,
+        first_page: dict | None = None,
+    ) -> tuple[int, list[dict]]:
+        # returns the total number of results and the repos that can be
+        # fetched, deduplicated by id. `first_page` is passed in if it was
+        # already fetched, e.g. while planning partitions
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+        if first_page is None:
+            first_page = await self.fetch_search_page(semaphore, query, 1, refresh=refresh)
+        total_count = first_page["total_count"]
+        n_pages = ceil(min(total_count, SEARCH_RESULT_CAP) / SEARCH_PER_PAGE)
+        if total_count > SEARCH_RESULT_CAP:
+            self.logger.warning(
+                f"Query {query!r} has {total_count} results, only the first {SEARCH_RESULT_CAP} can be fetched",
+            )
+        if max_pages is not None:
+            n_pages = min(n_pages, max_pages)
+
+        pages = [first_page]
+        pages += await asyncio.gather(
+            *(self.fetch_search_page(semaphore, query, page, refresh=refresh) for page in range(2, n_pages + 1)),
+        )
+        repos: dict[int, dict] = {}
+        for page_data in pages:
+            for repo in page_data["items"]:
+                repos.setdefault(repo["id"], repo)
+        return total_count, list(repos.values())
+
+    def index_query(self, query: str, max_pages: int | None = None, refresh: bool = False) -> list[dict]:
+        """Index all repos that match a repository search query.
+
+        Args:
+        ----
+            query (str): The search query, e.g. "language:verilog".
+            max_pages (int | None): Only fetch this many pages.
+            refresh (bool): Revalidate pages that are already checkpointed.
+
+        Returns:
+        -------
+            list[dict]: The "id", "full_name", and "html_url" of every repo,
+            deduplicated by id.
+
+        """
+        _, repos = asyncio.run(self.index_query_async(query, max_pages=max_pages, refresh=refresh))
+        return repos
+
+    async def _plan_slice(
+        self,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        query_slice: QuerySlice,
+        refresh: bool,
+    ) -> list[tuple[str, dict, bool]]:
+        # the first page of a slice doubles as its count, and is reused when
+        # the slice is fetched
+        qualified_query = query_slice.qualify(query)
+        first_page = await self.fetch_search_page(semaphore, qualified_query, 1, refresh=refresh)
+        if first_page["total_count"] <= SEARCH_RESULT_CAP:
+            return [(qualified_query, first_page, False)]
+        halves = query_slice.split()
+        if halves is None:
+            return [(qualified_query, first_page, True)]
+        planned = await asyncio.gather(*(self._plan_slice(semaphore, query, half, refresh) for half in halves))
+        return [s for slices in planned for s in slices]
+
+    async def plan_partitions_async(
+        self,
+        query: str,
+        created_from: date = GITHUB_EPOCH,
+        created_to: date | None = None,
+        refresh: bool = False,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> PartitionPlan:
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+        root = QuerySlice(created_from, created_to or date.today())  # noqa: DTZ011
+        planned = await self._plan_slice(semaphore, query, root, refresh)
+        plan = PartitionPlan(query)
+        for qualified_query, first_page, truncated in planned:
+            # empty slices are dropped, they have nothing to fetch
+            if first_page["total_count"] > 0:
+                plan.slices.append((qualified_query, first_page["total_count"]))
+                plan.first_pages[qualified_query] = first_page
+            plan.n_truncated += truncated
+        return plan
+
+    async def index_query_partitioned_async(
+        self,
+        query: str,
+        created_from: date = GITHUB_EPOCH,
+        created_to: date | None = None,
+        refresh: bool = False,
+    ) -> tuple[PartitionPlan, list[dict]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        plan = await self.plan_partitions_async(query, created_from, created_to, refresh=refresh, semaphore=semaphore)
+        self.logger.info(f"Query {query!r} split into {len(plan.slices)} slices with {plan.total_count} results")
+        if plan.n_truncated:
+            self.logger.warning(f"{plan.n_truncated} slices are above {SEARCH_RESULT_CAP} results and truncated")
+
+        indexed = await asyncio.gather(
+            *(
+                self.index_query_async(
+                    qualified_query,
+                    refresh=refresh,
+                    semaphore=semaphore,
+                    first_page=plan.first_pages.get(qualified_query),
+                )
+                for qualified_query, _ in plan.slices
+            ),
+        )
+        repos: dict[int, dict] = {}
+        for _, slice_repos in indexed:
+            for repo in slice_repos:
+                repos.setdefault(repo["id"], repo)
+        return plan, list(repos.values())
+
+    def index_query_partitioned(
+        self,
+        query: str,
+        created_from: date = GITHUB_EPOCH,
+        created_to: date | None = None,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """Index all repos that match a search query, beyond the 1000 results
+        a single query is capped at.
+
+        The query is split by creation date, and single days by repo size,
+        recursively until every slice has at most 1000 results. The slices
+        are then fetched concurrently and the results merged.
+
+        Args:
+        ----
+            query (str): The search query, without `created:` or `size:`
+            qualifiers.
+            created_from (date): Only repos created on or after this day.
+            created_to (date | None): Only repos created on or before this
+            day, today if None.
+            refresh (bool): Revalidate pages that are already checkpointed.
+
+        Returns:
+        -------
+            list[dict]: The "id", "full_name", and "html_url" of every repo,
+            deduplicated by id.
+
+        """
+        _, repos = asyncio.run(
+            self.index_query_partitioned_async(query, created_from, created_to, refresh=refresh),
+        )
+        return repos
@@ -0,0 +1,238 @@
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar
+
+from digital_design_dataset.data_sources.data_retrievers import DataRetriever, RetrieverLimits
+from digital_design_dataset.data_sources.github_fast_downloader import GithubFastDownloader
+from digital_design_dataset.design_dataset import VERILOG_SOURCE_EXTENSIONS_SET, DesignDataset, read_complete_marker
+from digital_design_dataset.logger import build_logger
+
+
+@dataclass
+class GithubReposFetchStats:
+    n_repos: int = 0
+    n_fetched: int = 0
+    # forks and mirrors with the same root tree as a repo fetched before
+    n_duplicates: int = 0
+    n_without_sources: int = 0
+    n_failed: int = 0
+    bytes_fetched: int = 0
+    # source blobs that duplicates did not have to fetch
+    bytes_saved: int = 0
+    elapsed_time: float = 0.0
+
+    @property
+    def repos_per_s(self) -> float:
+        return self.n_repos / self.elapsed_time if self.elapsed_time > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_fetched / 1e6 / self.elapsed_time if self.elapsed_time > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.n_repos} repos in {self.elapsed_time:.1f}s ({self.repos_per_s:.2f} repos/s, "
+            f"{self.mb_per_s:.2f} MB/s), {self.n_fetched} fetched, {self.n_duplicates} duplicates, "
+            f"{self.n_without_sources} without sources, {self.n_failed} failed, "
+            f"{self.bytes_fetched / 1e6:.1f} MB fetched, {self.bytes_saved / 1e6:.1f} MB saved by deduplication"
+        )
+
+
+def flat_source_names(rel_paths: list[str]) -> dict[str, str]:
+    # sources dirs are flat, files keep their name so `include`s still
+    # resolve, unless another file of the repo has the same name
+    name_counts = Counter(Path(rel_path).name for rel_path in rel_paths)
+    return {
+        rel_path: Path(rel_path).name if name_counts[Path(rel_path).name] == 1 else rel_path.replace("/", "__")
+        for rel_path in rel_paths
+    }
+
+
+class GithubReposDatasetRetriever(DataRetriever):
+    """Turns every repo of a GitHub index, e.g. from
+    `index_all_verilog_repos`, into a design.
+
+    Repos are fetched concurrently as shallow, blobless clones and only their
+    Verilog and SystemVerilog files are checked out. A repo with the same
+    root tree as a repo fetched before, in this run or by an earlier one into
+    the same dataset, is usually a fork or a mirror and is skipped before any
+    of its files are downloaded.
+    """
+
+    dataset_name: str = "github"
+    dataset_tags: ClassVar[list[str]] = ["open_source"]
+
+    SOURCE_EXTENSIONS: ClassVar[list[str]] = sorted(VERILOG_SOURCE_EXTENSIONS_SET)
+
+    def __init__(
+        self,
+        design_dataset: DesignDataset,
+        repos: list[dict],
+        limits: RetrieverLimits | None = None,
+        n_workers: int | None = None,
+        git_bin: str = "git",
+    ) -> None:
+        super().__init__(design_dataset, limits)
+        self.repos = repos
+        self.n_workers = n_workers or (limits.max_network_jobs if limits is not None else 8)
+        self.git_bin = git_bin
+        self.fetch_stats = GithubReposFetchStats()
+        # design name of the first repo with each root tree, keyed by the
+        # fingerprint of the tree
+        self.seen_trees: dict[str, str] = {}
+        # trees whose first repo is still being fetched, set once it is done
+        self._pending_trees: dict[str, threading.Event] = {}
+        # design name of every skipped duplicate, and the design it duplicates
+        self.duplicate_of: dict[str, str] = {}
+        # bytes of the sources checked out for each design
+        self._checkout_bytes: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.logger = build_logger("GithubReposDatasetRetriever")
+
+    @staticmethod
+    def design_name_for(repo: dict) -> str:
+        repo_owner, repo_name = repo["full_name"].split("/")
+        return f"github__{repo_owner}__{repo_name}"
+
+    def get_dataset(self, overwrite: bool = False) -> None:
+        t_start = time.monotonic()
+        for design in self.design_dataset.get_design_metadata_by_dataset_name(self.dataset_name):
+            marker = read_complete_marker(self.design_dataset.design_dir(design["design_name"]))
+            if marker is not None and marker.get("fingerprint") is not None:
+                self.seen_trees.setdefault(marker["fingerprint"], design["design_name"])
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            for repo, error in zip(
+                self.repos,
+                executor.map(lambda repo: self.fetch_repo_or_error(repo, overwrite), self.repos),
+                strict=True,
+            ):
+                if error is not None:
+                    self.logger.warning(f"Failed to fetch {repo['full_name']}: {error}")
+
+        stats = self.fetch_stats
+        stats.n_repos = len(self.repos)
+        stats.elapsed_time = time.monotonic() - t_start
+        stats.bytes_saved = sum(self._checkout_bytes.get(design_name, 0) for design_name in self.duplicate_of.values())
+        self.logger.info(f"Fetched {stats}")
+
+    def fetch_repo_or_error(self, repo: dict, overwrite: bool) -> str | None:
+        # a repo that was deleted or made private since it was indexed must
+        # not stop the others
+        try:
+            self.fetch_repo(repo, overwrite)
+        except Exception as e:  # noqa: BLE001
+            with self._lock:
+                self.fetch_stats.n_failed += 1
+            return str(e)
+        return None
+
+    def claim_tree(self, fingerprint: str) -> str | None:
+        """Claims a root tree for the calling repo.
+
+        Returns None if the caller claimed the tree and must call
+        `release_tree` when done, otherwise the design name of the repo the
+        tree belongs to. While another repo with the same tree is being
+        fetched this waits for it, so a fork is only skipped once the first
+        repo made it into the dataset.
+        """
+        while True:
+            with self._lock:
+                first_design_name = self.seen_trees.get(fingerprint)
+                if first_design_name is not None:
+                    return first_design_name
+                pending = self._pending_trees.get(fingerprint)
+                if pending is None:
+                    self._pending_trees[fingerprint] = threading.Event()
+                    return None
+            pending.wait()
+
+    def release_tree(self, fingerprint: str, design_name: str | None) -> None:
+        # design_name is None if the repo failed, the next repo with the same
+        # tree then claims it
+        with self._lock:
+            if design_name is not None:
+                self.seen_trees[fingerprint] = design_name
+            self._pending_trees.pop(fingerprint).set()
+
+    def fetch_repo(self, repo: dict, overwrite: bool = False) -> None:
+        design_name = self.design_name_for(repo)
+        repo_owner, repo_name = repo["full_name"].split("/")
+        gfd = GithubFastDownloader(
+            repo_name,
+            repo_owner,
+            git_bin=self.git_bin,
+            mirror_cache=self.design_dataset.git_mirror_cache,
+            repo_url=repo.get("clone_url"),
+        )
+        try:
+            with self.network_slot():
+                gfd.clone_repo()
+                gfd.enable_sparse_checkout()
+            clone_bytes = gfd.bytes_fetched
+            fingerprint = self.design_fingerprint(gfd.root_tree_sha())
+
+            with self._lock:
+                self.fetch_stats.bytes_fetched += clone_bytes
+                self.stats.bytes_fetched += clone_bytes
+            first_design_name = self.claim_tree(fingerprint)
+            if first_design_name is None:
+                owner = None
+                try:
+                    self.fetch_sources(gfd, design_name, fingerprint, clone_bytes, overwrite)
+                    owner = design_name
+                finally:
+                    self.release_tree(fingerprint, owner)
+            elif first_design_name == design_name:
+                # fetched into the dataset by an earlier run
+                self.fetch_sources(gfd, design_name, fingerprint, clone_bytes, overwrite)
+            else:
+                with self._lock:
+                    self.duplicate_of[design_name] = first_design_name
+                    self.fetch_stats.n_duplicates += 1
+        finally:
+            gfd.cleanup()
+
+    def fetch_sources(
+        self,
+        gfd: GithubFastDownloader,
+        design_name: str,
+        fingerprint: str,
+        clone_bytes: int,
+        overwrite: bool = False,
+    ) -> None:
+        # checks out the sources of a cloned repo and commits them as a design
+        with self._lock:
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                return
+
+        with self.network_slot():
+            gfd.checkout_extensions(self.SOURCE_EXTENSIONS)
+        checkout_bytes = gfd.bytes_fetched - clone_bytes
+        rel_paths = sorted(
+            fp.relative_to(gfd.repo_dir).as_posix()
+            for fp in gfd.repo_dir.rglob("*")
+            if fp.suffix in VERILOG_SOURCE_EXTENSIONS_SET
+            and fp.is_file()
+            and not fp.is_symlink()
+            and ".git" not in fp.relative_to(gfd.repo_dir).parts
+        )
+
+        with self._lock:
+            self._checkout_bytes[design_name] = checkout_bytes
+            self.fetch_stats.bytes_fetched += checkout_bytes
+            self.stats.bytes_fetched += checkout_bytes
+            self.fetch_stats.n_fetched += 1
+            if not rel_paths:
+                self.fetch_stats.n_without_sources += 1
+                return
+            scaffold = self.stage_design(design_name, fingerprint)
+
+        with scaffold:
+            for rel_path, name in flat_source_names(rel_paths).items():
+                shutil.copyfile(gfd.repo_dir / rel_path, scaffold.source_dir / name)
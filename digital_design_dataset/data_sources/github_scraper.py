@@ -1,10 +1,15 @@
 import csv
-from math import ceil
 from pathlib import Path
 
 import requests
 from rich.pretty import pprint as pt
 
+from digital_design_dataset.data_sources.github_indexer import (
+    VERILOG_REPOS_QUERY,
+    GithubIndexer,
+    process_search_item,
+)
+
 
 def data_to_csv(data: list[dict], fp: Path) -> None:
     keys = data[0].keys()
@@ -65,66 +70,33 @@ def process_search_data(data: dict) -> list:
     """
     Process the search data from github.
     """
-    repo_list_data = data["items"]
-    # for each dict in the list extract the "id", "full_name" and "html_url"
-    # keys and add them to a new list
-    mapped_repo_list_data = []
-    for repo in repo_list_data:
-        mapped_repo_list_data.append(
-            {
-                "id": repo["id"],
-                "full_name": repo["full_name"],
-                "html_url": repo["html_url"],
-            },
-        )
-    return mapped_repo_list_data
+    # keep only the "id", "full_name" and "html_url" of each repo
+    return [process_search_item(repo) for repo in data["items"]]
 
 
 def index_all_verilog_repos(
     database_dir: Path,
     num_pages: int | None = None,
     gh_token: str | None = None,
+    refresh: bool = False,
 ) -> list:
     """
     Search all repos on github with verilog or systemverilog files.
+
+    Without `num_pages`, the query is partitioned by creation date and size
+    so that all repos are indexed, not only the first 1000 search results.
+    Pages are checkpointed under `database_dir / "github" / "index"`, an
+    interrupted run resumes from there, with refresh=True the checkpointed
+    pages are revalidated.
     """
 
     index_dir = database_dir / "github" / "index"
-    if not index_dir.exists():
-        index_dir.mkdir(parents=True, exist_ok=True)
-
-    repos_per_page = 100
-    num_total_repos = get_num_verilog_repos(gh_token=gh_token)
-    num_total_pages = int(ceil(num_total_repos / repos_per_page))
-
-    print(f"Total number of repos: {num_total_repos}")
-    print(f"Total number of pages: {num_total_pages}")
-
-    pages_to_fetch = None
-    if num_pages is not None:
-        pages_to_fetch = num_pages
-    else:
-        pages_to_fetch = num_total_pages
-
-    print(f"Fetching {pages_to_fetch} pages")
-
-    for page in range(1, pages_to_fetch + 1):
-        print(f"Fetching page: {page}")
-        print(f"Percent complete: {(page / pages_to_fetch) * 100}%")
-        print(
-            f"Percent of total repos: {(page * repos_per_page / num_total_repos) * 100}%",
-        )
-        page_data = search_verilog_repos(page=page, gh_token=gh_token)
-        processed_page_data = process_search_data(page_data)
-        data_to_csv(processed_page_data, index_dir / f"{page}.csv")
-
-    index_fps = [index_dir / f"{page}.csv" for page in range(1, pages_to_fetch + 1)]
-    repo_data = []
-    for index_fp in index_fps:
-        with open(index_fp) as index_file:
-            index_reader = csv.DictReader(index_file)
-            for row in index_reader:
-                repo_data.append(row)
+    with GithubIndexer(index_dir, gh_token=gh_token) as indexer:
+        if num_pages is None:
+            repo_data = indexer.index_query_partitioned(VERILOG_REPOS_QUERY, refresh=refresh)
+        else:
+            repo_data = indexer.index_query(VERILOG_REPOS_QUERY, max_pages=num_pages, refresh=refresh)
+        print(f"Indexed {len(repo_data)} repos: {indexer.stats}")
     return repo_data
 
 
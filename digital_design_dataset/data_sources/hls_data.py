@@ -3,8 +3,6 @@ import zipfile
 from typing import ClassVar
 
 from digital_design_dataset.data_sources.data_retrievers import DataRetriever
-from digital_design_dataset.data_sources.github_fast_downloader import GithubFastDownloader
-from digital_design_dataset.design_dataset import build_design_scaffolding
 
 
 class PolybenchRetriever(DataRetriever):
@@ -18,15 +16,12 @@ class PolybenchRetriever(DataRetriever):
     ]
 
     def get_dataset(self, overwrite: bool = False, timeout: int = 30) -> None:
-        gfd = GithubFastDownloader(
+        gfd = self.github_downloader(
             "hls-polybench",
             "stefanpie",
         )
 
-        gfd.clone_repo()
-        gfd.enable_sparse_checkout()
-
-        gfd.checkout_stuff([f"/dist/{bs}" for bs in self.BENCHMARK_SETS])
+        self.checkout_github_paths(gfd, [f"/dist/{bs}" for bs in self.BENCHMARK_SETS])
 
         for benchmark_set in self.BENCHMARK_SETS:
             set_type, set_size = benchmark_set.split("__")[1:3]
@@ -44,31 +39,30 @@ class PolybenchRetriever(DataRetriever):
                 design_name_kernel = kernel.replace("-", "_")
 
                 base_name = f"{set_type}__{set_size}__{design_name_kernel}"
-
-                scaffold = build_design_scaffolding(
-                    self.design_dataset.designs_dir,
-                    base_name,
-                    "hls_polybench",
-                    self.dataset_name,
-                    self.dataset_tags,
-                )
-                source_file_dir = scaffold.source_dir
+                design_name = f"hls_polybench__{base_name}"
 
                 # find the kernel/ip_*.zip file
                 ip_zip_fp = f"{kernel}/ip_{kernel}.zip"
-                ip_zip_data = targz.extractfile(ip_zip_fp)
-                if ip_zip_data is None:
-                    raise RuntimeError(f"Failed to find {ip_zip_fp} in {benchmark_set}")
-
-                zip_file = zipfile.ZipFile(ip_zip_data)
-                # get all files in the hdl/verilog/* directory
-                for file in zip_file.namelist():
-                    if file.startswith("hdl/verilog/"):
-                        name = file.split("/")[-1]
-                        new_fp = source_file_dir / name
-                        new_fp.write_bytes(zip_file.read(file))
-                zip_file.close()
-                ip_zip_data.close()
+                ip_zip_member = targz.getmember(ip_zip_fp)
+                fingerprint = self.design_fingerprint(benchmark_set, ip_zip_member.size, ip_zip_member.mtime)
+                if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                    continue
+                with self.stage_design(design_name, fingerprint) as scaffold:
+                    source_file_dir = scaffold.source_dir
+
+                    ip_zip_data = targz.extractfile(ip_zip_member)
+                    if ip_zip_data is None:
+                        raise RuntimeError(f"Failed to find {ip_zip_fp} in {benchmark_set}")
+
+                    zip_file = zipfile.ZipFile(ip_zip_data)
+                    # get all files in the hdl/verilog/* directory
+                    for file in zip_file.namelist():
+                        if file.startswith("hdl/verilog/"):
+                            name = file.split("/")[-1]
+                            new_fp = source_file_dir / name
+                            new_fp.write_bytes(zip_file.read(file))
+                    zip_file.close()
+                    ip_zip_data.close()
 
             targz.close()
 
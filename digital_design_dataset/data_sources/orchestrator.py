@@ -0,0 +1,107 @@
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from digital_design_dataset.data_sources.data_retrievers import (
+    DEFAULT_MAX_CPU_JOBS,
+    DEFAULT_MAX_NETWORK_JOBS,
+    DataRetriever,
+    RetrieverLimits,
+    RetrieverStats,
+)
+from digital_design_dataset.design_dataset import DesignDataset
+from digital_design_dataset.logger import build_logger
+
+
+@dataclass
+class OrchestratorReport:
+    stats: list[RetrieverStats] = field(default_factory=list)
+    elapsed_time: float = 0.0
+
+    @property
+    def failed(self) -> list[RetrieverStats]:
+        return [s for s in self.stats if s.error is not None]
+
+    @property
+    def bytes_fetched(self) -> int:
+        return sum(s.bytes_fetched for s in self.stats)
+
+    def __str__(self) -> str:
+        name_width = max([len("dataset"), *(len(s.dataset_name) for s in self.stats)])
+        lines = [
+            f"{'dataset':<{name_width}}  {'time (s)':>9}  {'MB fetched':>10}  {'built':>6}  {'skipped':>7}  status",
+        ]
+        for s in self.stats:
+            status = "ok" if s.error is None else "FAILED"
+            lines.append(
+                f"{s.dataset_name:<{name_width}}  {s.elapsed_time:>9.1f}  {s.bytes_fetched / 1e6:>10.1f}  "
+                f"{s.n_designs_built:>6}  {s.n_designs_skipped:>7}  {status}",
+            )
+        lines.append(
+            f"{len(self.stats)} retrievers, {len(self.failed)} failed, "
+            f"{self.bytes_fetched / 1e6:.1f} MB fetched in {self.elapsed_time:.1f}s",
+        )
+        return "\n".join(lines)
+
+
+class RetrieverOrchestrator:
+    """Runs several retrievers against the same dataset concurrently.
+
+    Every retriever gets its own thread, but network fetches and CPU-bound
+    conversions (e.g. Yosys BLIF/VHDL to Verilog) are gated by separate
+    semaphores shared by all retrievers, so a slow download never holds up a
+    conversion and vice versa. A retriever that raises is recorded as failed
+    in the report without stopping the others.
+    """
+
+    def __init__(
+        self,
+        design_dataset: DesignDataset,
+        retriever_classes: list[type[DataRetriever]],
+        max_network_jobs: int = DEFAULT_MAX_NETWORK_JOBS,
+        max_cpu_jobs: int = DEFAULT_MAX_CPU_JOBS,
+    ) -> None:
+        self.design_dataset = design_dataset
+        self.retriever_classes = retriever_classes
+        self.limits = RetrieverLimits(max_network_jobs, max_cpu_jobs)
+        self.logger = build_logger("RetrieverOrchestrator")
+
+    def _run_retriever(self, retriever: DataRetriever, overwrite: bool) -> RetrieverStats:
+        stats = retriever.stats
+        t_start = time.monotonic()
+        self.logger.info(f"Retrieving dataset {retriever.dataset_name}")
+        try:
+            retriever.get_dataset(overwrite=overwrite)
+        except Exception:
+            stats.error = traceback.format_exc()
+            self.logger.exception(f"Failed to retrieve dataset {retriever.dataset_name}")
+        stats.elapsed_time = time.monotonic() - t_start
+        if stats.error is None:
+            self.logger.info(f"Retrieved dataset {retriever.dataset_name} in {stats.elapsed_time:.1f}s")
+        return stats
+
+    def run(self, overwrite: bool = False) -> OrchestratorReport:
+        """Run all retrievers and wait for them to finish.
+
+        Args:
+        ----
+            overwrite (bool): Passed on to every `get_dataset` call, with
+            False designs that are already complete are skipped.
+
+        Returns:
+        -------
+            OrchestratorReport: Wall time, bytes fetched, design counts, and
+            errors of each retriever, in the order they were given.
+
+        """
+        t_start = time.monotonic()
+        retrievers = [cls(self.design_dataset, limits=self.limits) for cls in self.retriever_classes]
+        report = OrchestratorReport()
+        if retrievers:
+            with ThreadPoolExecutor(max_workers=len(retrievers), thread_name_prefix="retriever") as executor:
+                futures = [executor.submit(self._run_retriever, r, overwrite) for r in retrievers]
+                report.stats = [f.result() for f in futures]
+        self.design_dataset.design_index.save()
+        report.elapsed_time = time.monotonic() - t_start
+        return report
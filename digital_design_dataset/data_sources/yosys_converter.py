@@ -0,0 +1,127 @@
+import os
+import re
+import subprocess
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+DEFAULT_BATCH_SIZE = 32
+
+# printed by the `log` command in front of every job of a batch
+RE_JOB_MARKER = re.compile(r"^@@job (\d+)$", re.MULTILINE)
+
+
+@dataclass
+class YosysJob:
+    name: str
+    # yosys commands for this job only, the design is reset between jobs
+    script: str
+    # the job succeeded if yosys wrote all of these
+    output_fps: list[Path] = field(default_factory=list)
+
+
+@dataclass
+class YosysJobResult:
+    job: YosysJob
+    log: str
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class YosysBatchConverter:
+    """Runs many small yosys scripts, e.g. BLIF or VHDL to Verilog
+    conversions, without starting a yosys process for each of them.
+
+    Jobs are grouped into batches that run in a single yosys session, with
+    `design -reset` between jobs, and batches run in parallel. Yosys stops at
+    the first error of a session, so when a job fails its log is recorded as
+    the error of that job and the rest of the batch continues in a new
+    session.
+    """
+
+    def __init__(
+        self,
+        yosys_bin: str | Path = "yosys",
+        plugins: tuple[str, ...] = (),
+        n_workers: int = os.cpu_count() or 1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        slot: Callable[[], AbstractContextManager] = nullcontext,
+    ) -> None:
+        self.yosys_bin = yosys_bin
+        self.plugins = plugins
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+        # held while a yosys process runs, e.g. a retriever's cpu_slot
+        self.slot = slot
+
+    def _run_session(self, jobs: list[YosysJob]) -> subprocess.CompletedProcess:
+        script_lines = []
+        for i, job in enumerate(jobs):
+            script_lines += [f"log @@job {i}", job.script.strip(), "design -reset"]
+        plugin_args = [arg for plugin in self.plugins for arg in ("-m", plugin)]
+        with TemporaryDirectory() as temp_dir:
+            script_fp = Path(temp_dir) / "batch.ys"
+            script_fp.write_text("\n".join(script_lines) + "\n")
+            with self.slot():
+                return subprocess.run(
+                    [self.yosys_bin, *plugin_args, "-s", script_fp],
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+
+    def _run_batch(self, jobs: list[YosysJob]) -> list[YosysJobResult]:
+        results = []
+        while jobs:
+            p = self._run_session(jobs)
+            markers = list(RE_JOB_MARKER.finditer(p.stdout))
+            job_logs = [
+                p.stdout[m.end() : markers[i + 1].start() if i + 1 < len(markers) else len(p.stdout)].strip()
+                for i, m in enumerate(markers)
+            ]
+            if p.returncode == 0:
+                results += [YosysJobResult(job, job_log) for job, job_log in zip(jobs, job_logs, strict=False)]
+                break
+            if not markers:
+                # yosys failed before the first job, e.g. a missing plugin
+                error = f"yosys failed to start:\n{p.stdout}\n{p.stderr}"
+                results += [YosysJobResult(job, p.stdout, error) for job in jobs]
+                break
+            n_done = len(markers) - 1
+            results += [YosysJobResult(job, job_log) for job, job_log in zip(jobs[:n_done], job_logs, strict=False)]
+            results.append(YosysJobResult(jobs[n_done], job_logs[-1], f"{job_logs[-1]}\n{p.stderr}".strip()))
+            jobs = jobs[n_done + 1 :]
+
+        for result in results:
+            missing = [fp for fp in result.job.output_fps if not fp.exists()]
+            if result.ok and missing:
+                result.error = f"yosys did not write {', '.join(str(fp) for fp in missing)}"
+        return results
+
+    def run(self, jobs: list[YosysJob]) -> list[YosysJobResult]:
+        """Run all jobs.
+
+        Args:
+        ----
+            jobs (list[YosysJob]): The jobs to run.
+
+        Returns:
+        -------
+            list[YosysJobResult]: The log and, for jobs that failed, the
+            error of each job, in the order of `jobs`.
+
+        """
+        # smaller batches if there are not enough jobs to keep every worker busy
+        batch_size = max(1, min(self.batch_size, -(-len(jobs) // self.n_workers)))
+        batches = [jobs[i : i + batch_size] for i in range(0, len(jobs), batch_size)]
+        if not batches:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.n_workers, len(batches))) as executor:
+            batch_results = executor.map(self._run_batch, batches)
+            return [result for results in batch_results for result in results]
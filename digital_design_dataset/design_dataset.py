@@ -1,13 +1,47 @@
+import fcntl
 import json
-import operator
+import os
 import re
 import shutil
+import tempfile
+import threading
+import time
 from collections import Counter
 from collections.abc import Iterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-
-from github import Auth, Github
+from typing import IO, TYPE_CHECKING
+
+from digital_design_dataset.blob_store import BlobStore
+from digital_design_dataset.columnar_export import (
+    DEFAULT_MAX_PARQUET_SHARD_BYTES,
+    DEFAULT_ROW_GROUP_BYTES,
+    ParquetExporter,
+    ParquetExportStats,
+)
+from digital_design_dataset.design_index import DesignIndex
+from digital_design_dataset.design_layout import (
+    DEFAULT_DESIGN_LAYOUT,
+    check_layout,
+    design_dir_path,
+    prune_empty_fanout_dirs,
+    read_dataset_config,
+    write_dataset_config,
+)
+from digital_design_dataset.metadata_loader import DEFAULT_N_THREADS
+from digital_design_dataset.shards import (
+    DEFAULT_MAX_SHARD_BYTES,
+    ShardedDesignDataset,
+    check_shard_design_name,
+    check_shard_rel_path,
+    write_shards,
+)
+
+if TYPE_CHECKING:
+    from github import Github
+
+    from digital_design_dataset.data_sources.download_cache import DownloadCache
+    from digital_design_dataset.data_sources.git_mirror_cache import GitMirrorCache
 
 VERILOG_SOURCE_EXTENSIONS = [".v", ".sv", ".svh", ".vh", ".h", ".inc"]
 VERILOG_SOURCE_EXTENSIONS_SET = set(VERILOG_SOURCE_EXTENSIONS) | {ext.upper() for ext in VERILOG_SOURCE_EXTENSIONS}
@@ -33,12 +67,14 @@ class DirectoryNotEmptyError(FileExistsError):
     pass
 
 
-def make_dir_if_not_empty(path: Path) -> None:
+def make_dir_if_not_empty(path: Path, resume: bool = False) -> None:
+    # with resume=True a partially constructed dataset is reused, designs
+    # that were already committed are skipped by the retrievers
     if not path.exists():
         path.mkdir(parents=True, exist_ok=True)
-    elif any(path.iterdir()):
+    elif not resume and any(path.iterdir()):
         raise DirectoryNotEmptyError(
-            "Directory is not empty. Support for partially constructed datasets is not implemented yet.",
+            "Directory is not empty. Pass resume=True to continue building a partially constructed dataset.",
         )
 
 
@@ -66,8 +102,9 @@ def build_metadata(
 def build_individual_design_dir(
     dataset_designs_dir: Path,
     design_name: str,
+    layout: str = DEFAULT_DESIGN_LAYOUT,
 ) -> Path:
-    design_dir_fp = dataset_designs_dir / design_name
+    design_dir_fp = design_dir_path(dataset_designs_dir, design_name, layout)
     if design_dir_fp.exists():
         shutil.rmtree(design_dir_fp)
     design_dir_fp.mkdir(parents=True, exist_ok=True)
@@ -94,17 +131,16 @@ class DesignScaffoldingOutput:
     source_dir: Path
 
 
-def build_design_scaffolding(
+def build_named_design_scaffolding(
     dataset_designs_dir: Path,
-    design_name_base: str,
-    design_name_prefix: str,
+    design_name: str,
     dataset_name: str,
     dataset_tags: list[str],
     sources_dir_name: str = "sources",
     metadata_filename: str = "design.json",
+    layout: str = DEFAULT_DESIGN_LAYOUT,
 ) -> DesignScaffoldingOutput:
-    design_name = f"{design_name_prefix}__{design_name_base}"
-    design_dir_fp = build_individual_design_dir(dataset_designs_dir, design_name)
+    design_dir_fp = build_individual_design_dir(dataset_designs_dir, design_name, layout)
     metadata, metadata_fp = build_metadata(
         design_name,
         dataset_name,
@@ -124,14 +160,121 @@ def build_design_scaffolding(
     )
 
 
+def build_design_scaffolding(
+    dataset_designs_dir: Path,
+    design_name_base: str,
+    design_name_prefix: str,
+    dataset_name: str,
+    dataset_tags: list[str],
+    sources_dir_name: str = "sources",
+    metadata_filename: str = "design.json",
+    layout: str = DEFAULT_DESIGN_LAYOUT,
+) -> DesignScaffoldingOutput:
+    return build_named_design_scaffolding(
+        dataset_designs_dir,
+        f"{design_name_prefix}__{design_name_base}",
+        dataset_name,
+        dataset_tags,
+        sources_dir_name=sources_dir_name,
+        metadata_filename=metadata_filename,
+        layout=layout,
+    )
+
+
+# in-progress designs are built in a hidden dir below designs_dir, on the
+# same filesystem, so committing one is a single rename
+STAGING_DIR_NAME = ".staging"
+COMPLETE_MARKER_FILENAME = ".complete"
+
+
+def read_complete_marker(design_dir_fp: Path) -> dict | None:
+    try:
+        return json.loads((design_dir_fp / COMPLETE_MARKER_FILENAME).read_text())
+    except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+        return None
+
+
+STAGING_LOCK_SUFFIX = ".lock"
+STAGING_LOCK_GRACE_S = 60
+
+
+def try_lock_staging(lock_fp: Path) -> IO | None:
+    # an exclusive flock on the lock file of a staging dir is held by its
+    # writer until the design is committed or aborted, and is released by
+    # the OS if the writer dies, also for other hosts sharing the dataset
+    # over NFS. Returns the locked file, None if the lock is held.
+    try:
+        f = lock_fp.open("a")
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+def release_staging_lock(lock_file: IO) -> None:
+    Path(lock_file.name).unlink(missing_ok=True)
+    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    lock_file.close()
+
+
+@dataclass
+class StagedDesign(DesignScaffoldingOutput):
+    """A design that is being built in a private staging dir.
+
+    Nothing is visible in the dataset until `commit` writes the completion
+    marker and renames the staging dir into place, so an interrupted build
+    never leaves a half-written design behind. Used as a context manager, the
+    design is committed on success and discarded on an exception.
+    """
+
+    design_dataset: "DesignDataset" = field(repr=False)
+    final_design_dir_fp: Path
+    fingerprint: str | None = None
+    committed: bool = False
+    # the locked `<staging dir>.lock`, marks the staging dir as in use
+    lock_file: IO | None = field(default=None, repr=False)
+
+    def commit(self) -> None:
+        self.design_dataset.commit_staged_design(self)
+
+    def abort(self) -> None:
+        if not self.committed:
+            shutil.rmtree(self.design_dir_fp, ignore_errors=True)
+            self.release_lock()
+
+    def release_lock(self) -> None:
+        if self.lock_file is not None:
+            release_staging_lock(self.lock_file)
+            self.lock_file = None
+
+    def __enter__(self) -> "StagedDesign":
+        return self
+
+    def __exit__(self, exc_type: object, exc_val: BaseException | None, exc_tb: object) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
 class DesignDataset:
     def __init__(
         self,
         dataset_dir: Path,
         overwrite: bool = False,
         gh_token: str | None = None,
+        index_n_threads: int = DEFAULT_N_THREADS,
+        dedup_sources: bool = False,
+        layout: str | None = None,
+        cache_dir: Path | None = None,
+        offline: bool = False,
     ) -> None:
         self.dataset_dir = dataset_dir
+        self.index_n_threads = index_n_threads
 
         if overwrite and self.dataset_dir.exists():
             shutil.rmtree(self.dataset_dir)
@@ -139,11 +282,89 @@ class DesignDataset:
         self.dataset_dir.mkdir(parents=True, exist_ok=True)
         self.designs_dir.mkdir(parents=True, exist_ok=True)
 
+        # the layout of designs_dir is fixed when the dataset is created,
+        # existing datasets without a config are flat
+        if layout is not None:
+            check_layout(layout)
+        config = read_dataset_config(self.dataset_dir)
+        if "layout" not in config:
+            is_empty = not any(self.designs_dir.iterdir())
+            config["layout"] = layout if (layout is not None and is_empty) else DEFAULT_DESIGN_LAYOUT
+            write_dataset_config(self.dataset_dir, config)
+        self.layout: str = config["layout"]
+        if layout is not None and layout != self.layout:
+            raise ValueError(
+                f"Dataset at {self.dataset_dir} uses the {self.layout} layout, "
+                f"use migrate_layout to convert it to the {layout} layout",
+            )
+
         self.gh_token = gh_token
-        if self.gh_token is not None:
-            self.gh_api = Github(auth=Auth.Token(self.gh_token))
-        else:
-            self.gh_api = Github()
+        self._gh_api: Github | None = None
+
+        # download caches shared between builds, kept outside of dataset_dir
+        # so they survive overwrite=True
+        self.cache_dir = cache_dir
+        # offline builds only use what is already in the download cache
+        if offline and cache_dir is None:
+            raise ValueError("offline mode needs a cache_dir to serve downloads from")
+        self.offline = offline
+        self._git_mirror_cache: GitMirrorCache | None = None
+        self._download_cache: DownloadCache | None = None
+
+        self._design_index: DesignIndex | None = None
+        # serializes index updates from retrievers running in threads
+        self._index_lock = threading.RLock()
+
+        self.blob_store: BlobStore | None = None
+        if dedup_sources:
+            self.blob_store = BlobStore(self.blobs_dir)
+
+        self.clean_staging()
+
+    def __getstate__(self) -> dict:
+        # locks and lazily built clients are per process, a dataset sent to a
+        # flow worker process rebuilds them on first use
+        state = self.__dict__.copy()
+        for key in ["_index_lock", "_gh_api", "_git_mirror_cache", "_download_cache", "_design_index"]:
+            state[key] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._index_lock = threading.RLock()
+
+    @property
+    def gh_api(self) -> "Github":
+        # PyGithub is slow to import, most uses of a dataset never touch the
+        # GitHub API
+        if self._gh_api is None:
+            from github import Auth, Github  # noqa: PLC0415
+
+            if self.gh_token is not None:
+                self._gh_api = Github(auth=Auth.Token(self.gh_token))
+            else:
+                self._gh_api = Github()
+        return self._gh_api
+
+    @property
+    def git_mirror_cache(self) -> "GitMirrorCache | None":
+        if self.cache_dir is None:
+            return None
+        if self._git_mirror_cache is None:
+            from digital_design_dataset.data_sources.git_mirror_cache import GitMirrorCache  # noqa: PLC0415
+
+            self._git_mirror_cache = GitMirrorCache(self.cache_dir / "git")
+        return self._git_mirror_cache
+
+    @property
+    def download_cache(self) -> "DownloadCache | None":
+        if self.cache_dir is None:
+            return None
+        if self._download_cache is None:
+            from digital_design_dataset.data_sources.download_cache import DownloadCache  # noqa: PLC0415
+
+            self._download_cache = DownloadCache(self.cache_dir / "http", offline=self.offline)
+        return self._download_cache
 
     @property
     def root_dir(self) -> Path:
@@ -153,6 +374,14 @@ class DesignDataset:
     def designs_dir(self) -> Path:
         return self.dataset_dir / "designs"
 
+    @property
+    def blobs_dir(self) -> Path:
+        return self.dataset_dir / "blobs"
+
+    @property
+    def staging_dir(self) -> Path:
+        return self.designs_dir / STAGING_DIR_NAME
+
     @property
     def index_path(self) -> Path:
         return self.dataset_dir / "index.json"
@@ -161,31 +390,255 @@ class DesignDataset:
     def does_index_exist(self) -> bool:
         return self.index_path.exists()
 
+    @property
+    def design_index(self) -> DesignIndex:
+        if self._design_index is None:
+            self._design_index = DesignIndex(
+                self.index_path,
+                self.designs_dir,
+                n_threads=self.index_n_threads,
+                layout=self.layout,
+            )
+        return self._design_index
+
+    @property
+    def lookup_index(self) -> DesignIndex:
+        # cheap freshness check for point lookups, only rescans if designs
+        # were added or removed behind our back, `DesignIndex.get` re-reads
+        # the design.json of the design it looks up if it changed
+        if self.design_index.is_stale():
+            self.design_index.refresh()
+        return self.design_index
+
+    def design_dir(self, design_name: str) -> Path:
+        return design_dir_path(self.designs_dir, design_name, self.layout)
+
+    def _sync_designs_dir(self, index: DesignIndex) -> None:
+        if self.layout == "fanout":
+            # designs are added and removed below the hash prefix dirs, bump
+            # designs_dir so other processes notice the change
+            os.utime(self.designs_dir)
+        index.mark_designs_dir_synced()
+
+    def build_named_design_scaffolding(
+        self,
+        design_name: str,
+        dataset_name: str,
+        dataset_tags: list[str],
+    ) -> DesignScaffoldingOutput:
+        with self._index_lock:
+            index = self.lookup_index
+            scaffold = build_named_design_scaffolding(
+                self.designs_dir,
+                design_name,
+                dataset_name,
+                dataset_tags,
+                layout=self.layout,
+            )
+            index.add(scaffold.design_name)
+            self._sync_designs_dir(index)
+        return scaffold
+
+    def build_design_scaffolding(
+        self,
+        design_name_base: str,
+        design_name_prefix: str,
+        dataset_name: str,
+        dataset_tags: list[str],
+    ) -> DesignScaffoldingOutput:
+        return self.build_named_design_scaffolding(
+            f"{design_name_prefix}__{design_name_base}",
+            dataset_name,
+            dataset_tags,
+        )
+
+    def stage_design(
+        self,
+        design_name: str,
+        dataset_name: str,
+        dataset_tags: list[str],
+        fingerprint: str | None = None,
+    ) -> StagedDesign:
+        """Starts building a design in a staging dir, to be moved into the
+        dataset with `StagedDesign.commit`.
+
+        Args:
+        ----
+            design_name (str): The name of the design.
+            dataset_name (str): The name of the dataset the design belongs to.
+            dataset_tags (list[str]): The tags of the dataset.
+            fingerprint (str | None): Identifies the inputs the design is
+            built from, stored in the completion marker so a later build can
+            tell if the design is unchanged.
+
+        Returns:
+        -------
+            StagedDesign: The scaffolding of the staged design.
+
+        """
+        self.staging_dir.mkdir(exist_ok=True)
+        # the lock is taken before the staging dir exists, so a dir without
+        # a held lock is always left over from a writer that is gone
+        fd, lock_path = tempfile.mkstemp(prefix=f"{design_name}.", suffix=STAGING_LOCK_SUFFIX, dir=self.staging_dir)
+        os.close(fd)
+        lock_file = Path(lock_path).open("a")  # noqa: SIM115
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        staged_dir_fp = Path(lock_path.removesuffix(STAGING_LOCK_SUFFIX))
+        staged_dir_fp.mkdir()
+        metadata, metadata_fp = build_metadata(design_name, dataset_name, dataset_tags, dir_to_write=staged_dir_fp)
+        if metadata_fp is None:
+            raise ValueError("metadata_fp is None, not supposed to happen")
+        return StagedDesign(
+            design_name=design_name,
+            design_dir_fp=staged_dir_fp,
+            metadata=metadata,
+            metadata_fp=metadata_fp,
+            source_dir=build_sources_dir(staged_dir_fp),
+            design_dataset=self,
+            final_design_dir_fp=self.design_dir(design_name),
+            fingerprint=fingerprint,
+            lock_file=lock_file,
+        )
+
+    def commit_staged_design(self, staged: StagedDesign) -> None:
+        if staged.committed:
+            raise RuntimeError(f"Design {staged.design_name} was already committed")
+        marker_fp = staged.design_dir_fp / COMPLETE_MARKER_FILENAME
+        marker_fp.write_text(json.dumps({"fingerprint": staged.fingerprint}))
+
+        final_dir_fp = staged.final_design_dir_fp
+        # a directory cannot be atomically replaced by another, so the old
+        # design is moved aside first and only removed once the new one is
+        # in place
+        old_dir_fp = None
+        with self._index_lock:
+            index = self.lookup_index
+            if final_dir_fp.exists():
+                old_dir_fp = self.staging_dir / f"{staged.design_dir_fp.name}-old"
+                final_dir_fp.rename(old_dir_fp)
+            else:
+                final_dir_fp.parent.mkdir(parents=True, exist_ok=True)
+            staged.design_dir_fp.rename(final_dir_fp)
+            index.add(staged.design_name)
+            self._sync_designs_dir(index)
+        if old_dir_fp is not None:
+            shutil.rmtree(old_dir_fp)
+        staged.release_lock()
+
+        staged.metadata_fp = final_dir_fp / staged.metadata_fp.name
+        staged.source_dir = final_dir_fp / staged.source_dir.name
+        staged.design_dir_fp = final_dir_fp
+        staged.committed = True
+
+    def is_design_complete(self, design_name: str, fingerprint: str | None = None) -> bool:
+        """Checks if a design was committed by a completed build and, if
+        `fingerprint` is given, if it was built from the same inputs.
+        """
+        marker = read_complete_marker(self.design_dir(design_name))
+        if marker is None:
+            return False
+        return fingerprint is None or marker.get("fingerprint") == fingerprint
+
+    def clean_staging(self) -> int:
+        """Removes staging dirs left behind by builds that are gone, returns
+        the number of dirs removed. A staging dir is in use as long as its
+        writer holds the flock on `<staging dir>.lock`, which also covers
+        writers on other hosts sharing the dataset.
+        """
+        if not self.staging_dir.exists():
+            return 0
+        n_removed = 0
+        for fp in sorted(self.staging_dir.iterdir()):
+            if fp.name.endswith(STAGING_LOCK_SUFFIX):
+                continue
+            # "<design_name>.<random>", optionally with an "-old" suffix
+            lock_fp = self.staging_dir / (fp.name.removesuffix("-old") + STAGING_LOCK_SUFFIX)
+            lock_file = try_lock_staging(lock_fp) if lock_fp.exists() else None
+            if lock_fp.exists() and lock_file is None:
+                continue
+            if fp.is_dir():
+                shutil.rmtree(fp, ignore_errors=True)
+            else:
+                fp.unlink(missing_ok=True)
+            if lock_file is not None:
+                release_staging_lock(lock_file)
+            n_removed += 1
+        # locks whose staging dir is gone, skipping new ones whose writer may
+        # not have taken the lock yet
+        for lock_fp in self.staging_dir.glob(f"*{STAGING_LOCK_SUFFIX}"):
+            staged_dir_fp = lock_fp.with_name(lock_fp.name.removesuffix(STAGING_LOCK_SUFFIX))
+            try:
+                is_new = time.time() - lock_fp.stat().st_mtime < STAGING_LOCK_GRACE_S
+            except FileNotFoundError:
+                continue
+            if is_new or staged_dir_fp.exists():
+                continue
+            lock_file = try_lock_staging(lock_fp)
+            if lock_file is not None:
+                release_staging_lock(lock_file)
+        return n_removed
+
+    def write_design_file(self, fp: Path, data: bytes) -> None:
+        """Write a file into a design, deduplicated through the blob store
+        if the dataset was opened with `dedup_sources=True`.
+
+        An existing file is unlinked rather than overwritten, since it may be
+        hardlinked to a blob shared with other designs.
+        """
+        fp.unlink(missing_ok=True)
+        if self.blob_store is not None:
+            self.blob_store.add_bytes(data, fp)
+        else:
+            fp.write_bytes(data)
+
+    def copy_design_file(self, src: Path, fp: Path) -> None:
+        """Copy a file into a design, deduplicated through the blob store
+        if the dataset was opened with `dedup_sources=True`. Like
+        `write_design_file`, an existing file is unlinked first.
+        """
+        if fp.is_dir():
+            fp = fp / src.name
+        fp.unlink(missing_ok=True)
+        if self.blob_store is not None:
+            self.blob_store.add_file(src, fp)
+        else:
+            shutil.copy(src, fp)
+
     @property
     def index(self) -> list[dict]:
-        # sorted by "design_name"
-        designs = []
-        for design_dir in self.designs_dir.iterdir():
-            design_json_fp = design_dir / "design.json"
-            with design_json_fp.open() as f:
-                design = json.load(f)
-            designs.append(design)
-        designs = sorted(designs, key=operator.itemgetter("design_name"))
-        return designs
+        # sorted by "design_name", only rescans the designs if some were added
+        # or removed, otherwise re-reads the design.json files that changed
+        self.design_index.refresh_if_stale()
+        return [dict(design) for design in self.design_index.designs]
 
     @property
     def index_generator(self) -> Iterator[dict]:
         # not guaranteed to be in sorted by "design_name"
-        for design_dir in self.designs_dir.iterdir():
-            design_json_fp = design_dir / "design.json"
-            with design_json_fp.open() as f:
-                design = json.load(f)
-            yield design
+        if not self.design_index.is_stale():
+            self.design_index.revalidate()
+            for design in self.design_index.designs:
+                yield dict(design)
+            return
+        for design in self.design_index.iter_refresh():
+            yield dict(design)
+
+    def refresh_index(self) -> bool:
+        """Rescan every design and re-read the design.json files that changed
+        on disk, e.g. after copying designs into a "fanout" dataset by hand.
+
+        Returns:
+        -------
+            bool: True if any design was added, updated, or removed.
+
+        """
+        with self._index_lock:
+            return self.design_index.refresh()
 
     def summary(self) -> str:
+        index = self.index
         summary = f"Dataset at {self.dataset_dir}\n"
-        summary += f"Number of designs: {len(self.index)}\n"
-        dataset_name_counter = Counter(design["dataset_name"] for design in self.index)
+        summary += f"Number of designs: {len(index)}\n"
+        dataset_name_counter = Counter(design["dataset_name"] for design in index)
         summary += "Datasets + Design Counts:\n"
         for dataset_name, count in dataset_name_counter.items():
             summary += f"    {dataset_name}: {count}\n"
@@ -206,11 +659,9 @@ class DesignDataset:
             dict | None: The metadata of the design if found, None otherwise.
 
         """
-        metadata = None
-        for design in self.index:
-            if design["design_name"] == design_name:
-                metadata = design
-                break
+        metadata = self.lookup_index.get(design_name)
+        if metadata is not None:
+            metadata = dict(metadata)
         return metadata
 
     def get_design_metadata_by_design_name_regex(
@@ -248,7 +699,24 @@ class DesignDataset:
             given dataset name.
 
         """
-        metadata = [design for design in self.index if design["dataset_name"] == dataset_name]
+        metadata = [dict(design) for design in self.lookup_index.get_by_dataset(dataset_name)]
+        return metadata
+
+    def get_design_metadata_by_tag(self, tag: str) -> list[dict]:
+        """Retrieves all design metadata for designs that have the given tag
+        in their dataset tags.
+
+        Args:
+        ----
+            tag (str): The dataset tag.
+
+        Returns:
+        -------
+            list[dict]: A list of design metadata dictionaries with the given
+            tag.
+
+        """
+        metadata = [dict(design) for design in self.lookup_index.get_by_tag(tag)]
         return metadata
 
     def get_design_source_files(self, design_name: str) -> list[Path]:
@@ -263,21 +731,192 @@ class DesignDataset:
             list[Path]: A list of Path objects representing the source files.
 
         """
-        design_sources_dir = self.designs_dir / design_name / "sources"
+        design_sources_dir = self.design_dir(design_name) / "sources"
         source_files = list(design_sources_dir.iterdir())
         return source_files
 
-    def delete_design(self, design_name: str) -> None:
-        design = self.get_design_metadata_by_design_name(design_name)
-        if design is None:
+    def _delete_design(self, design_name: str) -> None:
+        index = self.lookup_index
+        if index.get(design_name) is None:
             raise ValueError(f"Design {design_name} not found in dataset.")
-        design_dir = self.designs_dir / design_name
+        design_dir = self.design_dir(design_name)
         shutil.rmtree(design_dir)
+        if self.layout == "fanout":
+            prune_empty_fanout_dirs(self.designs_dir, design_dir)
+        index.remove(design_name)
+        self._sync_designs_dir(index)
+
+    def delete_design(self, design_name: str) -> None:
+        self._delete_design(design_name)
+        self.design_index.save()
 
     def delete_multiple_designs(self, design_names: list[str]) -> None:
-        for design_name in design_names:
-            self.delete_design(design_name)
+        try:
+            for design_name in design_names:
+                self._delete_design(design_name)
+        finally:
+            self.design_index.save()
 
     def delete_all_designs(self) -> None:
         shutil.rmtree(self.designs_dir)
         self.designs_dir.mkdir()
+        self.design_index.clear()
+        self.design_index.refresh()
+
+    def export_shards(
+        self,
+        out_dir: Path,
+        max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES,
+        design_names: list[str] | None = None,
+    ) -> list[Path]:
+        """Packs designs, including their sources and flow outputs, into a
+        few large shard files that can be served by `ShardedDesignDataset`.
+
+        Args:
+        ----
+            out_dir (Path): Directory to write the shard files to.
+            max_shard_bytes (int): A new shard is started once the current one
+            grows past this size.
+            design_names (list[str] | None): Designs to export, all designs
+            if None.
+
+        Returns:
+        -------
+            list[Path]: The shard files that were written.
+
+        """
+        if design_names is None:
+            designs = self.index
+        else:
+            designs = []
+            for design_name in design_names:
+                design = self.get_design_metadata_by_design_name(design_name)
+                if design is None:
+                    raise ValueError(f"Design {design_name} not found in dataset.")
+                designs.append(design)
+        return write_shards(
+            [(design, self.design_dir(design["design_name"])) for design in designs],
+            out_dir,
+            max_shard_bytes=max_shard_bytes,
+        )
+
+    def export_parquet(
+        self,
+        out_dir: Path,
+        incremental: bool = True,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        max_shard_bytes: int = DEFAULT_MAX_PARQUET_SHARD_BYTES,
+        n_threads: int = DEFAULT_N_THREADS,
+    ) -> ParquetExportStats:
+        """Exports the source files of every design to Parquet shards with one
+        row per file, to be read back with `read_parquet_export`. Requires
+        pyarrow.
+
+        Args:
+        ----
+            out_dir (Path): Directory to write the shards and manifest to.
+            incremental (bool): Only export designs that are new or changed
+            since the last export to `out_dir`.
+            row_group_bytes (int): Approximate amount of file content per row
+            group.
+            max_shard_bytes (int): A new shard is started once the current one
+            holds more than this much file content.
+            n_threads (int): Number of threads used to read source files.
+
+        Returns:
+        -------
+            ParquetExportStats: Counts of written, unchanged, and removed
+            designs, and the shards that were written.
+
+        """
+        exporter = ParquetExporter(
+            self,
+            out_dir,
+            row_group_bytes=row_group_bytes,
+            max_shard_bytes=max_shard_bytes,
+            n_threads=n_threads,
+        )
+        return exporter.export(incremental=incremental)
+
+    def import_shards(self, shards_dir: Path, overwrite: bool = False) -> list[str]:
+        """Unpacks every design in the shards in `shards_dir` into this
+        dataset. Existing designs are skipped unless `overwrite` is True.
+
+        Designs are built in a staging dir and committed like a retrieved
+        design. A shard whose design names or file paths would escape the
+        design dir raises `ShardFormatError`.
+        """
+        sharded = ShardedDesignDataset(shards_dir)
+        imported = []
+        try:
+            # every shard is checked before the first design is written
+            for reader in sharded.readers:
+                for design_name, entry in reader.designs.items():
+                    check_shard_design_name(design_name)
+                    for rel_path in entry["files"]:
+                        check_shard_rel_path(design_name, rel_path)
+            for reader in sharded.readers:
+                for design_name, entry in reader.designs.items():
+                    if self.design_dir(design_name).exists() and not overwrite:
+                        continue
+                    fingerprint = None
+                    if COMPLETE_MARKER_FILENAME in entry["files"]:
+                        marker = json.loads(bytes(reader.view(design_name, COMPLETE_MARKER_FILENAME)))
+                        fingerprint = marker.get("fingerprint")
+                    metadata = entry["metadata"]
+                    with self.stage_design(
+                        design_name,
+                        metadata["dataset_name"],
+                        metadata["dataset_tags"],
+                        fingerprint=fingerprint,
+                    ) as staged:
+                        staged.metadata_fp.write_text(json.dumps(metadata, indent=4))
+                        for rel_path in entry["files"]:
+                            if rel_path == COMPLETE_MARKER_FILENAME:
+                                continue
+                            fp = staged.design_dir_fp / rel_path
+                            fp.parent.mkdir(parents=True, exist_ok=True)
+                            fp.write_bytes(reader.view(design_name, rel_path))
+                    imported.append(design_name)
+        finally:
+            sharded.close()
+        return imported
+
+    def migrate_layout(self, layout: str) -> None:
+        """Moves every design into the directory layout `layout` and records
+        the new layout in the dataset config.
+
+        Designs are moved with a rename, so this is cheap and keeps any
+        hardlinks into the blob store intact. If the migration is interrupted,
+        running it again with the same `layout` finishes it.
+
+        Args:
+        ----
+            layout (str): The new layout, one of "flat" or "fanout".
+
+        """
+        check_layout(layout)
+        old_layout = self.layout
+        if layout == old_layout:
+            return
+
+        self.design_index.refresh()
+        design_names = list(self.design_index.entries)
+        for design_name in design_names:
+            src = design_dir_path(self.designs_dir, design_name, old_layout)
+            dst = design_dir_path(self.designs_dir, design_name, layout)
+            if not src.exists():
+                # already moved by an earlier, interrupted migration
+                continue
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            src.rename(dst)
+            if old_layout == "fanout":
+                prune_empty_fanout_dirs(self.designs_dir, src)
+
+        config = read_dataset_config(self.dataset_dir)
+        config["layout"] = layout
+        write_dataset_config(self.dataset_dir, config)
+        self.layout = layout
+
+        self._design_index = None
+        self.design_index.refresh()
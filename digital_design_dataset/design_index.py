@@ -0,0 +1,274 @@
+import json
+import operator
+import os
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from digital_design_dataset.design_layout import DEFAULT_DESIGN_LAYOUT, design_dir_path
+from digital_design_dataset.metadata_loader import DEFAULT_N_THREADS, DesignMetadataLoader
+
+INDEX_FORMAT_VERSION = 1
+
+
+@dataclass
+class DesignIndexEntry:
+    mtime_ns: int
+    size: int
+    ino: int
+    metadata: dict
+
+    def matches(self, st: os.stat_result) -> bool:
+        return self.mtime_ns == st.st_mtime_ns and self.size == st.st_size and self.ino == st.st_ino
+
+
+class DesignIndex:
+    """Persistent index of the metadata of every design in a dataset.
+
+    The index is stored as a single compact JSON file. Each entry remembers the
+    `stat` signature (mtime, size, inode) of the `design.json` it was read
+    from, so a refresh only has to re-read the metadata files that changed
+    since the index was last written, e.g. when a flow records its results.
+
+    In memory, designs are also indexed by `dataset_name` and by each of their
+    `dataset_tags` so lookups do not have to scan every entry.
+
+    With the "fanout" layout, adding a design only touches its hash prefix
+    dir, so `DesignDataset` bumps the mtime of `designs_dir` on every add and
+    remove to keep `refresh_if_stale` working across processes. Designs copied
+    into a fanout tree by hand are only picked up by a full `refresh`.
+    """
+
+    def __init__(
+        self,
+        index_path: Path,
+        designs_dir: Path,
+        metadata_filename: str = "design.json",
+        n_threads: int = DEFAULT_N_THREADS,
+        layout: str = DEFAULT_DESIGN_LAYOUT,
+    ) -> None:
+        self.index_path = index_path
+        self.designs_dir = designs_dir
+        self.metadata_filename = metadata_filename
+        self.layout = layout
+        self.loader = DesignMetadataLoader(n_threads=n_threads, metadata_filename=metadata_filename, layout=layout)
+
+        self.entries: dict[str, DesignIndexEntry] = {}
+        self.by_dataset: defaultdict[str, set[str]] = defaultdict(set)
+        self.by_tag: defaultdict[str, set[str]] = defaultdict(set)
+        self.designs_dir_mtime_ns: int | None = None
+        self.dirty = False
+        self.last_refresh_changed = False
+        self._sorted_cache: list[dict] | None = None
+
+        self.load()
+
+    def _set_entry(self, design_name: str, entry: DesignIndexEntry) -> None:
+        if design_name in self.entries:
+            self._unlink_secondary(design_name)
+        self.entries[design_name] = entry
+        self.by_dataset[entry.metadata.get("dataset_name", "")].add(design_name)
+        for tag in entry.metadata.get("dataset_tags", []):
+            self.by_tag[tag].add(design_name)
+        self._sorted_cache = None
+        self.dirty = True
+
+    def _unlink_secondary(self, design_name: str) -> None:
+        metadata = self.entries[design_name].metadata
+        dataset_name = metadata.get("dataset_name", "")
+        self.by_dataset[dataset_name].discard(design_name)
+        if not self.by_dataset[dataset_name]:
+            del self.by_dataset[dataset_name]
+        for tag in metadata.get("dataset_tags", []):
+            self.by_tag[tag].discard(design_name)
+            if not self.by_tag[tag]:
+                del self.by_tag[tag]
+
+    def _del_entry(self, design_name: str) -> None:
+        self._unlink_secondary(design_name)
+        del self.entries[design_name]
+        self._sorted_cache = None
+        self.dirty = True
+
+    def _metadata_fp(self, design_name: str) -> Path:
+        return design_dir_path(self.designs_dir, design_name, self.layout) / self.metadata_filename
+
+    def load(self) -> None:
+        self.entries = {}
+        self.by_dataset.clear()
+        self.by_tag.clear()
+        self.designs_dir_mtime_ns = None
+        self._sorted_cache = None
+        try:
+            raw = self.index_path.read_bytes()
+        except FileNotFoundError:
+            return
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            # a corrupt or half-written index is simply rebuilt
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_FORMAT_VERSION:
+            return
+        self.designs_dir_mtime_ns = data.get("designs_dir_mtime_ns")
+        for design_name, (mtime_ns, size, ino, metadata) in data["designs"].items():
+            self._set_entry(design_name, DesignIndexEntry(mtime_ns, size, ino, metadata))
+        self.dirty = False
+
+    def save(self) -> None:
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "designs_dir_mtime_ns": self.designs_dir_mtime_ns,
+            "designs": {
+                name: [entry.mtime_ns, entry.size, entry.ino, entry.metadata] for name, entry in self.entries.items()
+            },
+        }
+        # write to a temp file and rename so readers never see a partial index
+        tmp_fp = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        tmp_fp.write_text(json.dumps(data, separators=(",", ":")))
+        tmp_fp.replace(self.index_path)
+        self.dirty = False
+
+    def _read_metadata(self, metadata_fp: str) -> dict:
+        with open(metadata_fp, "rb") as f:
+            return self.loader.json_loads(f.read())
+
+    def iter_refresh(self) -> Iterator[dict]:
+        """Bring the index up to date with the designs on disk, yielding the
+        metadata of each design as soon as it has been validated or loaded.
+        """
+        self.last_refresh_changed = False
+        if not self.designs_dir.exists():
+            removed = list(self.entries)
+            self.designs_dir_mtime_ns = None
+        else:
+            self.designs_dir_mtime_ns = self.designs_dir.stat().st_mtime_ns
+            seen: set[str] = set()
+            for result in self.loader.load(self.designs_dir, known=self.entries):
+                seen.add(result.design_name)
+                if result.metadata is not None:
+                    st = result.st
+                    entry = DesignIndexEntry(st.st_mtime_ns, st.st_size, st.st_ino, result.metadata)
+                    self._set_entry(result.design_name, entry)
+                    self.last_refresh_changed = True
+                yield self.entries[result.design_name].metadata
+            removed = list(self.entries.keys() - seen)
+
+        for design_name in removed:
+            self._del_entry(design_name)
+        self.last_refresh_changed = self.last_refresh_changed or bool(removed)
+
+        if self.dirty:
+            self.save()
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the designs on disk.
+
+        Returns True if any entry was added, updated, or removed.
+        """
+        for _ in self.iter_refresh():
+            pass
+        return self.last_refresh_changed
+
+    def is_stale(self) -> bool:
+        # designs were added to or removed from `designs_dir` by someone other
+        # than this index since the last refresh
+        try:
+            designs_dir_mtime_ns = self.designs_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return True
+        return designs_dir_mtime_ns != self.designs_dir_mtime_ns
+
+    def _revalidate_entry(self, design_name: str) -> bool:
+        # re-read the metadata of an indexed design if its `design.json`
+        # changed on disk, returns True if the entry was updated or removed
+        metadata_fp = self._metadata_fp(design_name)
+        try:
+            st = metadata_fp.stat()
+        except FileNotFoundError:
+            self._del_entry(design_name)
+            return True
+        if self.entries[design_name].matches(st):
+            return False
+        metadata = self._read_metadata(str(metadata_fp))
+        self._set_entry(design_name, DesignIndexEntry(st.st_mtime_ns, st.st_size, st.st_ino, metadata))
+        return True
+
+    def revalidate(self) -> bool:
+        """Re-read the metadata of the indexed designs whose `design.json`
+        changed on disk, at the cost of a `stat` per design. Designs added to
+        `designs_dir` are only picked up by `refresh`.
+
+        Returns True if any entry was updated or removed.
+        """
+        changed = False
+        for design_name in list(self.entries):
+            changed = self._revalidate_entry(design_name) or changed
+        if self.dirty:
+            self.save()
+        return changed
+
+    def refresh_if_stale(self) -> bool:
+        """Rescan `designs_dir` if designs were added to or removed from it by
+        someone other than this index since the last refresh, otherwise only
+        revalidate the indexed designs, see `revalidate`.
+
+        Returns True if any entry was added, updated, or removed.
+        """
+        if not self.is_stale():
+            return self.revalidate()
+        return self.refresh()
+
+    def mark_designs_dir_synced(self) -> None:
+        # record our own add/remove so it is not mistaken for an external change
+        try:
+            self.designs_dir_mtime_ns = self.designs_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.designs_dir_mtime_ns = None
+        self.dirty = True
+
+    def add(self, design_name: str) -> None:
+        metadata_fp = self._metadata_fp(design_name)
+        st = metadata_fp.stat()
+        metadata = self._read_metadata(str(metadata_fp))
+        self._set_entry(design_name, DesignIndexEntry(st.st_mtime_ns, st.st_size, st.st_ino, metadata))
+
+    def remove(self, design_name: str) -> None:
+        if design_name in self.entries:
+            self._del_entry(design_name)
+
+    def clear(self) -> None:
+        for design_name in list(self.entries):
+            self._del_entry(design_name)
+
+    def get(self, design_name: str) -> dict | None:
+        """Look up a single design, re-reading its metadata only if the
+        `design.json` changed on disk since it was indexed.
+        """
+        if design_name not in self.entries:
+            return None
+        self._revalidate_entry(design_name)
+        entry = self.entries.get(design_name)
+        return None if entry is None else entry.metadata
+
+    def get_many(self, design_names: set[str]) -> list[dict]:
+        metadata = [self.get(design_name) for design_name in sorted(design_names)]
+        return [m for m in metadata if m is not None]
+
+    def get_by_dataset(self, dataset_name: str) -> list[dict]:
+        return self.get_many(set(self.by_dataset.get(dataset_name, ())))
+
+    def get_by_tag(self, tag: str) -> list[dict]:
+        return self.get_many(set(self.by_tag.get(tag, ())))
+
+    @property
+    def designs(self) -> list[dict]:
+        # sorted by "design_name"
+        if self._sorted_cache is None:
+            metadata = [entry.metadata for entry in self.entries.values()]
+            self._sorted_cache = sorted(metadata, key=operator.itemgetter("design_name"))
+        return self._sorted_cache
+
+    def __len__(self) -> int:
+        return len(self.entries)
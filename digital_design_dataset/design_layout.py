@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+# "flat": designs_dir/<design_name>
+# "fanout": designs_dir/<ab>/<cd>/<design_name>, where abcd is a short hash of
+# the design name, so no single directory holds more than a few hundred entries
+DESIGN_LAYOUTS = ("flat", "fanout")
+DEFAULT_DESIGN_LAYOUT = "flat"
+
+FANOUT_LEVELS = 2
+
+
+def check_layout(layout: str) -> None:
+    if layout not in DESIGN_LAYOUTS:
+        raise ValueError(f"layout must be one of {DESIGN_LAYOUTS}, got {layout}")
+
+
+def fanout_prefix(design_name: str) -> tuple[str, ...]:
+    digest = hashlib.blake2b(design_name.encode(), digest_size=FANOUT_LEVELS).hexdigest()
+    return tuple(digest[i * 2 : i * 2 + 2] for i in range(FANOUT_LEVELS))
+
+
+def design_dir_path(designs_dir: Path, design_name: str, layout: str = DEFAULT_DESIGN_LAYOUT) -> Path:
+    if layout == "fanout":
+        return designs_dir.joinpath(*fanout_prefix(design_name), design_name)
+    return designs_dir / design_name
+
+
+def _scandir_dirs(fp: str) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(fp) as it:
+            for dir_entry in it:
+                if dir_entry.name.startswith(".") or not dir_entry.is_dir():
+                    continue
+                yield dir_entry
+    except FileNotFoundError:
+        return
+
+
+def scan_design_dirs(designs_dir: Path, layout: str = DEFAULT_DESIGN_LAYOUT) -> Iterator[os.DirEntry]:
+    """Yield a `DirEntry` for every design directory, skipping hidden entries
+    (such as in-progress staging or temp dirs).
+    """
+    if layout == "fanout":
+        for level_1 in _scandir_dirs(str(designs_dir)):
+            for level_2 in _scandir_dirs(level_1.path):
+                yield from _scandir_dirs(level_2.path)
+    else:
+        yield from _scandir_dirs(str(designs_dir))
+
+
+def prune_empty_fanout_dirs(designs_dir: Path, design_dir: Path) -> None:
+    # remove the now empty hash prefix dirs left behind by a deleted design
+    parent = design_dir.parent
+    while parent != designs_dir and designs_dir in parent.parents:
+        try:
+            parent.rmdir()
+        except OSError:
+            return
+        parent = parent.parent
+
+
+DATASET_CONFIG_FILENAME = "dataset.json"
+
+
+def read_dataset_config(dataset_dir: Path) -> dict:
+    config_fp = dataset_dir / DATASET_CONFIG_FILENAME
+    if not config_fp.exists():
+        return {}
+    return json.loads(config_fp.read_text())
+
+
+def write_dataset_config(dataset_dir: Path, config: dict) -> None:
+    config_fp = dataset_dir / DATASET_CONFIG_FILENAME
+    tmp_fp = config_fp.with_name(f".{config_fp.name}.{os.getpid()}.tmp")
+    tmp_fp.write_text(json.dumps(config, indent=4))
+    tmp_fp.replace(config_fp)
+
+
+def read_dataset_layout(dataset_dir: Path) -> str:
+    return read_dataset_config(dataset_dir).get("layout", DEFAULT_DESIGN_LAYOUT)
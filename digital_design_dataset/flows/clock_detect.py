@@ -1,17 +1,16 @@
 import json
 import re
 import shutil
-import subprocess
 from collections import defaultdict, deque
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from typing import Any, ClassVar
 
-from joblib import Parallel, delayed
-
 from digital_design_dataset.design_dataset import HARDWARE_DATA_TEXT_EXTENSIONS_SET
 from digital_design_dataset.flows.decompose import auto_top
+from digital_design_dataset.flows.flow_cache import tool_version, write_flow_manifest
 from digital_design_dataset.flows.flows import Flow
+from digital_design_dataset.flows.yosys_session import run_yosys_script
 
 
 def run_yosys_for_rtlil(
@@ -22,7 +21,6 @@ def run_yosys_for_rtlil(
     rtill_file = NamedTemporaryFile()
     portlist_file = NamedTemporaryFile()
     rtlil_file_post_proc = NamedTemporaryFile()
-    log_file = NamedTemporaryFile()
 
     script = ""
     for source_file in source_files:
@@ -36,27 +34,11 @@ def run_yosys_for_rtlil(
     script += f"write_rtlil {rtlil_file_post_proc.name};\n"
     script += f"tee -o {portlist_file.name} portlist;\n"
 
-    yosys_bin = shutil.which("yosys")
-    if yosys_bin is None:
-        raise FileNotFoundError("yosys executable not found in PATH")
-
-    p = subprocess.run(
-        [yosys_bin, "-q", "-p", script, "-l", log_file.name],
-        capture_output=True,
-        text=True,
-        check=False,
-        cwd=cwd,
-    )
-
-    if p.returncode != 0:
-        raise RuntimeError(
-            f"yosys failed with return code {p.returncode}\nSTDOUT: {p.stdout}\nSTDERR: {p.stderr}",
-        )
+    yosys_log = run_yosys_script(script, cwd=cwd).strip()
 
     data_rtlil = rtill_file.read().decode("utf-8").strip()
     data_rtlil_post_proc = rtlil_file_post_proc.read().decode("utf-8").strip()
     portlist = portlist_file.read().decode("utf-8").strip()
-    yosys_log = log_file.read().decode("utf-8").strip()
     return data_rtlil, data_rtlil_post_proc, portlist, yosys_log
 
 
@@ -220,8 +202,15 @@ class ClockDetectFlow(Flow):
     flow_name: str = "clock_detect"
     flow_tags: ClassVar[list[str]] = ["hdl", "netlist", "clock"]
 
+    def flow_tool_version(self) -> str:
+        return tool_version("yosys", "-V")
+
     def build_flow_single(self, design: dict[str, str], overwrite: bool = True) -> None:
-        design_dir = self.design_dataset.designs_dir / str(design["design_name"])
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
+        design_dir = self.design_dataset.design_dir(str(design["design_name"]))
         if not design_dir.exists():
             raise ValueError(f"Design directory {design_dir} does not exist, cannot build flow")
         sources_dir = design_dir / "sources"
@@ -242,13 +231,15 @@ class ClockDetectFlow(Flow):
         hdl_dir = flow_dir / "hdl"
         shutil.copytree(sources_dir, hdl_dir)
 
-        source_files_fps = [f for f in hdl_dir.iterdir() if f.is_file()]
+        # absolute paths so yosys runs in the session of this worker, data
+        # files are found next to the sources
+        source_files_fps = [f.resolve() for f in hdl_dir.iterdir() if f.is_file()]
 
         print(f"{design['design_name']}")
 
         top = auto_top(source_files_fps)
         print(f"Top module: {top}")
-        clock_data = detect_clocks(source_files_fps, top_module=top, cwd=flow_dir)
+        clock_data = detect_clocks(source_files_fps, top_module=top)
 
         (flow_dir / "rtlil.txt").write_text(clock_data["data_rtlil"])
         (flow_dir / "rtlil_post_proc.txt").write_text(clock_data["data_rtlil_post_proc"])
@@ -260,6 +251,4 @@ class ClockDetectFlow(Flow):
         (flow_dir / "clock_candidates.json").write_text(json.dumps(clock_data["clock_candidates"], indent=4))
         (flow_dir / "yosys_log.txt").write_text(clock_data["yosys_log"])
 
-    def build_flow(self, overwrite: bool = True, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs)(delayed(self.build_flow_single)(design, overwrite=overwrite) for design in designs)
+        write_flow_manifest(flow_dir, manifest)
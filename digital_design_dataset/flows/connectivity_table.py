@@ -1,10 +1,16 @@
 from io import StringIO
+from typing import TYPE_CHECKING
 
-import networkx as nx
-import pandas as pd
+if TYPE_CHECKING:
+    import networkx as nx
 
 
-def parse_connectivity_table(connectivity_table: str) -> nx.DiGraph:
+def parse_connectivity_table(connectivity_table: str) -> "nx.DiGraph":
+    # networkx and pandas are slow to import, only pay for them when a flow
+    # actually parses a netlist
+    import networkx as nx  # noqa: PLC0415
+    import pandas as pd  # noqa: PLC0415
+
     df = pd.read_csv(
         StringIO(connectivity_table),
         sep="\t",
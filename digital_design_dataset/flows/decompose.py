@@ -2,13 +2,13 @@ import json
 import operator
 import re
 import shutil
-import subprocess
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 
 import networkx as nx
 
 from digital_design_dataset.design_dataset import HARDWARE_DATA_TEXT_EXTENSIONS_SET
+from digital_design_dataset.flows.yosys_session import run_yosys_script
 
 
 def run_yosys_for_data(source_files: list[Path]) -> dict:
@@ -23,21 +23,7 @@ def run_yosys_for_data(source_files: list[Path]) -> dict:
     script += "proc;\n"
     script += f"write_json {json_data_file.name};\n"
 
-    yosys_bin = shutil.which("yosys")
-    if yosys_bin is None:
-        raise FileNotFoundError("yosys executable not found in PATH")
-
-    p = subprocess.run(
-        [yosys_bin, "-q", "-p", script],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-
-    if p.returncode != 0:
-        raise RuntimeError(
-            f"yosys failed with return code {p.returncode}\nSTDOUT: {p.stdout}\nSTDERR: {p.stderr}",
-        )
+    run_yosys_script(script)
 
     data_yosys = json.load(json_data_file)
 
@@ -68,21 +54,7 @@ def run_yosys_for_sub_design(
     script += f"select -list -write {rename_list_file.name} t:*$func$*;\n"
     script += f"write_verilog -noparallelcase -noattr {output_verilog_file.name};\n"
 
-    yosys_bin = shutil.which("yosys")
-    if yosys_bin is None:
-        raise FileNotFoundError("yosys executable not found in PATH")
-
-    p = subprocess.run(
-        [yosys_bin, "-q", "-p", script],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-
-    if p.returncode != 0:
-        raise RuntimeError(
-            f"yosys failed with return code {p.returncode}\nSTDOUT: {p.stdout}\nSTDERR: {p.stderr}",
-        )
+    run_yosys_script(script)
 
     source = Path(output_verilog_file.name).read_text()
     source = "\n".join(source.splitlines()[2:])
@@ -242,28 +214,17 @@ def simple_synth_check_yosys(
             temp_extra_data_file = Path(temp_dir_name) / extra_data_file.name
             shutil.copy(extra_data_file, temp_extra_data_file)
 
+    # absolute paths, yosys finds the extra data files next to the sources
     script = ""
     for temp_input in temp_inputs:
-        script += f"read_verilog {temp_input.name};\n"
+        script += f"read_verilog {temp_input.resolve()};\n"
     script += f"hierarchy -check -top {top_module};\n"
     script += "prep;\n"
 
-    yosys_bin = shutil.which("yosys")
-    if yosys_bin is None:
-        raise FileNotFoundError("yosys executable not found in PATH")
-
-    p = subprocess.run(
-        [yosys_bin, "-q", "-p", script],
-        check=False,
-        capture_output=True,
-        text=True,
-        cwd=temp_dir_name,
-    )
-
-    if p.returncode != 0:
-        print(
-            f"yosys failed with return code {p.returncode}\nSTDOUT: {p.stdout}\nSTDERR: {p.stderr}",
-        )
+    try:
+        run_yosys_script(script)
+    except RuntimeError as e:
+        print(e)
         return False
 
     return True
@@ -356,21 +317,7 @@ def yosys_read_module(module_str: str) -> dict:
     script += "proc;\n"
     script += f"write_json {output_file.name};\n"
 
-    yosys_bin = shutil.which("yosys")
-    if yosys_bin is None:
-        raise FileNotFoundError("yosys executable not found in PATH")
-
-    p = subprocess.run(
-        [yosys_bin, "-q", "-p", script],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-
-    if p.returncode != 0:
-        raise RuntimeError(
-            f"yosys failed with return code {p.returncode}\nSTDOUT: {p.stdout}\nSTDERR: {p.stderr}",
-        )
+    run_yosys_script(script)
 
     data_yosys = json.load(output_file)
 
@@ -0,0 +1,117 @@
+import functools
+import hashlib
+import json
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from digital_design_dataset.blob_store import hash_file
+
+FLOW_MANIFEST_FILENAME = "manifest.json"
+
+# recorded in the manifest but not part of the cache key, they only let an
+# unchanged design skip rehashing its sources
+SOURCE_STATS_KEY = "source_stats"
+
+
+@dataclass
+class FlowCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+@functools.cache
+def tool_version(tool_bin: str, version_arg: str = "--version") -> str:
+    # tools are not expected to change while a flow runs, so every tool is
+    # only asked once per process
+    p = subprocess.run([tool_bin, version_arg], capture_output=True, text=True, check=True)
+    return (p.stdout or p.stderr).strip()
+
+
+def source_stats(sources_dir: Path) -> dict[str, list[int]]:
+    stats = {}
+    for fp in sorted(sources_dir.iterdir()):
+        if fp.is_file():
+            st = fp.stat()
+            stats[fp.name] = [st.st_size, st.st_mtime_ns]
+    return stats
+
+
+def hash_sources(sources_dir: Path, stats: dict[str, list[int]]) -> str:
+    h = hashlib.sha256()
+    for name in stats:
+        h.update(f"{name}\0{hash_file(sources_dir / name)}\0".encode())
+    return h.hexdigest()
+
+
+def build_flow_manifest(
+    sources_dir: Path,
+    flow_name: str,
+    flow_version: int,
+    settings: dict[str, Any],
+    tool_version: str | None,
+    previous: dict | None = None,
+) -> dict:
+    """Build the manifest of a flow run on one design, everything the flow
+    results depend on.
+
+    Args:
+    ----
+        sources_dir (Path): The sources dir of the design.
+        flow_name (str): The name of the flow.
+        flow_version (int): The version of the flow implementation.
+        settings (dict[str, Any]): The flow settings, e.g. the rendered tool
+        script or the part, must be JSON serializable.
+        tool_version (str | None): The version output of the tool the flow
+        runs, None if the flow runs no tool.
+        previous (dict | None): The manifest of the last run, its source
+        hash is reused if the size and mtime of every source are unchanged.
+
+    Returns:
+    -------
+        dict: The manifest.
+
+    """
+    stats = source_stats(sources_dir)
+    if previous is not None and previous.get(SOURCE_STATS_KEY) == stats:
+        sources_sha256 = previous["sources_sha256"]
+    else:
+        sources_sha256 = hash_sources(sources_dir, stats)
+    return {
+        "flow_name": flow_name,
+        "flow_version": flow_version,
+        "sources_sha256": sources_sha256,
+        # round trip through JSON so tuples and paths compare equal to a
+        # manifest read back from disk
+        "settings": json.loads(json.dumps(settings, default=str)),
+        "tool_version": tool_version,
+        SOURCE_STATS_KEY: stats,
+    }
+
+
+def manifests_match(manifest: dict, other: dict | None) -> bool:
+    if other is None:
+        return False
+    return {k: v for k, v in manifest.items() if k != SOURCE_STATS_KEY} == {
+        k: v for k, v in other.items() if k != SOURCE_STATS_KEY
+    }
+
+
+def read_flow_manifest(flow_dir: Path) -> dict | None:
+    try:
+        return json.loads((flow_dir / FLOW_MANIFEST_FILENAME).read_text())
+    except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+        return None
+
+
+def write_flow_manifest(flow_dir: Path, manifest: dict) -> None:
+    # written last, after every result of the flow, so a run that failed
+    # halfway is never taken for a complete one
+    flow_dir.mkdir(parents=True, exist_ok=True)
+    tmp_fp = flow_dir / f".{FLOW_MANIFEST_FILENAME}.tmp"
+    tmp_fp.write_text(json.dumps(manifest, indent=4))
+    tmp_fp.replace(flow_dir / FLOW_MANIFEST_FILENAME)
@@ -0,0 +1,299 @@
+import asyncio
+import json
+import os
+import pickle
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from digital_design_dataset.flows.flows import Flow
+
+FLOW_EXECUTOR_BACKENDS = ("process", "thread", "asyncio")
+
+# lines of a failed design's output kept in its result
+ERROR_TAIL_LINES = 40
+
+
+class FlowTimeoutError(TimeoutError):
+    pass
+
+
+@dataclass
+class FlowJobResult:
+    design_name: str
+    # "ok", "failed" or "timeout"
+    status: str
+    duration: float
+    error: str | None = None
+    # set by the scheduler, see `RuntimePredictor`
+    predicted_duration: float | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+@dataclass
+class FlowRunReport:
+    flow_name: str
+    backend: str
+    n_jobs: int
+    results: list[FlowJobResult] = field(default_factory=list)
+    # designs skipped because their results were up to date
+    n_cached: int = 0
+    elapsed_time: float = 0.0
+    # the makespan the scheduler expected, None without history to predict
+    # durations in seconds
+    predicted_makespan: float | None = None
+
+    @property
+    def succeeded(self) -> list[FlowJobResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> list[FlowJobResult]:
+        return [r for r in self.results if r.status == "failed"]
+
+    @property
+    def timed_out(self) -> list[FlowJobResult]:
+        return [r for r in self.results if r.status == "timeout"]
+
+    @property
+    def designs_per_s(self) -> float:
+        return len(self.results) / self.elapsed_time if self.elapsed_time > 0 else 0.0
+
+    def table(self) -> list[dict[str, Any]]:
+        # one row per design, e.g. for `pandas.DataFrame(report.table())`
+        return [asdict(r) for r in self.results]
+
+    def __str__(self) -> str:
+        lines = [
+            f"Flow {self.flow_name} ({self.backend}, {self.n_jobs} jobs): {len(self.succeeded)} ok, "
+            f"{len(self.failed)} failed, {len(self.timed_out)} timed out, {self.n_cached} cached "
+            f"in {self.elapsed_time:.1f}s ({self.designs_per_s:.2f} designs/s)",
+        ]
+        if self.predicted_makespan is not None:
+            lines.append(f"  predicted makespan {self.predicted_makespan:.1f}s, actual {self.elapsed_time:.1f}s")
+        for r in self.results:
+            if not r.ok:
+                error = (r.error or "").strip().splitlines()
+                lines.append(f"  {r.status:<7}  {r.duration:>8.1f}s  {r.design_name}: {error[-1] if error else ''}")
+        return "\n".join(lines)
+
+
+def _raise_timeout(_signum: int, _frame: object) -> None:
+    raise FlowTimeoutError
+
+
+def run_flow_job(
+    flow: "Flow",
+    design: dict[str, Any],
+    overwrite: bool,
+    timeout_s: float | None = None,
+    manifest: dict | None = None,
+) -> FlowJobResult:
+    """Runs a flow on one design and records the outcome instead of raising.
+
+    `manifest` is the flow manifest `Flow.designs_to_build` computed for the
+    design, handed to the flow so it does not check its cache again.
+
+    In the main thread of a process the timeout interrupts the flow with
+    SIGALRM, `subprocess.run` kills the tool it is waiting on when that
+    happens. Elsewhere the timeout is not enforced.
+    """
+    use_alarm = timeout_s is not None and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    if manifest is not None:
+        flow.planned_manifests[design["design_name"]] = manifest
+    t_start = time.monotonic()
+    try:
+        flow.build_flow_single(design, overwrite=overwrite)
+    except FlowTimeoutError:
+        return FlowJobResult(
+            design["design_name"],
+            "timeout",
+            time.monotonic() - t_start,
+            f"timed out after {timeout_s}s",
+        )
+    except Exception:  # noqa: BLE001
+        return FlowJobResult(design["design_name"], "failed", time.monotonic() - t_start, traceback.format_exc())
+    finally:
+        # not taken if the flow failed before checking its cache
+        flow.planned_manifests.pop(design["design_name"], None)
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    return FlowJobResult(design["design_name"], "ok", time.monotonic() - t_start)
+
+
+class FlowExecutor:
+    """Runs a flow over many designs and collects a `FlowRunReport`.
+
+    Backends:
+    - "process": a pool of worker processes, with n_jobs=1 the designs run
+    in the calling process. Timeouts interrupt the design in its worker.
+    - "thread": a pool of threads, for flows that mostly wait on external
+    tools. Threads cannot be interrupted, so timeouts are not supported.
+    - "asyncio": every design runs in its own Python subprocess, driven by an
+    asyncio event loop. A design that times out is killed together with
+    every tool it started, at the cost of an interpreter start per design,
+    which suits long vendor tool runs.
+
+    Designs are dispatched in the order given, `Flow.build_flow` puts the
+    longest first. A design that raises is recorded as failed and the other
+    designs keep running. Progress counts completed designs, not dispatched
+    ones.
+    """
+
+    def __init__(
+        self,
+        backend: str = "process",
+        n_jobs: int = 1,
+        timeout_s: float | None = None,
+        progress: bool = True,
+    ) -> None:
+        if backend not in FLOW_EXECUTOR_BACKENDS:
+            raise ValueError(f"backend must be one of {FLOW_EXECUTOR_BACKENDS}, got {backend}")
+        if n_jobs < 1:
+            raise ValueError("n_jobs must be greater than 0")
+        if backend == "thread" and timeout_s is not None:
+            raise ValueError("The thread backend cannot interrupt a design, use the process or asyncio backend")
+        self.backend = backend
+        self.n_jobs = n_jobs
+        self.timeout_s = timeout_s
+        self.progress = progress
+
+    def run(
+        self,
+        flow: "Flow",
+        designs: list[dict[str, Any]],
+        overwrite: bool = False,
+        manifests: dict[str, dict] | None = None,
+    ) -> FlowRunReport:
+        import tqdm  # noqa: PLC0415
+
+        # the manifests computed by `Flow.designs_to_build`, by design name
+        manifests = manifests or {}
+        report = FlowRunReport(flow.flow_name, self.backend, self.n_jobs)
+        t_start = time.monotonic()
+        with tqdm.tqdm(total=len(designs), desc=flow.flow_name, unit="design", disable=not self.progress) as bar:
+
+            def on_result(result: FlowJobResult) -> None:
+                report.results.append(result)
+                bar.update(1)
+                bar.set_postfix(failed=len(report.results) - len(report.succeeded), refresh=False)
+
+            if self.backend == "asyncio":
+                asyncio.run(self._run_asyncio(flow, designs, overwrite, manifests, on_result))
+            elif self.backend == "process" and self.n_jobs == 1:
+                for design in designs:
+                    manifest = manifests.get(design["design_name"])
+                    on_result(run_flow_job(flow, design, overwrite, self.timeout_s, manifest))
+            else:
+                executor: Executor = (
+                    ProcessPoolExecutor(max_workers=self.n_jobs)
+                    if self.backend == "process"
+                    else ThreadPoolExecutor(max_workers=self.n_jobs)
+                )
+                with executor:
+                    futures = [
+                        executor.submit(
+                            run_flow_job,
+                            flow,
+                            design,
+                            overwrite,
+                            self.timeout_s,
+                            manifests.get(design["design_name"]),
+                        )
+                        for design in designs
+                    ]
+                    for future in as_completed(futures):
+                        on_result(future.result())
+        report.elapsed_time = time.monotonic() - t_start
+        return report
+
+    async def _run_asyncio(
+        self,
+        flow: "Flow",
+        designs: list[dict[str, Any]],
+        overwrite: bool,
+        manifests: dict[str, dict],
+        on_result: Callable[[FlowJobResult], None],
+    ) -> None:
+        slots = asyncio.Semaphore(self.n_jobs)
+        with TemporaryDirectory(prefix="flow_executor__") as tmp_dir:
+            flow_fp = Path(tmp_dir) / "flow.pkl"
+            flow_fp.write_bytes(pickle.dumps(flow))
+
+            async def run_one(i: int, design: dict[str, Any]) -> None:
+                job_fp = Path(tmp_dir) / f"job_{i}.json"
+                job = {"design": design, "overwrite": overwrite, "manifest": manifests.get(design["design_name"])}
+                job_fp.write_text(json.dumps(job))
+                result_fp = Path(tmp_dir) / f"result_{i}.json"
+                async with slots:
+                    t_start = time.monotonic()
+                    # a new session, so a timeout kills the tools started by
+                    # the flow as well
+                    proc = await asyncio.create_subprocess_exec(
+                        sys.executable,
+                        "-m",
+                        __name__,
+                        str(flow_fp),
+                        str(job_fp),
+                        str(result_fp),
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT,
+                        start_new_session=True,
+                    )
+                    try:
+                        output, _ = await asyncio.wait_for(proc.communicate(), timeout=self.timeout_s)
+                    except TimeoutError:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                        await proc.wait()
+                        on_result(
+                            FlowJobResult(
+                                design["design_name"],
+                                "timeout",
+                                time.monotonic() - t_start,
+                                f"timed out after {self.timeout_s}s",
+                            ),
+                        )
+                        return
+                if result_fp.exists():
+                    on_result(FlowJobResult(**json.loads(result_fp.read_text())))
+                else:
+                    tail = "\n".join(output.decode(errors="replace").splitlines()[-ERROR_TAIL_LINES:])
+                    on_result(
+                        FlowJobResult(
+                            design["design_name"],
+                            "failed",
+                            time.monotonic() - t_start,
+                            f"worker exited with code {proc.returncode}\n{tail}",
+                        ),
+                    )
+
+            await asyncio.gather(*(run_one(i, design) for i, design in enumerate(designs)))
+
+
+def main(argv: list[str]) -> None:
+    # the worker of the asyncio backend: <flow.pkl> <job.json> <result.json>
+    flow_fp, job_fp, result_fp = (Path(arg) for arg in argv)
+    flow = pickle.loads(flow_fp.read_bytes())  # noqa: S301
+    job = json.loads(job_fp.read_text())
+    result = run_flow_job(flow, job["design"], job["overwrite"], manifest=job.get("manifest"))
+    result_fp.write_text(json.dumps(asdict(result)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
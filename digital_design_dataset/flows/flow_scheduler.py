@@ -0,0 +1,135 @@
+import heapq
+import json
+import math
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from digital_design_dataset.design_dataset import VERILOG_SOURCE_EXTENSIONS_SET
+
+if TYPE_CHECKING:
+    from digital_design_dataset.flows.flow_executor import FlowJobResult
+
+FLOW_HISTORY_DIRNAME = "flow_history"
+
+COST_FEATURES = ("n_bytes", "n_lines", "n_modules")
+
+RE_MODULE_KEYWORD = re.compile(rb"^\s*module\b", re.MULTILINE)
+
+
+def design_cost_features(sources_dir: Path) -> dict[str, int]:
+    # cheap proxies for how long a flow takes on a design, lines and modules
+    # only count in the Verilog sources
+    features = dict.fromkeys(COST_FEATURES, 0)
+    for fp in sources_dir.iterdir():
+        if not fp.is_file():
+            continue
+        if fp.suffix not in VERILOG_SOURCE_EXTENSIONS_SET:
+            features["n_bytes"] += fp.stat().st_size
+            continue
+        data = fp.read_bytes()
+        features["n_bytes"] += len(data)
+        features["n_lines"] += data.count(b"\n")
+        features["n_modules"] += len(RE_MODULE_KEYWORD.findall(data))
+    return features
+
+
+def simulate_makespan(durations: Iterable[float], n_jobs: int) -> float:
+    # the makespan of dispatching the jobs in the given order to the first
+    # free of n_jobs workers
+    workers = [0.0] * n_jobs
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers)
+
+
+class FlowHistory:
+    """The features and duration of the last run of a flow on every design,
+    kept in `<dataset>/flow_history/<flow_name>.json`.
+
+    Designs that failed are not recorded, how fast a design fails says
+    little about how long it takes. Designs that timed out are recorded with
+    the timeout as their duration, a lower bound that still ranks them among
+    the longest.
+    """
+
+    def __init__(self, history_fp: Path) -> None:
+        self.history_fp = history_fp
+        try:
+            self.runs: dict[str, dict] = json.loads(history_fp.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.runs = {}
+
+    def record(self, result: "FlowJobResult", features: dict[str, int]) -> None:
+        if result.status == "failed":
+            return
+        self.runs[result.design_name] = {
+            "status": result.status,
+            "duration": result.duration,
+            "features": features,
+        }
+
+    def save(self) -> None:
+        self.history_fp.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fp = self.history_fp.with_name(f".{self.history_fp.name}.tmp")
+        tmp_fp.write_text(json.dumps(self.runs, indent=4))
+        tmp_fp.replace(self.history_fp)
+
+
+class RuntimePredictor:
+    """Predicts the duration of a flow on a design.
+
+    A design the flow ran on before is predicted to take as long as it did
+    last time. Other designs use a power law of the cost features, fit by
+    least squares in log space on the history of the flow. Without enough
+    history the prediction is proportional to the source size and not in
+    seconds, which still orders designs, see `calibrated`.
+    """
+
+    def __init__(self, history: FlowHistory) -> None:
+        self.history = history
+        self.coef: list[float] | None = None
+        self.s_per_byte: float | None = None
+        self.fit()
+
+    @property
+    def calibrated(self) -> bool:
+        return self.coef is not None or self.s_per_byte is not None
+
+    @staticmethod
+    def _row(features: dict[str, int]) -> list[float]:
+        return [1.0] + [math.log1p(features.get(k, 0)) for k in COST_FEATURES]
+
+    def fit(self) -> None:
+        runs = [run for run in self.history.runs.values() if run["duration"] > 0]
+        if not runs:
+            return
+        total_bytes = sum(run["features"]["n_bytes"] for run in runs)
+        if total_bytes > 0:
+            self.s_per_byte = sum(run["duration"] for run in runs) / total_bytes
+        if len(runs) <= len(COST_FEATURES) + 1:
+            return
+
+        import numpy as np  # noqa: PLC0415
+
+        x = np.array([self._row(run["features"]) for run in runs])
+        y = np.log(np.array([run["duration"] for run in runs]))
+        coef, *_ = np.linalg.lstsq(x, y, rcond=None)
+        self.coef = coef.tolist()
+
+    def predict(self, design_name: str, features: dict[str, int]) -> float:
+        model = None
+        if self.coef is not None:
+            model = math.exp(sum(c * v for c, v in zip(self.coef, self._row(features), strict=True)))
+        elif self.s_per_byte is not None:
+            model = self.s_per_byte * features["n_bytes"]
+
+        last_run = self.history.runs.get(design_name)
+        if last_run is not None:
+            if last_run["status"] == "ok" or model is None:
+                return last_run["duration"]
+            return max(last_run["duration"], model)
+        if model is None:
+            return float(features["n_bytes"])
+        return model
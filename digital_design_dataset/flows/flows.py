@@ -1,35 +1,197 @@
+import fcntl
 import json
 import logging
 import shutil
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar
-
-import networkx as nx
-import tqdm
-from joblib import Parallel, delayed
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from digital_design_dataset.design_dataset import (
     VERILOG_SOURCE_EXTENSIONS_SET,
     DesignDataset,
 )
 from digital_design_dataset.flows.design_hierarchy import extract_design_hierarchy
+from digital_design_dataset.flows.flow_cache import (
+    SOURCE_STATS_KEY,
+    FlowCacheStats,
+    build_flow_manifest,
+    manifests_match,
+    read_flow_manifest,
+    tool_version,
+    write_flow_manifest,
+)
+from digital_design_dataset.flows.flow_executor import FlowExecutor, FlowRunReport
+from digital_design_dataset.flows.flow_scheduler import (
+    FLOW_HISTORY_DIRNAME,
+    FlowHistory,
+    RuntimePredictor,
+    design_cost_features,
+    simulate_makespan,
+)
 from digital_design_dataset.flows.verilog_ast import verilog_ast
 from digital_design_dataset.flows.yosys_aig import yosys_aig, yosys_simple_synth
+from digital_design_dataset.flows.yosys_frontend import FRONTEND_RTLIL_FILENAME, yosys_frontend
 from digital_design_dataset.flows.yosys_synth_intel import yosys_synth_intel
 from digital_design_dataset.flows.yosys_synth_lattice import yosys_synth_lattice
 from digital_design_dataset.flows.yosys_synth_xilinx import yosys_synth_xilinx
 from digital_design_dataset.logger import build_logger
 
+if TYPE_CHECKING:
+    import networkx as nx
+
+
+def node_link_data(g: "nx.DiGraph") -> dict:
+    import networkx as nx  # noqa: PLC0415
+
+    return nx.node_link_data(g, edges="edges")
+
 
 class Flow(ABC):
     flow_name: str
     flow_tags: ClassVar[list[str]]
 
+    # bump to invalidate every cached result of this flow, e.g. after changing
+    # the script it runs
+    flow_version: ClassVar[int] = 1
+
     def __init__(self, design_dataset: DesignDataset) -> None:
         self.design_dataset = design_dataset
+        self.cache_stats = FlowCacheStats()
+        # manifests already computed by `designs_to_build` for the designs
+        # dispatched by `build_flow`, taken by `check_flow_cache`
+        self.planned_manifests: dict[str, dict] = {}
 
-    def build_flow(self, overwrite: bool = False) -> None:
-        raise NotImplementedError
+    def build_flow(
+        self,
+        overwrite: bool = False,
+        n_jobs: int = 1,
+        backend: str = "process",
+        timeout_s: float | None = None,
+        progress: bool = True,
+        longest_first: bool = True,
+    ) -> FlowRunReport:
+        """Runs the flow on every design whose results are missing or out of
+        date.
+
+        The duration of every design is predicted from its sources and the
+        history of the flow, and the longest designs start first, so a few
+        large designs do not run alone at the end. The history is updated
+        with the durations of this run.
+
+        Args:
+        ----
+            overwrite (bool): Rerun the flow on every design.
+            n_jobs (int): The number of designs to run at the same time.
+            backend (str): "process", "thread" or "asyncio", see
+            `FlowExecutor`.
+            timeout_s (float | None): A design that runs longer is stopped
+            and recorded as timed out.
+            progress (bool): Show a progress bar.
+            longest_first (bool): Order the designs by predicted duration,
+            otherwise they run in index order.
+
+        Returns:
+        -------
+            FlowRunReport: The outcome and duration of every design that ran.
+
+        """
+        manifests: dict[str, dict] = {}
+        designs = self.designs_to_build(overwrite, manifests=manifests)
+        history = FlowHistory(self.design_dataset.root_dir / FLOW_HISTORY_DIRNAME / f"{self.flow_name}.json")
+        predictor = RuntimePredictor(history)
+        features = {}
+        predicted = {}
+        for design in designs:
+            design_name = design["design_name"]
+            features[design_name] = design_cost_features(self.design_dataset.design_dir(design_name) / "sources")
+            predicted[design_name] = predictor.predict(design_name, features[design_name])
+        if longest_first:
+            designs = sorted(designs, key=lambda d: predicted[d["design_name"]], reverse=True)
+
+        executor = FlowExecutor(backend=backend, n_jobs=n_jobs, timeout_s=timeout_s, progress=progress)
+        report = executor.run(self, designs, overwrite=overwrite, manifests=manifests)
+        report.n_cached = self.cache_stats.hits
+        if predictor.calibrated:
+            report.predicted_makespan = simulate_makespan(
+                (predicted[d["design_name"]] for d in designs),
+                executor.n_jobs,
+            )
+        for result in report.results:
+            if predictor.calibrated:
+                result.predicted_duration = predicted[result.design_name]
+            history.record(result, features[result.design_name])
+        history.save()
+        build_logger(type(self).__name__, logging.INFO).info(str(report))
+        return report
+
+    def flow_dir(self, design_name: str) -> Path:
+        return self.design_dataset.design_dir(design_name) / "flows" / self.flow_name
+
+    def flow_settings(self, design: dict[str, Any]) -> dict[str, Any]:
+        # everything besides the sources and the tool version that the
+        # results of the flow depend on
+        return {}
+
+    def flow_tool_version(self) -> str | None:
+        return None
+
+    def check_flow_cache(self, design: dict[str, Any], overwrite: bool = False) -> dict | None:
+        """Checks the manifest of the last run of the flow on a design.
+
+        Args:
+        ----
+            design (dict[str, Any]): The design metadata.
+            overwrite (bool): If True, the results are never up to date.
+
+        Returns:
+        -------
+            dict | None: None if the results of the last run are up to date,
+            otherwise the manifest to write with `write_flow_manifest` once
+            the flow has run.
+
+        """
+        planned = self.planned_manifests.pop(design["design_name"], None)
+        if planned is not None:
+            # checked by `designs_to_build` right before the design was
+            # dispatched, skip hashing the sources again
+            return planned
+        flow_dir = self.flow_dir(design["design_name"])
+        previous = read_flow_manifest(flow_dir)
+        manifest = build_flow_manifest(
+            self.design_dataset.design_dir(design["design_name"]) / "sources",
+            self.flow_name,
+            self.flow_version,
+            self.flow_settings(design),
+            self.flow_tool_version(),
+            previous=previous,
+        )
+        if overwrite or previous is None or not manifests_match(manifest, previous):
+            return manifest
+        if previous.get(SOURCE_STATS_KEY) != manifest[SOURCE_STATS_KEY]:
+            # same sources with new mtimes, e.g. after a copy
+            write_flow_manifest(flow_dir, manifest)
+        return None
+
+    def designs_to_build(
+        self,
+        overwrite: bool = False,
+        manifests: dict[str, dict] | None = None,
+    ) -> list[dict[str, Any]]:
+        # the designs whose results are missing or out of date, their new
+        # manifests are added to `manifests` if given
+        self.cache_stats = FlowCacheStats()
+        designs = []
+        for design in self.design_dataset.index:
+            manifest = self.check_flow_cache(design, overwrite)
+            if manifest is None:
+                self.cache_stats.hits += 1
+            else:
+                self.cache_stats.misses += 1
+                designs.append(design)
+                if manifests is not None:
+                    manifests[design["design_name"]] = manifest
+        build_logger(type(self).__name__, logging.INFO).info(f"Flow {self.flow_name} cache: {self.cache_stats}")
+        return designs
 
     @abstractmethod
     def build_flow_single(
@@ -49,8 +211,12 @@ class LineCountFlow(Flow):
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         # count number of lines in a design
-        design_dir = self.design_dataset.designs_dir / design["design_name"]
+        design_dir = self.design_dataset.design_dir(design["design_name"])
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
 
@@ -76,9 +242,7 @@ class LineCountFlow(Flow):
         flow_metadata_fp = flow_dir / "flow.json"
         flow_metadata_fp.write_text(json.dumps(flow_metadata, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs)(delayed(self.build_flow_single)(design, overwrite=overwrite) for design in designs)
+        write_flow_manifest(flow_dir, manifest)
 
 
 class ModuleInfoFlow(Flow):
@@ -89,21 +253,28 @@ class ModuleInfoFlow(Flow):
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
 
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
+
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         logger = build_logger("ModuleInfoFlow", logging.INFO)
         logger.info(f"Building flow {self.flow_name} for {design['design_name']}")
         # count number of modules in a design
-        design_dir = self.design_dataset.designs_dir / design["design_name"]
+        design_dir = self.design_dataset.design_dir(design["design_name"])
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
 
         verilog_sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
 
-        modules = extract_design_hierarchy(verilog_sources_fps)
+        modules = extract_design_hierarchy(verilog_sources_fps, yosys_bin=self.yosys_bin)
         num_modules = len(modules)
 
         flow_dir = design_dir / "flows" / self.flow_name
@@ -127,12 +298,7 @@ class ModuleInfoFlow(Flow):
         flow_metadata_fp = flow_dir / "flow.json"
         flow_metadata_fp.write_text(json.dumps(flow_metadata, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs)(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
-        self.build_flow_single(designs[0], overwrite=overwrite)
+        write_flow_manifest(flow_dir, manifest)
 
 
 class VeribleASTFlow(Flow):
@@ -147,12 +313,19 @@ class VeribleASTFlow(Flow):
         super().__init__(design_dataset)
         self.verible_verilog_syntax_bin = verible_verilog_syntax_bin
 
+    def flow_tool_version(self) -> str:
+        return tool_version(self.verible_verilog_syntax_bin)
+
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
-        design_dir = self.design_dataset.designs_dir / design["design_name"]
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
+        design_dir = self.design_dataset.design_dir(design["design_name"])
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
 
@@ -185,13 +358,83 @@ class VeribleASTFlow(Flow):
             if g_ast is None:
                 raise ValueError(f"FAILED to parse {source_fp}")
 
-            g_ast_json = nx.node_link_data(g_ast, edges="edges")
+            g_ast_json = node_link_data(g_ast)
             g_ast_fp = flow_dir / (source_fp.stem + ".ast.json")
             g_ast_fp.write_text(json.dumps(g_ast_json, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs)(delayed(self.build_flow_single)(design, overwrite=overwrite) for design in designs)
+        write_flow_manifest(flow_dir, manifest)
+
+
+class YosysFrontendFlow(Flow):
+    """Parses and elaborates the sources of a design once into
+    `design__pre.rtlil`, which the yosys synthesis flows read instead of
+    running the frontend themselves. The synthesis flows do not keep a copy
+    of it in their own flow dirs.
+    """
+
+    flow_name: str = "yosys_frontend"
+    flow_tags: ClassVar[list[str]] = ["yosys"]
+
+    def __init__(self, design_dataset: DesignDataset, yosys_bin: str = "yosys") -> None:
+        super().__init__(design_dataset)
+        self.yosys_bin = yosys_bin
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
+
+    def build_flow_single(
+        self,
+        design: dict[str, Any],
+        overwrite: bool = False,
+    ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
+        design_dir = self.design_dataset.design_dir(design["design_name"])
+        sources_dir = design_dir / "sources"
+        sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
+        sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
+
+        flow_dir = design_dir / "flows" / self.flow_name
+        if flow_dir.exists():
+            shutil.rmtree(flow_dir)
+        flow_dir.mkdir(parents=True, exist_ok=True)
+
+        yosys_frontend(
+            sources_fps,
+            flow_dir / FRONTEND_RTLIL_FILENAME,
+            log_fp=flow_dir / "yosys_log.txt",
+            yosys_bin=self.yosys_bin,
+        )
+
+        write_flow_manifest(flow_dir, manifest)
+
+    def frontend_rtlil(self, design: dict[str, Any], overwrite: bool = False) -> Path:
+        """Builds the elaborated RTLIL of a design if it is missing or out of
+        date.
+
+        Args:
+        ----
+            design (dict[str, Any]): The design metadata.
+            overwrite (bool): Rebuild the RTLIL even if it is up to date.
+
+        Returns:
+        -------
+            Path: The RTLIL file to `read_rtlil`.
+
+        """
+        flows_dir = self.design_dataset.design_dir(design["design_name"]) / "flows"
+        flows_dir.mkdir(parents=True, exist_ok=True)
+        # the synthesis flows of one design can run at the same time, only
+        # one of them builds the frontend
+        with (flows_dir / f".{self.flow_name}.lock").open("w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self.build_flow_single(design, overwrite=overwrite)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return self.flow_dir(design["design_name"]) / FRONTEND_RTLIL_FILENAME
 
 
 class YosysSimpleSynthFlow(Flow):
@@ -201,17 +444,25 @@ class YosysSimpleSynthFlow(Flow):
     def __init__(self, design_dataset: DesignDataset, yosys_bin: str = "yosys") -> None:
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
+        self.frontend_flow = YosysFrontendFlow(design_dataset, yosys_bin=yosys_bin)
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
 
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         design_name = design["design_name"]
         if not isinstance(design_name, str):
             raise TypeError(f"design_name must be a string, got {type(design_name)}:{design_name}")
 
-        design_dir = self.design_dataset.designs_dir / design_name
+        design_dir = self.design_dataset.design_dir(design_name)
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
         sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
@@ -235,16 +486,14 @@ class YosysSimpleSynthFlow(Flow):
 
         design_metadata_fp.write_text(json.dumps(design_metadata, indent=4))
 
-        rtlil_pre_raw, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_simple_synth(
+        _, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_simple_synth(
             sources_fps,
             flow_dir,
             yosys_bin=self.yosys_bin,
+            frontend_rtlil=self.frontend_flow.frontend_rtlil(design, overwrite=overwrite),
         )
 
-        rtlil_pre_fp = flow_dir / "design__pre.rtlil"
-        rtlil_pre_fp.write_text(rtlil_pre_raw)
-
-        aig_graph_json = nx.node_link_data(aig_graph, edges="edges")
+        aig_graph_json = node_link_data(aig_graph)
         aig_graph_fp = flow_dir / "aig_graph.json"
         aig_graph_fp.write_text(json.dumps(aig_graph_json, indent=4))
 
@@ -263,11 +512,7 @@ class YosysSimpleSynthFlow(Flow):
         stat_json_fp = flow_dir / "stat.json"
         stat_json_fp.write_text(json.dumps(stat_json, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
+        write_flow_manifest(flow_dir, manifest)
 
 
 class YosysAIGFlow(Flow):
@@ -277,13 +522,21 @@ class YosysAIGFlow(Flow):
     def __init__(self, design_dataset: DesignDataset, yosys_bin: str = "yosys") -> None:
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
+        self.frontend_flow = YosysFrontendFlow(design_dataset, yosys_bin=yosys_bin)
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
 
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
-        design_dir = self.design_dataset.designs_dir / design["design_name"]
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
+        design_dir = self.design_dataset.design_dir(design["design_name"])
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
         sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
@@ -310,8 +563,9 @@ class YosysAIGFlow(Flow):
         aig_graph, json_data, verilog_raw, stat_txt, stat_json = yosys_aig(
             sources_fps,
             yosys_bin=self.yosys_bin,
+            frontend_rtlil=self.frontend_flow.frontend_rtlil(design, overwrite=overwrite),
         )
-        aig_graph_json = nx.node_link_data(aig_graph, edges="edges")
+        aig_graph_json = node_link_data(aig_graph)
         aig_graph_fp = flow_dir / "aig_graph.json"
         aig_graph_fp.write_text(json.dumps(aig_graph_json, indent=4))
 
@@ -327,11 +581,7 @@ class YosysAIGFlow(Flow):
         stat_json_fp = flow_dir / "stat.json"
         stat_json_fp.write_text(json.dumps(stat_json, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
+        write_flow_manifest(flow_dir, manifest)
 
 
 class YosysXilinxSynthFlow(Flow):
@@ -341,17 +591,25 @@ class YosysXilinxSynthFlow(Flow):
     def __init__(self, design_dataset: DesignDataset, yosys_bin: str = "yosys") -> None:
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
+        self.frontend_flow = YosysFrontendFlow(design_dataset, yosys_bin=yosys_bin)
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
 
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         design_name = design["design_name"]
         if not isinstance(design_name, str):
             raise TypeError(f"design_name must be a string, got {type(design_name)}:{design_name}")
 
-        design_dir = self.design_dataset.designs_dir / design_name
+        design_dir = self.design_dataset.design_dir(design_name)
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
         sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
@@ -375,16 +633,14 @@ class YosysXilinxSynthFlow(Flow):
 
         design_metadata_fp.write_text(json.dumps(design_metadata, indent=4))
 
-        rtlil_pre_raw, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_synth_xilinx(
+        _, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_synth_xilinx(
             sources_fps,
             flow_dir,
             yosys_bin=self.yosys_bin,
+            frontend_rtlil=self.frontend_flow.frontend_rtlil(design, overwrite=overwrite),
         )
 
-        rtlil_pre_fp = flow_dir / "design__pre.rtlil"
-        rtlil_pre_fp.write_text(rtlil_pre_raw)
-
-        aig_graph_json = nx.node_link_data(aig_graph, edges="edges")
+        aig_graph_json = node_link_data(aig_graph)
         aig_graph_fp = flow_dir / "aig_graph.json"
         aig_graph_fp.write_text(json.dumps(aig_graph_json, indent=4))
 
@@ -403,11 +659,7 @@ class YosysXilinxSynthFlow(Flow):
         stat_json_fp = flow_dir / "stat.json"
         stat_json_fp.write_text(json.dumps(stat_json, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
+        write_flow_manifest(flow_dir, manifest)
 
 
 class YosysIntelSynthFlow(Flow):
@@ -417,17 +669,25 @@ class YosysIntelSynthFlow(Flow):
     def __init__(self, design_dataset: DesignDataset, yosys_bin: str = "yosys") -> None:
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
+        self.frontend_flow = YosysFrontendFlow(design_dataset, yosys_bin=yosys_bin)
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
 
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         design_name = design["design_name"]
         if not isinstance(design_name, str):
             raise TypeError(f"design_name must be a string, got {type(design_name)}:{design_name}")
 
-        design_dir = self.design_dataset.designs_dir / design_name
+        design_dir = self.design_dataset.design_dir(design_name)
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
         sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
@@ -451,16 +711,14 @@ class YosysIntelSynthFlow(Flow):
 
         design_metadata_fp.write_text(json.dumps(design_metadata, indent=4))
 
-        rtlil_pre_raw, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_synth_intel(
+        _, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_synth_intel(
             sources_fps,
             flow_dir,
             yosys_bin=self.yosys_bin,
+            frontend_rtlil=self.frontend_flow.frontend_rtlil(design, overwrite=overwrite),
         )
 
-        rtlil_pre_fp = flow_dir / "design__pre.rtlil"
-        rtlil_pre_fp.write_text(rtlil_pre_raw)
-
-        aig_graph_json = nx.node_link_data(aig_graph, edges="edges")
+        aig_graph_json = node_link_data(aig_graph)
         aig_graph_fp = flow_dir / "aig_graph.json"
         aig_graph_fp.write_text(json.dumps(aig_graph_json, indent=4))
 
@@ -479,11 +737,7 @@ class YosysIntelSynthFlow(Flow):
         stat_json_fp = flow_dir / "stat.json"
         stat_json_fp.write_text(json.dumps(stat_json, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
+        write_flow_manifest(flow_dir, manifest)
 
 
 class YosysLatticeSynthFlow(Flow):
@@ -493,17 +747,25 @@ class YosysLatticeSynthFlow(Flow):
     def __init__(self, design_dataset: DesignDataset, yosys_bin: str = "yosys") -> None:
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
+        self.frontend_flow = YosysFrontendFlow(design_dataset, yosys_bin=yosys_bin)
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
 
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         design_name = design["design_name"]
         if not isinstance(design_name, str):
             raise TypeError(f"design_name must be a string, got {type(design_name)}:{design_name}")
 
-        design_dir = self.design_dataset.designs_dir / design_name
+        design_dir = self.design_dataset.design_dir(design_name)
         sources_dir = design_dir / "sources"
         sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
         sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
@@ -527,16 +789,14 @@ class YosysLatticeSynthFlow(Flow):
 
         design_metadata_fp.write_text(json.dumps(design_metadata, indent=4))
 
-        rtlil_pre_raw, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_synth_lattice(
+        _, aig_graph, json_data, verilog_raw, rtlil_raw, stat_txt, stat_json = yosys_synth_lattice(
             sources_fps,
             flow_dir,
             yosys_bin=self.yosys_bin,
+            frontend_rtlil=self.frontend_flow.frontend_rtlil(design, overwrite=overwrite),
         )
 
-        rtlil_pre_fp = flow_dir / "design__pre.rtlil"
-        rtlil_pre_fp.write_text(rtlil_pre_raw)
-
-        aig_graph_json = nx.node_link_data(aig_graph, edges="edges")
+        aig_graph_json = node_link_data(aig_graph)
         aig_graph_fp = flow_dir / "aig_graph.json"
         aig_graph_fp.write_text(json.dumps(aig_graph_json, indent=4))
 
@@ -555,18 +815,14 @@ class YosysLatticeSynthFlow(Flow):
         stat_json_fp = flow_dir / "stat.json"
         stat_json_fp.write_text(json.dumps(stat_json, indent=4))
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
+        write_flow_manifest(flow_dir, manifest)
 
 
 class ModuleHierarchyFlow(Flow):
     flow_name: str = "module_hierarchy"
     flow_tags: ClassVar[list[str]] = ["text"]
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
+    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> FlowRunReport:
         raise NotImplementedError
 
 
@@ -574,7 +830,7 @@ class ISEFlow(Flow):
     flow_name: str = "ise"
     flow_tags: ClassVar[list[str]] = ["synthesis", "implementation", "fpga"]
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
+    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> FlowRunReport:
         raise NotImplementedError
 
 
@@ -582,7 +838,7 @@ class VivadoFlow(Flow):
     flow_name: str = "vivado"
     flow_tags: ClassVar[list[str]] = ["synthesis", "implementation", "fpga"]
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
+    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> FlowRunReport:
         raise NotImplementedError
 
 
@@ -590,7 +846,7 @@ class QuartusFlow(Flow):
     flow_name: str = "quartus"
     flow_tags: ClassVar[list[str]] = ["synthesis", "implementation", "fpga"]
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
+    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> FlowRunReport:
         raise NotImplementedError
 
 
@@ -598,7 +854,7 @@ class VTRFlow(Flow):
     flow_name: str = "vtr"
     flow_tags: ClassVar[list[str]] = ["synthesis", "implementation", "fpga"]
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
+    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> FlowRunReport:
         raise NotImplementedError
 
 
@@ -606,5 +862,5 @@ class OpenRoadFlow(Flow):
     flow_name: str = "openroad"
     flow_tags: ClassVar[list[str]] = ["synthesis", "implementation", "asic"]
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
+    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> FlowRunReport:
         raise NotImplementedError
@@ -6,13 +6,11 @@ import subprocess
 from pathlib import Path
 from typing import Any, ClassVar
 
-import jinja2
-import tqdm
-from joblib import Parallel, delayed
 from pydantic import BaseModel, Field
 
 from digital_design_dataset.design_dataset import VERILOG_SOURCE_EXTENSIONS_SET, DesignDataset
 from digital_design_dataset.flows.decompose import compute_top_modules
+from digital_design_dataset.flows.flow_cache import tool_version, write_flow_manifest
 from digital_design_dataset.flows.flow_tools import MeasureTime, check_process_output, get_bin
 from digital_design_dataset.flows.flows import Flow
 from digital_design_dataset.logger import build_logger
@@ -91,6 +89,12 @@ class AlteraQuartusFlow(Flow):
         self.tool_bins = tool_bins
         self.tool_settings = tool_settings
 
+    def flow_settings(self, design: dict[str, Any]) -> dict[str, Any]:
+        return {"part": self.part.model_dump(), "tool_settings": self.tool_settings.model_dump()}
+
+    def flow_tool_version(self) -> str:
+        return tool_version(str(self.tool_bins.quartus_sh), "--version")
+
     @staticmethod
     def check_supported_part(part: PartAltera) -> None:
         supported_devices = get_supported_devices_raw(ToolBinsAlteraQuartus.auto_find_quartus_sh())
@@ -104,10 +108,16 @@ class AlteraQuartusFlow(Flow):
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
+        import jinja2  # noqa: PLC0415
+
         logger = build_logger("ModuleInfoFlow", logging.INFO)
         logger.info(f"Building flow {self.flow_name} for {design['design_name']}")
 
-        design_dir = self.design_dataset.designs_dir / str(design["design_name"])
+        design_dir = self.design_dataset.design_dir(str(design["design_name"]))
         sources_dir = design_dir / "sources"
 
         flow_dir = design_dir / "flows" / self.flow_name
@@ -244,8 +254,4 @@ class AlteraQuartusFlow(Flow):
         # p__quartus_sta = subprocess.run(p_args__quartus_sta, capture_output=True, text=True, check=False, cwd=flow_dir)
         # check_process_output(p__quartus_sta)
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
+        write_flow_manifest(flow_dir, manifest)
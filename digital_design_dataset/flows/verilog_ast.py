@@ -3,8 +3,10 @@ import random
 import subprocess
 import uuid
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import networkx as nx
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 def generate_node_id(node, rd: random.Random) -> str:
@@ -13,7 +15,7 @@ def generate_node_id(node, rd: random.Random) -> str:
 
 
 def add_nodes_and_edges(
-    g_ast: nx.DiGraph,
+    g_ast: "nx.DiGraph",
     node,
     rd: random.Random,
     parent: str | None = None,
@@ -36,7 +38,9 @@ def add_nodes_and_edges(
 def verilog_ast(
     verilog_file: Path,
     verible_verilog_syntax_bin: str = "verible-verilog-syntax",
-) -> nx.DiGraph | None:
+) -> "nx.DiGraph | None":
+    import networkx as nx  # noqa: PLC0415
+
     p = subprocess.run(
         [
             verible_verilog_syntax_bin,
@@ -5,8 +5,6 @@ import subprocess
 from pathlib import Path
 from typing import Any, ClassVar
 
-import tqdm
-from joblib import Parallel, delayed
 from pydantic import BaseModel, Field
 
 from digital_design_dataset.design_dataset import VERILOG_SOURCE_EXTENSIONS_SET, DesignDataset
@@ -15,6 +13,7 @@ from digital_design_dataset.flows.decompose import (
     compute_hierarchy_redundent,
     get_top_nodes,
 )
+from digital_design_dataset.flows.flow_cache import tool_version, write_flow_manifest
 from digital_design_dataset.flows.flow_tools import check_process_output, get_bin
 from digital_design_dataset.flows.flows import Flow
 from digital_design_dataset.logger import build_logger
@@ -66,25 +65,33 @@ class XilinxVivadoFlow(Flow):
         self.tool_settings = tool_settings
         self.auto_top = auto_top
 
+    def flow_settings(self, design: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "part": self.part.model_dump(),
+            "tool_settings": self.tool_settings.model_dump(),
+            "auto_top": self.auto_top,
+        }
+
+    def flow_tool_version(self) -> str:
+        return tool_version(str(self.tool_bins.vivado), "-version")
+
     @staticmethod
     def check_supported_part(part: PartXilinx) -> None:
         raise NotImplementedError
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs, backend="loky")(
-            delayed(self.build_flow_single)(design, overwrite=overwrite) for design in tqdm.tqdm(designs)
-        )
-
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         logger = build_logger("ModuleInfoFlow", logging.INFO)
         logger.info(f"Building flow {self.flow_name} for {design['design_name']}")
 
-        design_dir = self.design_dataset.designs_dir / str(design["design_name"])
+        design_dir = self.design_dataset.design_dir(str(design["design_name"]))
         if not design_dir.exists():
             raise ValueError(f"Design directory {design_dir} does not exist, cannot build flow")
         sources_dir = design_dir / "sources"
@@ -172,3 +179,5 @@ class XilinxVivadoFlow(Flow):
             cwd=flow_dir,
         )
         check_process_output(p_vivado)
+
+        write_flow_manifest(flow_dir, manifest)
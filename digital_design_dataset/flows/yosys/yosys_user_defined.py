@@ -2,15 +2,16 @@ import logging
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Any, ClassVar
-
-import jinja2
-from joblib import Parallel, delayed
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from digital_design_dataset.design_dataset import VERILOG_SOURCE_EXTENSIONS_SET, DesignDataset
+from digital_design_dataset.flows.flow_cache import tool_version, write_flow_manifest
 from digital_design_dataset.flows.flows import Flow
 from digital_design_dataset.logger import build_logger
 
+if TYPE_CHECKING:
+    import jinja2
+
 
 class YosysUserDefinedFlow(Flow):
     flow_name: str = "yosys_user_defined"
@@ -20,40 +21,66 @@ class YosysUserDefinedFlow(Flow):
         self,
         design_dataset: DesignDataset,
         yosys_bin: str = "yosys",
-        script_template: str | jinja2.Template | Path | None = None,
+        script_template: "str | jinja2.Template | Path | None" = None,
     ) -> None:
+        import jinja2  # noqa: PLC0415
+
         super().__init__(design_dataset)
         self.yosys_bin = yosys_bin
+        # the template text, part of the cache key, not known for a template
+        # given as a `jinja2.Template`
+        self.script_template_source: str | None = None
         if isinstance(script_template, str):
-            self.script_template = jinja2.Template(script_template)
+            self.script_template_source = script_template
         elif isinstance(script_template, jinja2.Template):
             self.script_template = script_template
         elif isinstance(script_template, Path):
             if script_template.exists() and script_template.is_file():
-                self.script_template = jinja2.Template(script_template.read_text())
+                self.script_template_source = script_template.read_text()
             else:
                 raise FileNotFoundError(f"Script template file {script_template} does not exist or is not a file.")
         else:
-            self.script_template = jinja2.Template("")
+            self.script_template_source = ""
+        if self.script_template_source is not None:
+            self.script_template = jinja2.Template(self.script_template_source)
+
+    def verilog_source_names(self, design: dict[str, Any]) -> list[str]:
+        sources_dir = self.design_dataset.design_dir(design["design_name"]) / "sources"
+        return sorted(f.name for f in sources_dir.iterdir() if f.is_file() and f.suffix in VERILOG_SOURCE_EXTENSIONS_SET)
+
+    def render_script(self, design: dict[str, Any], sources_dir: Path | None = None) -> str:
+        if sources_dir is None:
+            sources_dir = self.design_dataset.design_dir(design["design_name"]) / "sources"
+        return self.script_template.render(
+            design=design,
+            sources_fps=[sources_dir / name for name in self.verilog_source_names(design)],
+        )
+
+    def flow_settings(self, design: dict[str, Any]) -> dict[str, Any]:
+        # not the rendered script, its source paths change when the dataset
+        # is moved, opened by a relative path or migrated to another layout
+        script_template = self.script_template_source
+        if script_template is None:
+            script_template = self.render_script(design, Path("sources"))
+        return {"script_template": script_template, "sources": self.verilog_source_names(design)}
+
+    def flow_tool_version(self) -> str:
+        return tool_version(self.yosys_bin, "-V")
 
     def build_flow_single(
         self,
         design: dict[str, Any],
         overwrite: bool = False,
     ) -> None:
+        manifest = self.check_flow_cache(design, overwrite)
+        if manifest is None:
+            return
+
         logger = build_logger("YosysUserDefinedFlow", logging.INFO)
         logger.info(f"Building flow {self.flow_name} for {design['design_name']}")
 
-        design_dir = self.design_dataset.designs_dir / design["design_name"]
-        sources_dir = design_dir / "sources"
-        sources_fps = [f for f in sources_dir.iterdir() if f.is_file()]
-
-        verilog_sources_fps = [f for f in sources_fps if f.suffix in VERILOG_SOURCE_EXTENSIONS_SET]
-
-        yosys_script_rendered = self.script_template.render(
-            design=design,
-            sources_fps=verilog_sources_fps,
-        )
+        verilog_sources_fps = self.verilog_source_names(design)
+        yosys_script_rendered = self.render_script(design)
 
         with tempfile.TemporaryDirectory() as tmpdir:
             ys_script_fp = Path(tmpdir) / "script.ys"
@@ -79,6 +106,4 @@ class YosysUserDefinedFlow(Flow):
                     f"yosys exited with code {p.returncode}.\nstdout:\n{std_out}\nstderr:\n{std_err}",
                 )
 
-    def build_flow(self, overwrite: bool = False, n_jobs: int = 1) -> None:
-        designs = self.design_dataset.index
-        Parallel(n_jobs=n_jobs)(delayed(self.build_flow_single)(design, overwrite=overwrite) for design in designs)
+        write_flow_manifest(self.flow_dir(design["design_name"]), manifest)
@@ -2,16 +2,20 @@ import json
 import subprocess
 import tempfile
 from pathlib import Path
-
-import networkx as nx
+from typing import TYPE_CHECKING
 
 from digital_design_dataset.flows.connectivity_table import parse_connectivity_table
+from digital_design_dataset.flows.yosys_frontend import read_design_script
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 def yosys_aig(
     verilog_files: list[Path],
     yosys_bin: str = "yosys",
-) -> tuple[nx.DiGraph, dict, str, str, dict]:
+    frontend_rtlil: Path | None = None,
+) -> tuple["nx.DiGraph", dict, str, str, dict]:
     tempdir = tempfile.TemporaryDirectory()
     tempdir_fp = Path(tempdir.name)
 
@@ -21,11 +25,7 @@ def yosys_aig(
     stat_temp_file = tempdir_fp / "yosys.stat"
     stat_json_temp_file = tempdir_fp / "yosys.stat.json"
 
-    script = ""
-    for verilog_file in verilog_files:
-        # script += f"read_verilog -nomem2reg {verilog_file};\n"  # noqa: ERA001
-        script += f"read_verilog {verilog_file.resolve()};\n"
-    script += "hierarchy -check -auto-top;\n"
+    script = read_design_script(verilog_files, frontend_rtlil)
     script += "synth -run begin:fine;\n"
     script += "techmap *;\n"
     script += "opt; clean;\n"
@@ -68,7 +68,8 @@ def yosys_simple_synth(
     verilog_files: list[Path],
     flow_dir: Path,
     yosys_bin: str = "yosys",
-) -> tuple[str, nx.DiGraph, dict, str, str, str, dict]:
+    frontend_rtlil: Path | None = None,
+) -> tuple[str | None, "nx.DiGraph", dict, str, str, str, dict]:
     tempdir = tempfile.TemporaryDirectory(dir=flow_dir)
     tempdir_fp = Path(tempdir.name)
 
@@ -82,12 +83,10 @@ def yosys_simple_synth(
 
     log_fp = flow_dir / "yosys_log.txt"
 
-    script = ""
-    for verilog_file in verilog_files:
-        # script += f"read_verilog -nomem2reg {verilog_file};\n"  # noqa: ERA001
-        script += f"read_verilog {verilog_file.resolve()};\n"
-    script += "hierarchy -check -auto-top;\n"
-    script += f"write_rtlil {rtlil_pre_temp_file.resolve()};\n"
+    script = read_design_script(verilog_files, frontend_rtlil)
+    if frontend_rtlil is None:
+        # otherwise the elaborated design is frontend_rtlil itself
+        script += f"write_rtlil {rtlil_pre_temp_file.resolve()};\n"
     script += "synth -run begin:fine;\n"
     script += "opt; clean;\n"
     script += f"write_table {connectivity_table_temp_file.resolve()};\n"
@@ -109,7 +108,7 @@ def yosys_simple_synth(
             f"Yosys failed with return code: {p.returncode}\nstdout: {p.stdout}\nstderr: {p.stderr}",
         )
 
-    rtlil_pre_raw = rtlil_pre_temp_file.read_text().strip()
+    rtlil_pre_raw = rtlil_pre_temp_file.read_text().strip() if frontend_rtlil is None else None
 
     connectivity_table_raw = connectivity_table_temp_file.read_text().strip()
     graph = parse_connectivity_table(connectivity_table_raw)
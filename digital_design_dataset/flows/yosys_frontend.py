@@ -0,0 +1,42 @@
+import subprocess
+from pathlib import Path
+
+FRONTEND_RTLIL_FILENAME = "design__pre.rtlil"
+
+
+def read_design_script(verilog_files: list[Path], frontend_rtlil: Path | None = None) -> str:
+    # the commands that load and elaborate a design, parsing the sources is
+    # skipped if they were already elaborated into frontend_rtlil
+    script = ""
+    if frontend_rtlil is not None:
+        script += f"read_rtlil {frontend_rtlil.resolve()};\n"
+    else:
+        for verilog_file in verilog_files:
+            # script += f"read_verilog -nomem2reg {verilog_file};\n"  # noqa: ERA001
+            script += f"read_verilog {verilog_file.resolve()};\n"
+    script += "hierarchy -check -auto-top;\n"
+    return script
+
+
+def yosys_frontend(
+    verilog_files: list[Path],
+    rtlil_fp: Path,
+    log_fp: Path | None = None,
+    yosys_bin: str = "yosys",
+) -> None:
+    """Parse and elaborate the sources of a design once, so every synthesis
+    flow can start from `read_rtlil` of the result. The top module is marked
+    in the RTLIL, so `hierarchy -check -auto-top` on the loaded design picks
+    the same top again.
+    """
+    script = read_design_script(verilog_files)
+    script += f"write_rtlil {rtlil_fp.resolve()};\n"
+
+    args = [yosys_bin, "-q", "-p", script]
+    if log_fp is not None:
+        args += ["-l", str(log_fp)]
+    p = subprocess.run(args, capture_output=True, text=True, check=False)
+    if p.returncode != 0:
+        raise RuntimeError(
+            f"Yosys failed with return code: {p.returncode}\nstdout: {p.stdout}\nstderr: {p.stderr}",
+        )
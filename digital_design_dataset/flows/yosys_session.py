@@ -0,0 +1,209 @@
+import atexit
+import functools
+import os
+import re
+import shutil
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+# printed by yosys for errors that do not end the session
+RE_YOSYS_ERROR = re.compile(r"^ERROR:", re.MULTILINE)
+
+
+@functools.cache
+def which_yosys(yosys_bin: str = "yosys") -> str:
+    # `shutil.which` walks PATH, cached since the helpers run it on every call
+    yosys_fp = shutil.which(yosys_bin)
+    if yosys_fp is None:
+        raise FileNotFoundError(f"{yosys_bin} executable not found in PATH")
+    return yosys_fp
+
+
+class YosysSession:
+    """A yosys process that stays alive between scripts, to skip the process
+    start for the many small scripts run per design.
+
+    Scripts are sent over stdin to the yosys shell as `script <file>`, which
+    stops at the first error of a script but keeps the shell running, and the
+    design is reset before every script. An error that ends the process, e.g.
+    a Verilog syntax error, fails the current script and the next script
+    starts a new process.
+
+    With `use_pyosys`, scripts run in this process through the pyosys
+    bindings instead, if they are installed. Errors raised by yosys in
+    library mode can end the Python interpreter, so this is opt-in.
+
+    A session runs one script at a time, use `yosys_session` to get the
+    session of the current worker thread.
+    """
+
+    def __init__(self, yosys_bin: str = "yosys", use_pyosys: bool = False) -> None:
+        self.yosys_bin = which_yosys(yosys_bin)
+        self.ys: Any = None
+        if use_pyosys:
+            try:
+                from pyosys import libyosys  # noqa: PLC0415
+
+                self.ys = libyosys
+            except ImportError:
+                pass
+        self.proc: subprocess.Popen | None = None
+        self.pid = os.getpid()
+        self.n_runs = 0
+        self.n_starts = 0
+
+    def _start(self) -> subprocess.Popen:
+        self.n_starts += 1
+        return subprocess.Popen(
+            [self.yosys_bin, "-Q", "-T"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+
+    def _send(self, command: str, done: str) -> tuple[str, bool]:
+        # returns the output of the command and whether the process is alive
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = self._start()
+        assert self.proc.stdin is not None
+        assert self.proc.stdout is not None
+        self.proc.stdin.write(f"{command}\nlog {done}\n")
+        self.proc.stdin.flush()
+        lines = []
+        for line in iter(self.proc.stdout.readline, ""):
+            # the shell may echo the command, only the output of `log` ends
+            # in the marker without the command in front of it
+            if line.rstrip().endswith(done) and f"log {done}" not in line:
+                return "".join(lines), True
+            lines.append(line)
+        self.proc.wait()
+        return "".join(lines), False
+
+    def _run_pyosys(self, script_fp: Path, log_fp: Path) -> str:
+        design = self.ys.Design()
+        try:
+            self.ys.run_pass(f"tee -q -o {log_fp} script {script_fp}", design)
+        except Exception as e:
+            log = log_fp.read_text() if log_fp.exists() else ""
+            raise RuntimeError(f"yosys failed: {e}\n{log}") from e
+        return log_fp.read_text()
+
+    def run(self, script: str) -> str:
+        """Runs a yosys script on an empty design.
+
+        Args:
+        ----
+            script (str): The yosys commands, one per line or separated by
+            semicolons.
+
+        Returns:
+        -------
+            str: The log of the script.
+
+        """
+        if self.pid != os.getpid():
+            # inherited through a fork, the pipes belong to the parent
+            self.proc = None
+            self.pid = os.getpid()
+        self.n_runs += 1
+        with TemporaryDirectory(prefix="yosys_session__") as temp_dir:
+            script_fp = Path(temp_dir) / "script.ys"
+            script_fp.write_text(script)
+            if self.ys is not None:
+                return self._run_pyosys(script_fp, Path(temp_dir) / "yosys.log")
+
+            done = f"@@done {uuid.uuid4().hex}"
+            try:
+                log, alive = self._send(f"design -reset; script {script_fp}", done)
+            except BaseException:
+                # e.g. a flow timeout, the state of the shell is unknown
+                self.close()
+                raise
+        if not alive:
+            raise RuntimeError(f"yosys exited with return code {self.proc.returncode}\n{log}")
+        if RE_YOSYS_ERROR.search(log):
+            raise RuntimeError(f"yosys failed\n{log}")
+        return log
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        if self.pid == os.getpid() and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def __enter__(self) -> "YosysSession":
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        self.close()
+
+
+_sessions = threading.local()
+_all_sessions: list[YosysSession] = []
+_all_sessions_lock = threading.Lock()
+
+
+def yosys_session(yosys_bin: str = "yosys", use_pyosys: bool = False) -> YosysSession:
+    """The session of the current thread, so every worker of a flow or
+    retriever reuses one yosys process. Sessions are closed when the
+    interpreter exits.
+    """
+    if not hasattr(_sessions, "by_key"):
+        _sessions.by_key = {}
+    key = (yosys_bin, use_pyosys)
+    session = _sessions.by_key.get(key)
+    if session is None:
+        session = YosysSession(yosys_bin, use_pyosys=use_pyosys)
+        _sessions.by_key[key] = session
+        with _all_sessions_lock:
+            _all_sessions.append(session)
+    return session
+
+
+@atexit.register
+def close_yosys_sessions() -> None:
+    with _all_sessions_lock:
+        for session in _all_sessions:
+            session.close()
+        _all_sessions.clear()
+
+
+def run_yosys_script(script: str, yosys_bin: str = "yosys", cwd: Path | None = None) -> str:
+    """Runs a yosys script in the session of the current thread.
+
+    Args:
+    ----
+        script (str): The yosys commands.
+        yosys_bin (str): The yosys executable.
+        cwd (Path | None): Run in this directory instead, for scripts with
+        relative paths. The session cannot change its directory, so this
+        starts a new yosys process.
+
+    Returns:
+    -------
+        str: The log of the script.
+
+    """
+    if cwd is None:
+        return yosys_session(yosys_bin).run(script)
+
+    p = subprocess.run(
+        [which_yosys(yosys_bin), "-Q", "-T", "-p", script],
+        capture_output=True,
+        text=True,
+        check=False,
+        cwd=cwd,
+    )
+    if p.returncode != 0:
+        raise RuntimeError(
+            f"yosys failed with return code {p.returncode}\nSTDOUT: {p.stdout}\nSTDERR: {p.stderr}",
+        )
+    return p.stdout
@@ -2,18 +2,21 @@ import json
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Any
-
-from networkx.classes.digraph import DiGraph
+from typing import TYPE_CHECKING, Any
 
 from digital_design_dataset.flows.connectivity_table import parse_connectivity_table
+from digital_design_dataset.flows.yosys_frontend import read_design_script
+
+if TYPE_CHECKING:
+    from networkx.classes.digraph import DiGraph
 
 
 def yosys_synth_lattice(
     verilog_files: list[Path],
     flow_dir: Path,
     yosys_bin: str = "yosys",
-) -> tuple[str, DiGraph, Any, str, str, str, Any]:
+    frontend_rtlil: Path | None = None,
+) -> tuple[str | None, "DiGraph", Any, str, str, str, Any]:
     tempdir = tempfile.TemporaryDirectory(dir=flow_dir)
     tempdir_fp = Path(tempdir.name)
 
@@ -27,12 +30,10 @@ def yosys_synth_lattice(
 
     log_fp = flow_dir / "yosys_log.txt"
 
-    script = ""
-    for verilog_file in verilog_files:
-        # script += f"read_verilog -nomem2reg {verilog_file};\n"  # noqa: ERA001
-        script += f"read_verilog {verilog_file.resolve()};\n"
-    script += "hierarchy -check -auto-top;\n"
-    script += f"write_rtlil {rtlil_pre_temp_file.resolve()};\n"
+    script = read_design_script(verilog_files, frontend_rtlil)
+    if frontend_rtlil is None:
+        # otherwise the elaborated design is frontend_rtlil itself
+        script += f"write_rtlil {rtlil_pre_temp_file.resolve()};\n"
 
     script += "synth_lattice -family ecp5 -run :map_ffs;\n"
 
@@ -68,7 +69,7 @@ def yosys_synth_lattice(
             f"Yosys failed with return code: {p.returncode}\nstdout: {p.stdout}\nstderr: {p.stderr}",
         )
 
-    rtlil_pre_raw = rtlil_pre_temp_file.read_text().strip()
+    rtlil_pre_raw = rtlil_pre_temp_file.read_text().strip() if frontend_rtlil is None else None
 
     connectivity_table_raw = connectivity_table_temp_file.read_text().strip()
     graph = parse_connectivity_table(connectivity_table_raw)
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Protocol
+
+from digital_design_dataset.design_layout import DEFAULT_DESIGN_LAYOUT, check_layout, scan_design_dirs
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_N_THREADS = 16
+
+
+class StatSignature(Protocol):
+    def matches(self, st: os.stat_result) -> bool: ...
+
+
+@dataclass
+class MetadataLoadStats:
+    n_designs: int = 0
+    n_files_read: int = 0
+    n_bytes_read: int = 0
+    elapsed_time: float = 0.0
+    _lock: Lock = field(default_factory=Lock, repr=False, compare=False)
+
+    def add_read(self, n_bytes: int) -> None:
+        with self._lock:
+            self.n_files_read += 1
+            self.n_bytes_read += n_bytes
+
+    @property
+    def designs_per_second(self) -> float:
+        return self.n_designs / self.elapsed_time if self.elapsed_time > 0 else 0.0
+
+    @property
+    def files_read_per_second(self) -> float:
+        return self.n_files_read / self.elapsed_time if self.elapsed_time > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.n_designs} designs scanned, {self.n_files_read} metadata files read "
+            f"({self.n_bytes_read} bytes) in {self.elapsed_time:.3f}s "
+            f"({self.designs_per_second:.1f} designs/s, {self.files_read_per_second:.1f} reads/s)"
+        )
+
+
+@dataclass
+class DesignMetadataResult:
+    design_name: str
+    st: os.stat_result
+    # None if the caller already had an up-to-date copy of this metadata
+    metadata: dict | None
+
+
+def get_json_loads(fast_json: bool = True) -> Callable[[bytes], dict]:
+    if fast_json and orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+class DesignMetadataLoader:
+    """Concurrent loader for the `design.json` of every design in a dataset.
+
+    Designs are listed with `os.scandir` of `designs_dir` (one per hash prefix
+    dir for the "fanout" layout); the `stat`
+    and read of each metadata file are issued from a bounded thread pool so
+    that many requests are in flight at once on high-latency filesystems such
+    as NFS. Results are yielded in completion order.
+    """
+
+    def __init__(
+        self,
+        n_threads: int = DEFAULT_N_THREADS,
+        metadata_filename: str = "design.json",
+        fast_json: bool = True,
+        layout: str = DEFAULT_DESIGN_LAYOUT,
+    ) -> None:
+        if n_threads < 1:
+            raise ValueError("n_threads must be greater than 0")
+        check_layout(layout)
+        self.n_threads = n_threads
+        self.layout = layout
+        self.metadata_filename = metadata_filename
+        self.json_loads = get_json_loads(fast_json)
+        self.stats = MetadataLoadStats()
+
+    def scan(self, designs_dir: Path) -> Iterator[os.DirEntry]:
+        return scan_design_dirs(designs_dir, self.layout)
+
+    def _load_single(
+        self,
+        design_name: str,
+        design_dir: str,
+        known: StatSignature | None,
+    ) -> DesignMetadataResult | None:
+        metadata_fp = os.path.join(design_dir, self.metadata_filename)
+        try:
+            st = os.stat(metadata_fp)
+        except FileNotFoundError:
+            return None
+        if known is not None and known.matches(st):
+            return DesignMetadataResult(design_name, st, None)
+        with open(metadata_fp, "rb") as f:
+            raw = f.read()
+        self.stats.add_read(len(raw))
+        return DesignMetadataResult(design_name, st, self.json_loads(raw))
+
+    def load(
+        self,
+        designs_dir: Path,
+        known: Mapping[str, StatSignature] | None = None,
+    ) -> Iterator[DesignMetadataResult]:
+        """Yield the metadata of every design in `designs_dir`.
+
+        If `known` maps a design name to a stat signature that still matches
+        its `design.json`, the file is not read and the result's `metadata`
+        is None.
+        """
+        self.stats = MetadataLoadStats()
+        t_start = time.monotonic()
+
+        # keep the number of queued reads bounded so memory stays flat even
+        # for very large datasets
+        max_in_flight = self.n_threads * 4
+        in_flight: set[Future] = set()
+
+        with ThreadPoolExecutor(max_workers=self.n_threads, thread_name_prefix="metadata_loader") as executor:
+            for dir_entry in self.scan(designs_dir):
+                known_entry = known.get(dir_entry.name) if known is not None else None
+                in_flight.add(executor.submit(self._load_single, dir_entry.name, dir_entry.path, known_entry))
+                if len(in_flight) < max_in_flight:
+                    continue
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+
+        self.stats.elapsed_time = time.monotonic() - t_start
+
+    def _collect(self, done: set[Future]) -> Iterator[DesignMetadataResult]:
+        for future in done:
+            result = future.result()
+            if result is None:
+                continue
+            self.stats.n_designs += 1
+            yield result
@@ -0,0 +1,229 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+
+SHARD_MAGIC = b"DDDSHRD1"
+SHARD_END_MAGIC = b"DDDSEND1"
+# footer offset, footer length, end magic
+SHARD_TRAILER = struct.Struct("<QQ8s")
+SHARD_SUFFIX = ".dddshard"
+
+DEFAULT_MAX_SHARD_BYTES = 1 << 30
+
+
+class ShardFormatError(ValueError):
+    pass
+
+
+def check_shard_design_name(design_name: str) -> None:
+    # a design name from a shard becomes a directory name, it must not
+    # point anywhere else
+    if not design_name or design_name in {".", ".."} or "/" in design_name or "\\" in design_name:
+        raise ShardFormatError(f"Invalid design name in shard: {design_name!r}")
+
+
+def check_shard_rel_path(design_name: str, rel_path: str) -> None:
+    path = PurePosixPath(rel_path)
+    if not rel_path or path.is_absolute() or "\\" in rel_path or any(part in {"", ".", ".."} for part in path.parts):
+        raise ShardFormatError(f"Invalid file path in shard for design {design_name}: {rel_path!r}")
+
+
+def iter_design_files(design_dir: Path, metadata_filename: str = "design.json") -> Iterator[tuple[str, Path]]:
+    # every file below the design dir, as posix paths relative to it, in a
+    # stable order
+    for root, dirs, files in os.walk(design_dir):
+        dirs.sort()
+        for file_name in sorted(files):
+            fp = Path(root) / file_name
+            rel = fp.relative_to(design_dir).as_posix()
+            if rel == metadata_filename:
+                continue
+            yield rel, fp
+
+
+class ShardWriter:
+    """Packs designs into a single shard file.
+
+    Layout: an 8 byte magic, the raw bytes of every file back to back, a JSON
+    offset table, and a fixed-size trailer pointing at the table. The table
+    maps each design to its metadata and to the `(offset, size)` of each of
+    its files, so a reader can serve any file with one slice of an mmap.
+    """
+
+    def __init__(self, fp: Path) -> None:
+        self.fp = fp
+        self.f = fp.open("wb")
+        self.f.write(SHARD_MAGIC)
+        self.offset = len(SHARD_MAGIC)
+        self.table: dict[str, dict] = {}
+
+    @property
+    def n_bytes(self) -> int:
+        return self.offset
+
+    def add_design(self, design_dir: Path, metadata: dict) -> None:
+        files: dict[str, list[int]] = {}
+        for rel, fp in iter_design_files(design_dir):
+            with fp.open("rb") as f_src:
+                shutil.copyfileobj(f_src, self.f)
+            size = self.f.tell() - self.offset
+            files[rel] = [self.offset, size]
+            self.offset += size
+        self.table[metadata["design_name"]] = {"metadata": metadata, "files": files}
+
+    def close(self) -> None:
+        footer = json.dumps({"designs": self.table}, separators=(",", ":")).encode()
+        self.f.write(footer)
+        self.f.write(SHARD_TRAILER.pack(self.offset, len(footer), SHARD_END_MAGIC))
+        self.f.close()
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, exc_type: object, exc_val: BaseException | None, exc_tb: object) -> None:
+        self.close()
+
+
+class ShardReader:
+    def __init__(self, fp: Path) -> None:
+        self.fp = fp
+        with fp.open("rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[: len(SHARD_MAGIC)] != SHARD_MAGIC:
+            raise ShardFormatError(f"{fp} is not a design shard")
+        footer_offset, footer_len, end_magic = SHARD_TRAILER.unpack(self.mm[-SHARD_TRAILER.size :])
+        if end_magic != SHARD_END_MAGIC:
+            raise ShardFormatError(f"{fp} is truncated or corrupt")
+        footer = json.loads(self.mm[footer_offset : footer_offset + footer_len])
+        self.designs: dict[str, dict] = footer["designs"]
+
+    def view(self, design_name: str, rel_path: str) -> memoryview:
+        offset, size = self.designs[design_name]["files"][rel_path]
+        return memoryview(self.mm)[offset : offset + size]
+
+    def read_bytes(self, design_name: str, rel_path: str) -> bytes:
+        offset, size = self.designs[design_name]["files"][rel_path]
+        return self.mm[offset : offset + size]
+
+    def close(self) -> None:
+        self.mm.close()
+
+
+class ShardFile:
+    """A read-only, `Path`-like handle to a file stored in a shard."""
+
+    def __init__(self, reader: ShardReader, design_name: str, rel_path: str) -> None:
+        self.reader = reader
+        self.design_name = design_name
+        self.rel_path = rel_path
+        self.path = PurePosixPath(rel_path)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def suffix(self) -> str:
+        return self.path.suffix
+
+    @property
+    def size(self) -> int:
+        return self.reader.designs[self.design_name]["files"][self.rel_path][1]
+
+    def read_bytes(self) -> bytes:
+        return self.reader.read_bytes(self.design_name, self.rel_path)
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        return self.read_bytes().decode(encoding)
+
+    def __repr__(self) -> str:
+        return f"ShardFile({self.reader.fp.name}:{self.design_name}/{self.rel_path})"
+
+
+def write_shards(
+    designs: list[tuple[dict, Path]],
+    out_dir: Path,
+    max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES,
+) -> list[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shard_fps: list[Path] = []
+    writer: ShardWriter | None = None
+    for metadata, design_dir in designs:
+        if writer is not None and writer.n_bytes >= max_shard_bytes:
+            writer.close()
+            writer = None
+        if writer is None:
+            shard_fp = out_dir / f"shard_{len(shard_fps):05d}{SHARD_SUFFIX}"
+            writer = ShardWriter(shard_fp)
+            shard_fps.append(shard_fp)
+        writer.add_design(design_dir, metadata)
+    if writer is not None:
+        writer.close()
+    return shard_fps
+
+
+class ShardedDesignDataset:
+    """Read-only dataset backend that serves designs straight from shards
+    written by `DesignDataset.export_shards`, without unpacking them.
+    """
+
+    def __init__(self, shards_dir: Path) -> None:
+        self.shards_dir = shards_dir
+        self.readers = [ShardReader(fp) for fp in sorted(shards_dir.glob(f"*{SHARD_SUFFIX}"))]
+        self.design_to_reader: dict[str, ShardReader] = {}
+        for reader in self.readers:
+            for design_name in reader.designs:
+                self.design_to_reader[design_name] = reader
+
+    def _design(self, design_name: str) -> tuple[ShardReader, dict]:
+        reader = self.design_to_reader.get(design_name)
+        if reader is None:
+            raise ValueError(f"Design {design_name} not found in dataset.")
+        return reader, reader.designs[design_name]
+
+    @property
+    def index(self) -> list[dict]:
+        # sorted by "design_name"
+        return [dict(self._design(design_name)[1]["metadata"]) for design_name in sorted(self.design_to_reader)]
+
+    @property
+    def index_generator(self) -> Iterator[dict]:
+        for reader in self.readers:
+            for entry in reader.designs.values():
+                yield dict(entry["metadata"])
+
+    def get_design_metadata_by_design_name(self, design_name: str) -> dict | None:
+        if design_name not in self.design_to_reader:
+            return None
+        return dict(self._design(design_name)[1]["metadata"])
+
+    def get_design_metadata_by_dataset_name(self, dataset_name: str) -> list[dict]:
+        return [design for design in self.index if design["dataset_name"] == dataset_name]
+
+    def get_design_files(self, design_name: str, prefix: str = "") -> list[ShardFile]:
+        reader, entry = self._design(design_name)
+        return [ShardFile(reader, design_name, rel) for rel in entry["files"] if rel.startswith(prefix)]
+
+    def get_design_source_files(self, design_name: str) -> list[ShardFile]:
+        return [f for f in self.get_design_files(design_name, "sources/") if f.path.parent.name == "sources"]
+
+    def get_flow_files(self, design_name: str, flow_name: str) -> list[ShardFile]:
+        return self.get_design_files(design_name, f"flows/{flow_name}/")
+
+    def read_design_file(self, design_name: str, rel_path: str) -> bytes:
+        reader, entry = self._design(design_name)
+        if rel_path not in entry["files"]:
+            raise FileNotFoundError(f"{rel_path} not found in design {design_name}")
+        return reader.read_bytes(design_name, rel_path)
+
+    def close(self) -> None:
+        for reader in self.readers:
+            reader.close()
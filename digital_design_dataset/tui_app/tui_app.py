@@ -15,6 +15,8 @@ from textual.widgets import (
     Static,
 )
 
+from digital_design_dataset.design_layout import read_dataset_layout, scan_design_dirs
+
 
 class DigitalDesignDatasetApp(App):
     def __init__(self, dataset_dir: Path) -> None:
@@ -31,7 +33,8 @@ class DigitalDesignDatasetApp(App):
 
     @property
     def design_names(self) -> list[str]:
-        return [design.name for design in self.design_dir.iterdir() if design.is_dir()]
+        layout = read_dataset_layout(self.dataset_dir)
+        return [design.name for design in scan_design_dirs(self.design_dir, layout)]
 
     def compose(self) -> ComposeResult:
         yield Header()
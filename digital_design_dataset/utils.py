@@ -22,3 +22,15 @@ def auto_find_bin(bin_name: str) -> Path | None:
             return bin_path_obj
 
     return None
+
+
+def dir_size(fp: Path) -> int:
+    # total size of the files below fp, 0 if it does not exist
+    total = 0
+    for root, _, files in os.walk(fp):
+        for file_name in files:
+            try:
+                total += Path(root, file_name).lstat().st_size
+            except FileNotFoundError:
+                continue
+    return total
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from digital_design_dataset.data_sources.blif import normalize_blif
+
+BLIF_MCNC = """\
+# latch without a clock, an exdc section, and no final .end
+.model s27
+.inputs a b
+.outputs y
+.latch n1 q 0
+.names a q \\
+n1
+11 1
+.names b y
+1 1
+.exdc
+.inputs a b
+.names a b y
+11 1
+.end
+.model sub
+.inputs x
+.outputs z
+.names x z
+1 1
+"""
+
+BLIF_IWLS = """\
+.model top
+.inputs a
+.outputs y z w
+.names  y
+1
+.names w
+-
+.names a z
+0 1
+.end
+.model top
+.inputs a
+.outputs y
+.end
+"""
+
+
+def test_normalize_blif_mcnc(tmp_path: Path) -> None:
+    fp = tmp_path / "s27.blif"
+    fp.write_text(BLIF_MCNC)
+    fixes = normalize_blif(fp)
+    assert fixes.fired == ["exdc_sections_removed", "latches_clocked", "ends_added"]
+    assert fp.read_text() == (
+        "# latch without a clock, an exdc section, and no final .end\n"
+        ".model s27\n"
+        ".inputs a b\n"
+        ".inputs clk\n"
+        ".outputs y\n"
+        ".latch n1 q re clk 0\n"
+        ".names a q \\\n"
+        "n1\n"
+        "11 1\n"
+        ".names b y\n"
+        "1 1\n"
+        ".end\n"
+        ".model sub\n"
+        ".inputs x\n"
+        ".outputs z\n"
+        ".names x z\n"
+        "1 1\n"
+        ".end\n"
+    )
+
+
+def test_normalize_blif_iwls(tmp_path: Path) -> None:
+    fp = tmp_path / "top.blif"
+    fp.write_text(BLIF_IWLS)
+    out_fp = tmp_path / "top_fixed.blif"
+    fixes = normalize_blif(fp, out_fp)
+    assert (fixes.n_constants_moved, fixes.n_constants_dropped, fixes.n_duplicate_models_removed) == (1, 1, 1)
+    assert fp.read_text() == BLIF_IWLS
+    assert out_fp.read_text() == ".model top\n.inputs a\n.outputs y z w\n.names a z\n0 1\n.names y\n1\n.end\n"
+
+    # already normalized files are left as they are
+    assert normalize_blif(out_fp).fired == []
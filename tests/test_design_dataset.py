@@ -0,0 +1,437 @@
+import json
+import shutil
+import tarfile
+from pathlib import Path
+from typing import ClassVar
+
+import pytest
+
+from digital_design_dataset.blob_store import break_link
+from digital_design_dataset.columnar_export import read_parquet_export
+from digital_design_dataset.data_sources.data_retrievers import (
+    DataRetriever,
+    OpencoresDatasetRetriever,
+    RetrieverLimits,
+)
+from digital_design_dataset.data_sources.orchestrator import RetrieverOrchestrator
+from digital_design_dataset.design_dataset import DesignDataset, build_design_scaffolding
+from digital_design_dataset.design_index import DesignIndex, DesignIndexEntry
+from digital_design_dataset.metadata_loader import DesignMetadataLoader
+from digital_design_dataset.shards import ShardFormatError, ShardWriter, ShardedDesignDataset
+
+
+def make_designs(d: DesignDataset, n: int, dataset_name: str = "test", prefix: str = "test") -> list[str]:
+    design_names = []
+    for i in range(n):
+        scaffold = build_design_scaffolding(d.designs_dir, f"design_{i}", prefix, dataset_name, ["benchmark"])
+        (scaffold.source_dir / f"design_{i}.v").write_text(f"module design_{i}(); endmodule\n")
+        design_names.append(scaffold.design_name)
+    return design_names
+
+
+def test_index_persisted(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    design_names = make_designs(d, 5)
+
+    assert [design["design_name"] for design in d.index] == sorted(design_names)
+    assert d.does_index_exist
+
+    # a fresh dataset object loads the index from disk without reparsing
+    d_reopened = DesignDataset(tmp_path / "db")
+    assert len(d_reopened.design_index) == 5
+    assert d_reopened.design_index.refresh() is False
+
+
+def test_index_incremental_refresh(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    make_designs(d, 3)
+    assert len(d.index) == 3
+
+    # modify one design.json, add one design, and delete one design
+    metadata_fp = d.designs_dir / "test__design_0" / "design.json"
+    metadata = json.loads(metadata_fp.read_text())
+    metadata["extra"] = "value"
+    metadata_fp.write_text(json.dumps(metadata, indent=4))
+    build_design_scaffolding(d.designs_dir, "design_new", "test", "test", ["benchmark"])
+    shutil.rmtree(d.designs_dir / "test__design_1")
+
+    index = DesignIndex(d.index_path, d.designs_dir)
+    assert index.refresh() is True
+    names = [design["design_name"] for design in index.designs]
+    assert names == ["test__design_0", "test__design_2", "test__design_new"]
+    assert index.entries["test__design_0"].metadata["extra"] == "value"
+
+
+def test_index_skips_rescan_when_unchanged(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    make_designs(d, 3)
+    assert len(d.index) == 3
+
+    # an edit in place, like a flow recording its results, does not touch
+    # designs_dir but is picked up from the stat of the design.json
+    metadata_fp = d.designs_dir / "test__design_0" / "design.json"
+    metadata = json.loads(metadata_fp.read_text())
+    metadata["flows"] = {"line_count": {}}
+    metadata_fp.write_text(json.dumps(metadata, indent=4))
+    assert not d.design_index.is_stale()
+    assert d.index[0]["flows"] == {"line_count": {}}
+    assert DesignDataset(tmp_path / "db").index[0]["flows"] == {"line_count": {}}
+
+    metadata["extra"] = "value"
+    metadata_fp.write_text(json.dumps(metadata, indent=4))
+    assert next(m for m in d.index_generator if m["design_name"] == "test__design_0")["extra"] == "value"
+    assert d.refresh_index() is False
+
+    build_design_scaffolding(d.designs_dir, "design_new", "test", "test", ["benchmark"])
+    assert len(d.index) == 4
+    assert len(list(d.index_generator)) == 4
+
+
+def test_secondary_index_lookups(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    make_designs(d, 4, dataset_name="set_a", prefix="a")
+    make_designs(d, 2, dataset_name="set_b", prefix="b")
+    d.build_design_scaffolding("tagged", "c", "set_c", ["synthetic"])
+
+    assert d.get_design_metadata_by_design_name("a__design_2") is not None
+    assert d.get_design_metadata_by_design_name("missing") is None
+    assert [m["design_name"] for m in d.get_design_metadata_by_dataset_name("set_b")] == ["b__design_0", "b__design_1"]
+    assert len(d.get_design_metadata_by_tag("benchmark")) == 6
+    assert [m["design_name"] for m in d.get_design_metadata_by_tag("synthetic")] == ["c__tagged"]
+
+    d.delete_multiple_designs([m["design_name"] for m in d.get_design_metadata_by_dataset_name("set_a")])
+    assert d.get_design_metadata_by_dataset_name("set_a") == []
+    assert len(d.get_design_metadata_by_tag("benchmark")) == 2
+    assert len(d.index) == 3
+
+
+def test_metadata_loader(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    design_names = make_designs(d, 20)
+
+    loader = DesignMetadataLoader(n_threads=4)
+    results = list(loader.load(d.designs_dir))
+    assert sorted(r.design_name for r in results) == sorted(design_names)
+    assert loader.stats.n_designs == 20
+    assert loader.stats.n_files_read == 20
+
+    # designs whose stat signature is already known are not read again
+    known = {r.design_name: DesignIndexEntry(r.st.st_mtime_ns, r.st.st_size, r.st.st_ino, {}) for r in results[:5]}
+    results = list(loader.load(d.designs_dir, known=known))
+    assert sum(r.metadata is None for r in results) == 5
+    assert loader.stats.n_files_read == 15
+
+
+def test_dedup_sources(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db", dedup_sources=True)
+    shared = b"module shared(); endmodule\n"
+    fps = []
+    for i in range(3):
+        scaffold = d.build_design_scaffolding(f"design_{i}", "test", "test", ["benchmark"])
+        fp = scaffold.source_dir / "shared.v"
+        d.write_design_file(fp, shared)
+        fps.append(fp)
+
+    assert all(fp.read_bytes() == shared for fp in fps)
+    assert d.blob_store is not None
+    assert len(list(d.blob_store.root.glob("??/*"))) == 1
+
+    # rewriting a design file never changes the other designs sharing its blob
+    DesignDataset(tmp_path / "db").write_design_file(fps[0], b"module changed(); endmodule\n")
+    assert fps[0].read_bytes() == b"module changed(); endmodule\n"
+    break_link(fps[1])
+    with fps[1].open("ab") as f:
+        f.write(b"// edited\n")
+    assert fps[2].read_bytes() == shared
+
+    d.delete_all_designs()
+    assert d.blob_store.gc() == 1
+
+
+def test_shards_roundtrip(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    design_names = make_designs(d, 6)
+    flow_dir = d.designs_dir / design_names[0] / "flows" / "line_count"
+    flow_dir.mkdir(parents=True)
+    (flow_dir / "num_lines.txt").write_text("1")
+
+    shard_fps = d.export_shards(tmp_path / "shards", max_shard_bytes=64)
+    assert len(shard_fps) > 1
+
+    sharded = ShardedDesignDataset(tmp_path / "shards")
+    assert sharded.index == d.index
+    sources = sharded.get_design_source_files(design_names[3])
+    assert [f.name for f in sources] == ["design_3.v"]
+    assert sources[0].read_text() == "module design_3(); endmodule\n"
+    assert [f.read_bytes() for f in sharded.get_flow_files(design_names[0], "line_count")] == [b"1"]
+    sharded.close()
+
+    d_imported = DesignDataset(tmp_path / "db_imported")
+    assert sorted(d_imported.import_shards(tmp_path / "shards")) == design_names
+    assert d_imported.index == d.index
+    assert (d_imported.designs_dir / design_names[0] / "flows" / "line_count" / "num_lines.txt").read_text() == "1"
+
+
+
+@pytest.mark.parametrize(
+    ("design_name", "rel_path"),
+    [("../escape", "sources/a.v"), ("test__ok", "../../escape.v"), ("test__ok", "/tmp/escape.v")],
+)
+def test_import_shards_rejects_unsafe_paths(tmp_path: Path, design_name: str, rel_path: str) -> None:
+    d = DesignDataset(tmp_path / "db")
+    (design_name_ok,) = make_designs(d, 1)
+    (tmp_path / "shards").mkdir()
+    writer = ShardWriter(tmp_path / "shards" / "shard_00000.dddshard")
+    writer.add_design(d.design_dir(design_name_ok), d.index[0])
+    entry = writer.table.pop(design_name_ok)
+    entry["metadata"]["design_name"] = design_name
+    entry["files"] = {rel_path: next(iter(entry["files"].values()))}
+    writer.table[design_name] = entry
+    writer.close()
+
+    d_imported = DesignDataset(tmp_path / "db_imported")
+    with pytest.raises(ShardFormatError):
+        d_imported.import_shards(tmp_path / "shards")
+    assert not (tmp_path / "escape").exists()
+    assert not (tmp_path / "escape.v").exists()
+    assert d_imported.index == []
+
+def test_fanout_layout_and_migration(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db", layout="fanout")
+    scaffolds = [d.build_design_scaffolding(f"design_{i}", "test", "test", ["benchmark"]) for i in range(10)]
+    design_names = sorted(s.design_name for s in scaffolds)
+    for scaffold in scaffolds:
+        assert scaffold.design_dir_fp == d.design_dir(scaffold.design_name)
+        assert scaffold.design_dir_fp.parent.parent.parent == d.designs_dir
+    assert [design["design_name"] for design in d.index] == design_names
+    assert [f.name for f in d.get_design_source_files(design_names[0])] == []
+
+    # the layout is persisted and cannot be changed without a migration
+    assert DesignDataset(tmp_path / "db").layout == "fanout"
+    with pytest.raises(ValueError, match="migrate_layout"):
+        DesignDataset(tmp_path / "db", layout="flat")
+
+    d.delete_design(design_names[0])
+    assert not d.design_dir(design_names[0]).exists()
+    assert len(DesignDataset(tmp_path / "db").index) == 9
+
+    d.migrate_layout("flat")
+    assert sorted(p.name for p in d.designs_dir.iterdir()) == design_names[1:]
+    assert [design["design_name"] for design in DesignDataset(tmp_path / "db", layout="flat").index] == design_names[1:]
+
+
+def test_parquet_export_incremental(tmp_path: Path) -> None:
+    pc = pytest.importorskip("pyarrow.compute")
+    d = DesignDataset(tmp_path / "db")
+    design_names = make_designs(d, 8)
+
+    stats = d.export_parquet(tmp_path / "parquet", row_group_bytes=64, max_shard_bytes=128, n_threads=2)
+    assert stats.n_designs_written == 8
+    assert len(stats.shards_written) > 1
+    table = read_parquet_export(tmp_path / "parquet")
+    assert sorted(table["design_name"].to_pylist()) == design_names
+    row = table.filter(pc.equal(table["design_name"], design_names[2])).to_pylist()[0]
+    assert row["file_name"] == "design_2.v"
+    assert row["content"] == b"module design_2(); endmodule\n"
+    assert row["dataset_tags"] == ["benchmark"]
+
+    # only the changed and the new design are written again
+    (d.design_dir(design_names[2]) / "sources" / "design_2.v").write_text("module design_2(input a); endmodule\n")
+    scaffold = d.build_design_scaffolding("design_new", "test", "test", ["benchmark"])
+    (scaffold.source_dir / "design_new.v").write_text("module design_new(); endmodule\n")
+    d.delete_design(design_names[5])
+    stats = d.export_parquet(tmp_path / "parquet", n_threads=2)
+    assert (stats.n_designs_written, stats.n_designs_unchanged, stats.n_designs_removed) == (2, 6, 1)
+
+    table = read_parquet_export(tmp_path / "parquet", columns=["design_name", "content"])
+    rows = {r["design_name"]: r["content"] for r in table.to_pylist()}
+    assert len(rows) == table.num_rows == 8
+    assert rows[design_names[2]] == b"module design_2(input a); endmodule\n"
+    assert design_names[5] not in rows
+    assert rows["test__design_new"] == b"module design_new(); endmodule\n"
+
+    assert d.export_parquet(tmp_path / "parquet").n_designs_written == 0
+
+
+def test_staged_design_commit_and_abort(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    staged = d.stage_design("test__staged", "test", ["benchmark"], fingerprint="a")
+    (staged.source_dir / "staged.v").write_text("module staged(); endmodule\n")
+
+    # nothing is visible until the design is committed
+    assert d.get_design_metadata_by_design_name("test__staged") is None
+    assert not d.is_design_complete("test__staged")
+    staged.commit()
+    assert staged.design_dir_fp == d.design_dir("test__staged")
+    assert [f.name for f in d.get_design_source_files("test__staged")] == ["staged.v"]
+    assert d.is_design_complete("test__staged", "a")
+    assert not d.is_design_complete("test__staged", "b")
+
+    # a failed rebuild leaves the committed design untouched
+    with pytest.raises(RuntimeError), d.stage_design("test__staged", "test", ["benchmark"], fingerprint="b"):
+        raise RuntimeError
+    assert d.is_design_complete("test__staged", "a")
+
+    with d.stage_design("test__staged", "test", ["benchmark"], fingerprint="b") as staged:
+        (staged.source_dir / "rebuilt.v").write_text("module rebuilt(); endmodule\n")
+    assert [f.name for f in d.get_design_source_files("test__staged")] == ["rebuilt.v"]
+    assert d.is_design_complete("test__staged", "b")
+    assert list(d.staging_dir.iterdir()) == []
+
+    # only staging dirs whose lock is no longer held are cleaned up
+    in_progress = d.stage_design("test__in_progress", "test", ["benchmark"])
+    (d.staging_dir / "test__crashed.abcdefgh").mkdir()
+    (d.staging_dir / "test__crashed.abcdefgh.lock").touch()
+    assert DesignDataset(tmp_path / "db").clean_staging() == 0
+    staging_names = sorted(fp.name for fp in d.staging_dir.iterdir())
+    assert staging_names == [in_progress.design_dir_fp.name, f"{in_progress.design_dir_fp.name}.lock"]
+    in_progress.abort()
+    assert list(d.staging_dir.iterdir()) == []
+    assert [design["design_name"] for design in d.index] == ["test__staged"]
+
+
+class InMemoryRetriever(DataRetriever):
+    dataset_name: str = "in_memory"
+    dataset_tags: ClassVar[list[str]] = ["synthetic"]
+
+    SOURCES: ClassVar[dict[str, str]] = {"default": "module default(); endmodule\n"}
+
+    def __init__(
+        self,
+        design_dataset: DesignDataset,
+        sources: dict[str, str] | None = None,
+        limits: RetrieverLimits | None = None,
+    ) -> None:
+        super().__init__(design_dataset, limits=limits)
+        self.sources = sources if sources is not None else self.SOURCES
+        self.n_built = 0
+
+    def get_dataset(self, overwrite: bool = False) -> None:
+        for name, text in self.sources.items():
+            design_name = f"in_memory__{name}"
+            fingerprint = self.design_fingerprint(text)
+            if self.is_design_up_to_date(design_name, fingerprint, overwrite):
+                continue
+            with self.stage_design(design_name, fingerprint) as scaffold, self.cpu_slot():
+                (scaffold.source_dir / f"{name}.v").write_text(text)
+            self.n_built += 1
+
+
+class BrokenRetriever(DataRetriever):
+    dataset_name: str = "broken"
+    dataset_tags: ClassVar[list[str]] = ["synthetic"]
+
+    def get_dataset(self, overwrite: bool = False) -> None:
+        with self.network_slot():
+            raise RuntimeError("upstream is down")
+
+
+def test_retriever_resume(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    sources = {f"design_{i}": f"module design_{i}(); endmodule\n" for i in range(4)}
+    InMemoryRetriever(d, sources).get_dataset()
+
+    # only the changed design is rebuilt, unless overwrite is set
+    sources["design_1"] = "module design_1(input a); endmodule\n"
+    r = InMemoryRetriever(DesignDataset(tmp_path / "db"), sources)
+    r.get_dataset()
+    assert r.n_built == 1
+    assert (d.design_dir("in_memory__design_1") / "sources" / "design_1.v").read_text() == sources["design_1"]
+    r.get_dataset(overwrite=True)
+    assert r.n_built == 5
+    assert len(d.get_design_metadata_by_dataset_name("in_memory")) == 4
+
+
+def test_orchestrator_isolates_failures(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    orchestrator = RetrieverOrchestrator(d, [BrokenRetriever, InMemoryRetriever], max_network_jobs=1, max_cpu_jobs=1)
+    report = orchestrator.run()
+    assert [s.dataset_name for s in report.stats] == ["broken", "in_memory"]
+    assert [s.dataset_name for s in report.failed] == ["broken"]
+    assert "upstream is down" in report.failed[0].error
+    assert report.stats[1].n_designs_built == 1
+    assert [design["design_name"] for design in DesignDataset(tmp_path / "db").index] == ["in_memory__default"]
+
+    # the semaphores were released despite the failure
+    report = orchestrator.run()
+    assert (report.stats[1].n_designs_built, report.stats[1].n_designs_skipped) == (0, 1)
+    assert "in_memory" in str(report)
+
+
+def make_opencores_archive(tar_fp: Path, designs: dict[str, dict[str, bytes]]) -> None:
+    src_dir = tar_fp.parent / "src"
+    for design, files in designs.items():
+        for file_name, data in files.items():
+            fp = src_dir / "designs" / design / file_name
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            fp.write_bytes(data)
+    with tarfile.open(tar_fp, "w:gz") as tar:
+        tar.add(src_dir / "designs", arcname="designs")
+
+
+def test_opencores_streaming_import(tmp_path: Path) -> None:
+    tar_fp = tmp_path / "designs.tar.gz"
+    make_opencores_archive(
+        tar_fp,
+        {
+            "uart": {"top.txt": b"uart_top", "rtl/uart.v": b"module uart(); endmodule\n", "doc/README": b"\xff\xfe"},
+            "spi": {"spi.sv": b"module spi(); endmodule\n"},
+            "6809_6309_compatible_core": {"cpu.v": b"module cpu(); endmodule\n"},
+        },
+    )
+    d = DesignDataset(tmp_path / "db")
+    r = OpencoresDatasetRetriever(d)
+    r.import_archive(tar_fp)
+    assert r.stats.n_designs_built == 2
+    uart_dir = d.design_dir("opencores__uart")
+    assert (uart_dir / "top.txt").read_text() == "uart_top"
+    assert (uart_dir / "sources" / "uart.v").exists()
+    # copied as bytes, not decoded
+    assert (uart_dir / "aux_files" / "README").read_bytes() == b"\xff\xfe"
+    assert not (uart_dir / "aux_files" / "top.txt").exists()
+    assert not d.design_dir("opencores__6809_6309_compatible_core").exists()
+    assert not any(d.staging_dir.iterdir())
+
+    r.import_archive(tar_fp)
+    assert r.stats.n_designs_skipped == 2
+
+
+class SevenZipRetriever(DataRetriever):
+    dataset_name: str = "seven_zip"
+    dataset_tags: ClassVar[list[str]] = ["synthetic"]
+
+    def __init__(self, design_dataset: DesignDataset, archive_fp: Path) -> None:
+        super().__init__(design_dataset)
+        self.archive_fp = archive_fp
+
+    def get_dataset(self, overwrite: bool = False) -> None:
+        def plan_designs(names: list[str]) -> dict[str, list[str]]:
+            return {
+                f"seven_zip__{Path(n).stem}": [n, "Verilog/lib.v"]
+                for n in names
+                if n.endswith(".v") and n != "Verilog/lib.v"
+            }
+
+        for scaffold, members in self.ingest_7z(self.archive_fp, plan_designs, overwrite):
+            for fp in members.values():
+                self.design_dataset.copy_design_file(fp, scaffold.source_dir)
+
+
+def test_ingest_7z(tmp_path: Path) -> None:
+    py7zr = pytest.importorskip("py7zr")
+
+    archive_fp = tmp_path / "bench.7z"
+    with py7zr.SevenZipFile(archive_fp, "w") as archive:
+        archive.writestr(b"module lib(); endmodule\n", "Verilog/lib.v")
+        for name in ["c17", "c432"]:
+            archive.writestr(f"module {name}(); endmodule\n".encode(), f"Verilog/{name}.v")
+
+    d = DesignDataset(tmp_path / "db")
+    r = SevenZipRetriever(d, archive_fp)
+    r.get_dataset()
+    assert r.stats.n_designs_built == 2
+    assert sorted(fp.name for fp in (d.design_dir("seven_zip__c17") / "sources").iterdir()) == ["c17.v", "lib.v"]
+    assert not any(d.staging_dir.iterdir())
+
+    r.get_dataset()
+    assert (r.stats.n_designs_built, r.stats.n_designs_skipped) == (2, 2)
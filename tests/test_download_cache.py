@@ -0,0 +1,96 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from digital_design_dataset.data_sources.download_cache import DownloadCache
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), ArchiveHandler)
+        self.files: dict[str, bytes] = {}
+        self.n_bodies_served = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    server: ArchiveServer
+
+    def do_GET(self) -> None:
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        etag = f'"{hash(data):x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.n_bodies_served += 1
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[ArchiveServer]:
+    server = ArchiveServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_cache_revalidation(tmp_path: Path, server: ArchiveServer) -> None:
+    server.files["/ISCAS.7z"] = b"iscas archive"
+    server.files["/ISCAS_copy.7z"] = b"iscas archive"
+    cache = DownloadCache(tmp_path / "http")
+
+    first = cache.get(f"{server.url}/ISCAS.7z")
+    assert not first.from_cache
+    assert first.fp.read_bytes() == b"iscas archive"
+
+    # unchanged on the server, revalidated with the ETag without a body
+    second = cache.get(f"{server.url}/ISCAS.7z")
+    assert second.from_cache
+    assert second.fp == first.fp
+    assert server.n_bodies_served == 1
+
+    # same content from another URL is stored as the same blob
+    copy = cache.get(f"{server.url}/ISCAS_copy.7z")
+    assert copy.fp == first.fp
+    assert len(list((tmp_path / "http" / "blobs").rglob("*"))) == 2
+
+    server.files["/ISCAS.7z"] = b"iscas archive v2"
+    third = cache.get(f"{server.url}/ISCAS.7z")
+    assert not third.from_cache
+    assert third.fp.read_bytes() == b"iscas archive v2"
+    assert server.n_bodies_served == 3
+    assert (cache.stats.hits, cache.stats.misses) == (1, 3)
+
+    with pytest.raises(RuntimeError):
+        cache.get(f"{server.url}/missing.7z")
+
+
+def test_download_cache_offline(tmp_path: Path, server: ArchiveServer) -> None:
+    server.files["/MCNC.tar.gz"] = b"mcnc archive"
+    url = f"{server.url}/MCNC.tar.gz"
+    DownloadCache(tmp_path / "http").get(url)
+
+    server.shutdown()
+    offline_cache = DownloadCache(tmp_path / "http", offline=True)
+    assert offline_cache.get(url).fp.read_bytes() == b"mcnc archive"
+    with pytest.raises(FileNotFoundError):
+        offline_cache.get(f"{server.url}/other.tar.gz")
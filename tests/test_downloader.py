@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from digital_design_dataset.data_sources.downloader import download_file
+
+
+class FlakyServer(ThreadingHTTPServer):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(("127.0.0.1", 0), FlakyHandler)
+        self.data = data
+        # number of responses that are cut off half way
+        self.n_failures = 0
+        self.ranges: list[str | None] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/MCNC.7z"
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    server: FlakyServer
+
+    def do_GET(self) -> None:
+        data = self.server.data
+        range_header = self.headers.get("Range")
+        self.server.ranges.append(range_header)
+        start = int(range_header.removeprefix("bytes=").removesuffix("-")) if range_header else 0
+        if start:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        body = data[start:]
+        if self.server.n_failures > 0:
+            self.server.n_failures -= 1
+            body = body[: len(body) // 2]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[FlakyServer]:
+    server = FlakyServer(bytes(range(256)) * 4096)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_resumes_with_range(tmp_path: Path, server: FlakyServer) -> None:
+    server.n_failures = 2
+    fp = tmp_path / "MCNC.7z"
+    result = download_file(server.url, fp, chunk_size=4096, backoff_s=0)
+    assert fp.read_bytes() == server.data
+    assert result.sha256 == hashlib.sha256(server.data).hexdigest()
+    assert result.n_retries == 2
+    assert server.ranges[0] is None
+    assert all(r is not None and r.startswith("bytes=") for r in server.ranges[1:])
+    # the interrupted halves are not transferred again
+    assert result.bytes_fetched == len(server.data)
+    assert not fp.with_name("MCNC.7z.part").exists()
+
+
+def test_download_verifies_hash(tmp_path: Path, server: FlakyServer) -> None:
+    fp = tmp_path / "MCNC.7z"
+    with pytest.raises(RuntimeError, match="SHA-256"):
+        download_file(server.url, fp, expected_sha256="0" * 64, backoff_s=0)
+    assert not fp.exists()
+    result = download_file(server.url, fp, expected_size=len(server.data), backoff_s=0)
+    assert result.size == len(server.data)
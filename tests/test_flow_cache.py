@@ -0,0 +1,108 @@
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from digital_design_dataset.design_dataset import DesignDataset
+from digital_design_dataset.flows.flows import LineCountFlow
+from digital_design_dataset.flows.yosys.yosys_user_defined import YosysUserDefinedFlow
+
+
+class SettingsLineCountFlow(LineCountFlow):
+    def __init__(self, design_dataset: DesignDataset, setting: str) -> None:
+        super().__init__(design_dataset)
+        self.setting = setting
+
+    def flow_settings(self, design: dict[str, Any]) -> dict[str, Any]:
+        return {"setting": self.setting}
+
+
+class CountingLineCountFlow(LineCountFlow):
+    def __init__(self, design_dataset: DesignDataset) -> None:
+        super().__init__(design_dataset)
+        self.n_checks: Counter[str] = Counter()
+
+    def flow_settings(self, design: dict[str, Any]) -> dict[str, Any]:
+        # called once every time the cache of a design is checked
+        self.n_checks[design["design_name"]] += 1
+        return {}
+
+
+def test_flow_cache(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    for name in ["a", "b"]:
+        with d.stage_design(f"test__{name}", "test", []) as staged:
+            (staged.source_dir / f"{name}.v").write_text(f"module {name}();\nendmodule\n")
+
+    flow = SettingsLineCountFlow(d, "x")
+    flow.build_flow()
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (0, 2)
+    assert (flow.flow_dir("test__a") / "num_lines.txt").read_text() == "2"
+
+    flow.build_flow()
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (2, 0)
+
+    # touching a source without changing it keeps the results
+    source_fp = d.design_dir("test__a") / "sources" / "a.v"
+    os.utime(source_fp, ns=(0, 0))
+    flow.build_flow()
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (2, 0)
+
+    source_fp.write_text("module a();\n\nendmodule\n")
+    flow.build_flow()
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (1, 1)
+    assert (flow.flow_dir("test__a") / "num_lines.txt").read_text() == "3"
+
+    flow = SettingsLineCountFlow(d, "y")
+    flow.build_flow()
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (0, 2)
+
+    flow.build_flow(overwrite=True)
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (0, 2)
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_flow_cache_checked_once(tmp_path: Path, backend: str) -> None:
+    d = DesignDataset(tmp_path / "db")
+    for name in ["a", "b"]:
+        with d.stage_design(f"test__{name}", "test", []) as staged:
+            (staged.source_dir / f"{name}.v").write_text(f"module {name}();\nendmodule\n")
+
+    # the thread backend shares the flow, so its counts include the workers
+    flow = CountingLineCountFlow(d)
+    report = flow.build_flow(backend=backend, n_jobs=1 if backend == "process" else 2, progress=False)
+    assert len(report.succeeded) == 2  # noqa: PLR2004
+    assert flow.n_checks == {"test__a": 1, "test__b": 1}
+    assert not flow.planned_manifests
+    assert (flow.flow_dir("test__a") / "num_lines.txt").read_text() == "2"
+
+    flow.build_flow(progress=False)
+    assert (flow.cache_stats.hits, flow.cache_stats.misses) == (2, 0)
+
+
+def test_yosys_user_defined_flow_settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    jinja2 = pytest.importorskip("jinja2")
+    d = DesignDataset(tmp_path / "db")
+    with d.stage_design("test__ab", "test", []) as staged:
+        for name in ["b", "a"]:
+            (staged.source_dir / f"{name}.v").write_text(f"module {name}();\nendmodule\n")
+
+    template = "{% for fp in sources_fps %}read_verilog {{ fp }}\n{% endfor %}"
+    flow = YosysUserDefinedFlow(d, script_template=template)
+    design = d.get_design_metadata_by_design_name("test__ab")
+    assert design is not None
+    sources_dir = d.design_dir("test__ab") / "sources"
+    assert flow.render_script(design) == f"read_verilog {sources_dir / 'a.v'}\nread_verilog {sources_dir / 'b.v'}\n"
+    settings = flow.flow_settings(design)
+    assert settings == {"script_template": template, "sources": ["a.v", "b.v"]}
+
+    # the cache key does not depend on where the dataset is or its layout
+    monkeypatch.chdir(tmp_path)
+    assert YosysUserDefinedFlow(DesignDataset(Path("db")), script_template=template).flow_settings(design) == settings
+    d.migrate_layout("fanout")
+    assert YosysUserDefinedFlow(d, script_template=template).flow_settings(design) == settings
+
+    flow = YosysUserDefinedFlow(d, script_template=jinja2.Template(template))
+    assert flow.flow_settings(design)["script_template"] == "read_verilog sources/a.v\nread_verilog sources/b.v\n"
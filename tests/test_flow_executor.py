@@ -0,0 +1,47 @@
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from digital_design_dataset.design_dataset import DesignDataset
+from digital_design_dataset.flows.flows import LineCountFlow
+
+
+class FlakyLineCountFlow(LineCountFlow):
+    flow_name: str = "flaky_line_count"
+
+    def build_flow_single(self, design: dict[str, Any], overwrite: bool = False) -> None:
+        if design["design_name"] == "test__broken":
+            raise ValueError("broken design")
+        if design["design_name"] == "test__slow":
+            time.sleep(30)
+        super().build_flow_single(design, overwrite=overwrite)
+
+
+@pytest.mark.parametrize(("backend", "n_jobs"), [("process", 1), ("process", 2), ("thread", 2), ("asyncio", 2)])
+def test_flow_executor_backends(tmp_path: Path, backend: str, n_jobs: int) -> None:
+    d = DesignDataset(tmp_path / "db")
+    names = ["a", "b", "broken"] if backend == "thread" else ["a", "b", "broken", "slow"]
+    for name in names:
+        with d.stage_design(f"test__{name}", "test", []) as staged:
+            (staged.source_dir / f"{name}.v").write_text(f"module {name}();\nendmodule\n")
+
+    flow = FlakyLineCountFlow(d)
+    timeout_s = None if backend == "thread" else 1
+    report = flow.build_flow(n_jobs=n_jobs, backend=backend, timeout_s=timeout_s, progress=False)
+
+    statuses = {r.design_name: r.status for r in report.results}
+    assert statuses.pop("test__a") == statuses.pop("test__b") == "ok"
+    assert statuses.pop("test__broken") == "failed"
+    assert "broken design" in report.failed[0].error
+    if backend != "thread":
+        assert statuses.pop("test__slow") == "timeout"
+        assert report.timed_out[0].duration < 10  # noqa: PLR2004
+    assert statuses == {}
+    assert (flow.flow_dir("test__a") / "num_lines.txt").read_text() == "2"
+
+    # the designs that failed are retried, the others are cached
+    report = flow.build_flow(n_jobs=n_jobs, backend=backend, timeout_s=timeout_s, progress=False)
+    assert report.n_cached == 2  # noqa: PLR2004
+    assert len(report.results) == len(names) - 2
@@ -0,0 +1,70 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from digital_design_dataset.design_dataset import DesignDataset
+from digital_design_dataset.flows.flow_scheduler import (
+    FlowHistory,
+    RuntimePredictor,
+    design_cost_features,
+    simulate_makespan,
+)
+from digital_design_dataset.flows.flows import LineCountFlow
+
+
+class RecordingLineCountFlow(LineCountFlow):
+    flow_name: str = "recording_line_count"
+
+    def __init__(self, design_dataset: DesignDataset) -> None:
+        super().__init__(design_dataset)
+        self.order: list[str] = []
+
+    def build_flow_single(self, design: dict[str, Any], overwrite: bool = False) -> None:
+        self.order.append(design["design_name"])
+        if design["design_name"] == "test__z_big":
+            time.sleep(0.2)
+        super().build_flow_single(design, overwrite=overwrite)
+
+
+def test_simulate_makespan() -> None:
+    assert simulate_makespan([4, 3, 2, 1], 1) == 10  # noqa: PLR2004
+    assert simulate_makespan([4, 3, 2, 1], 2) == 5  # noqa: PLR2004
+    assert simulate_makespan([1, 1, 1, 6], 2) == 7  # noqa: PLR2004
+
+
+def test_runtime_predictor(tmp_path: Path) -> None:
+    history = FlowHistory(tmp_path / "history.json")
+    predictor = RuntimePredictor(history)
+    assert not predictor.calibrated
+
+    for i in range(1, 9):
+        features = {"n_bytes": 100 * i, "n_lines": 10 * i, "n_modules": i}
+        history.runs[f"d{i}"] = {"status": "ok", "duration": 0.5 * i, "features": features}
+    predictor = RuntimePredictor(history)
+    assert predictor.calibrated
+    small = predictor.predict("new_small", {"n_bytes": 150, "n_lines": 15, "n_modules": 1})
+    large = predictor.predict("new_large", {"n_bytes": 2000, "n_lines": 200, "n_modules": 20})
+    assert small < large
+    assert predictor.predict("d3", {"n_bytes": 0, "n_lines": 0, "n_modules": 0}) == 1.5  # noqa: PLR2004
+
+
+def test_flow_longest_first(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    for name, n_lines in [("a_small", 1), ("m_medium", 10), ("z_big", 100)]:
+        with d.stage_design(f"test__{name}", "test", []) as staged:
+            body = "".join(f"assign w{i} = 1'b0;\n" for i in range(n_lines))
+            (staged.source_dir / f"{name}.v").write_text(f"module {name}();\n{body}endmodule\n")
+    features = design_cost_features(d.design_dir("test__z_big") / "sources")
+    assert (features["n_lines"], features["n_modules"]) == (102, 1)
+
+    flow = RecordingLineCountFlow(d)
+    report = flow.build_flow(progress=False)
+    assert flow.order == ["test__z_big", "test__m_medium", "test__a_small"]
+    assert report.predicted_makespan is None
+
+    flow.order = []
+    report = flow.build_flow(overwrite=True, progress=False)
+    assert flow.order[0] == "test__z_big"
+    assert report.predicted_makespan is not None
+    assert all(r.predicted_duration is not None for r in report.results)
+    assert "predicted makespan" in str(report)
@@ -0,0 +1,14 @@
+import json
+
+import networkx as nx
+
+from digital_design_dataset.flows.flows import node_link_data
+
+
+def test_node_link_data() -> None:
+    g = nx.DiGraph()
+    g.add_edge("a", "b", weight=1)
+    data = node_link_data(g)
+    assert {n["id"] for n in data["nodes"]} == {"a", "b"}
+    assert data["edges"] == [{"source": "a", "target": "b", "weight": 1}]
+    json.dumps(data)
@@ -1,6 +1,8 @@
 from pathlib import Path
 
+from digital_design_dataset.data_sources.git_mirror_cache import GitMirrorCache
 from digital_design_dataset.data_sources.github_fast_downloader import GithubFastDownloader
+from tests.utils import make_local_repo
 
 
 def test_github_fast_downloader_simple() -> None:
@@ -87,3 +89,41 @@ def test_github_fast_downloader_context_manager() -> None:
 
     assert not temp_dir_path.exists()
     assert not repo_dir_path.exists()
+
+
+def test_github_fast_downloader_mirror_cache(tmp_path: Path) -> None:
+    make_local_repo(tmp_path / "upstream", {"a/a.v": "module a(); endmodule\n", "b/b.v": "module b(); endmodule\n"})
+    cache = GitMirrorCache(tmp_path / "cache", refresh_after_s=3600)
+
+    def checkout(paths: list[str]) -> GithubFastDownloader:
+        gfd = GithubFastDownloader("upstream", "local", mirror_cache=cache)
+        gfd.repo_url = (tmp_path / "upstream").as_uri()
+        gfd.clone_repo()
+        gfd.enable_sparse_checkout()
+        gfd.checkout_stuff(paths)
+        return gfd
+
+    gfd = checkout(["/a"])
+    assert gfd.repo_branch == "main"
+    assert (gfd.repo_dir / "a" / "a.v").exists()
+    assert not (gfd.repo_dir / "b").exists()
+    assert gfd.bytes_fetched > 0
+    gfd.cleanup()
+    assert (cache.stats.hits, cache.stats.misses) == (0, 1)
+
+    # a second checkout of the same paths is served from the mirror
+    gfd = checkout(["/a"])
+    assert (gfd.repo_dir / "a" / "a.v").exists()
+    assert gfd.bytes_fetched == 0
+    gfd.checkout_stuff(["/b"], reset=False)
+    assert (gfd.repo_dir / "b" / "b.v").exists()
+    gfd.cleanup()
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.n_fetches) == (1, 1, 0)
+
+    # a stale mirror fetches new commits
+    make_local_repo(tmp_path / "upstream", {"a/a.v": "module a(input x); endmodule\n"})
+    cache.refresh_after_s = 0
+    gfd = checkout(["/a"])
+    assert (gfd.repo_dir / "a" / "a.v").read_text() == "module a(input x); endmodule\n"
+    gfd.cleanup()
+    assert cache.stats.n_fetches == 1
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from digital_design_dataset.data_sources import github_indexer
+from digital_design_dataset.data_sources.github_indexer import GithubIndexer
+
+
+def matches_query(repo: tuple[date, int], query: str) -> bool:
+    created, size = repo
+    for qualifier in query.split()[1:]:
+        key, value = qualifier.split(":")
+        lo, hi = value.removeprefix(">=").split("..") if ".." in value else (value.removeprefix(">="), None)
+        x = created.isoformat() if key == "created" else size
+        lo, hi = (lo, hi) if key == "created" else (int(lo), int(hi) if hi is not None else None)
+        if x < lo or (hi is not None and x > hi):
+            return False
+    return True
+
+
+class MockGithubServer(ThreadingHTTPServer):
+    def __init__(self, repos: list[tuple[date, int]], result_cap: int = 1000) -> None:
+        super().__init__(("127.0.0.1", 0), MockGithubHandler)
+        # (created, size in KB) of each repo, the id is the index
+        self.repos = repos
+        self.result_cap = result_cap
+        # pages that are answered with a 429 on their first request
+        self.rate_limited_pages: set[int] = set()
+        self.requests: list[tuple[int, str | None]] = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class MockGithubHandler(BaseHTTPRequestHandler):
+    server: MockGithubServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        page = int(params["page"][0])
+        per_page = int(params["per_page"][0])
+        matches = [i for i, repo in enumerate(self.server.repos) if matches_query(repo, params["q"][0])]
+        with self.server.lock:
+            self.server.requests.append((page, self.headers.get("If-None-Match")))
+            rate_limited = page in self.server.rate_limited_pages
+            self.server.rate_limited_pages.discard(page)
+
+        if rate_limited:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        ids = matches[: self.server.result_cap][(page - 1) * per_page : page * per_page]
+        etag = f'"{hash((params["q"][0], page, len(matches))):x}"'
+        self.send_response(304 if self.headers.get("If-None-Match") == etag else 200)
+        self.send_header("ETag", etag)
+        self.send_header("X-RateLimit-Remaining", "1000")
+        self.send_header("X-RateLimit-Reset", str(int(time.time()) + 60))
+        if self.headers.get("If-None-Match") == etag:
+            self.end_headers()
+            return
+        body = json.dumps(
+            {
+                "total_count": len(matches),
+                "incomplete_results": False,
+                "items": [
+                    {"id": i, "full_name": f"owner/repo_{i}", "html_url": f"https://github.com/owner/repo_{i}"}
+                    for i in ids
+                ],
+            },
+        ).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[MockGithubServer]:
+    server = MockGithubServer([(date(2020, 1, 1), 10)] * 250)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_github_indexer_checkpoints(tmp_path: Path, server: MockGithubServer) -> None:
+    server.rate_limited_pages = {2}
+    with GithubIndexer(tmp_path / "index", api_url=server.url, backoff_s=0) as indexer:
+        repos = indexer.index_query("language:verilog")
+        assert sorted(repo["id"] for repo in repos) == list(range(250))
+        assert indexer.stats.n_rate_limited == 1
+        assert len(server.requests) == 4
+
+    # resumed from the checkpoints without any request
+    with GithubIndexer(tmp_path / "index", api_url=server.url, backoff_s=0) as indexer:
+        assert len(indexer.index_query("language:verilog")) == 250
+        assert indexer.stats.n_from_checkpoint == 3
+        assert len(server.requests) == 4
+
+        # a refresh revalidates every page with its ETag
+        assert len(indexer.index_query("language:verilog", refresh=True)) == 250
+        assert indexer.stats.n_not_modified == 3
+        assert all(etag is not None for _, etag in server.requests[4:])
+
+
+def test_github_indexer_partitions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(github_indexer, "SEARCH_RESULT_CAP", 50)
+    monkeypatch.setattr(github_indexer, "SIZE_SPLIT_KB", 8)
+    # 120 repos spread over a year, and 80 created on the same day that need
+    # to be split by size
+    repos = [(date(2015, 1, 1) + timedelta(days=3 * i), i) for i in range(120)]
+    repos += [(date(2016, 6, 1), i % 40) for i in range(80)]
+    server = MockGithubServer(repos, result_cap=50)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with GithubIndexer(tmp_path / "index", api_url=server.url, backoff_s=0) as indexer:
+            plan, repo_data = asyncio.run(
+                indexer.index_query_partitioned_async("language:verilog", date(2015, 1, 1), date(2016, 12, 31)),
+            )
+            n_first_pages = sum(page == 1 for page, _ in server.requests)
+            server.requests.clear()
+            # a refresh revalidates the first page of every slice only once
+            asyncio.run(
+                indexer.index_query_partitioned_async(
+                    "language:verilog",
+                    date(2015, 1, 1),
+                    date(2016, 12, 31),
+                    refresh=True,
+                ),
+            )
+            assert sum(page == 1 for page, _ in server.requests) == n_first_pages
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sorted(repo["id"] for repo in repo_data) == list(range(200))
+    assert plan.total_count == 200
+    assert plan.n_truncated == 0
+    assert all(count <= 50 for _, count in plan.slices)
+    assert any("size:" in query for query, _ in plan.slices)
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Any
+
+from digital_design_dataset.data_sources.github_fast_downloader import GithubFastDownloader
+from digital_design_dataset.data_sources.github_repos import GithubReposDatasetRetriever, flat_source_names
+from digital_design_dataset.design_dataset import DesignDataset
+from tests.utils import make_local_repo
+
+
+def test_flat_source_names() -> None:
+    assert flat_source_names(["rtl/top.v", "rtl/defs.vh", "tb/top.v"]) == {
+        "rtl/top.v": "rtl__top.v",
+        "rtl/defs.vh": "defs.vh",
+        "tb/top.v": "tb__top.v",
+    }
+
+
+def test_github_repos_retriever(tmp_path: Path) -> None:
+    files = {"rtl/core.v": "module core(); endmodule\n", "rtl/defs.vh": "`define W 8\n", "README.md": "core\n"}
+    make_local_repo(tmp_path / "alice" / "core", files)
+    # a fork with the same files has the same root tree
+    make_local_repo(tmp_path / "bob" / "core", files)
+    make_local_repo(tmp_path / "carol" / "docs", {"README.md": "no hardware here\n"})
+
+    def repo(full_name: str) -> dict:
+        return {"full_name": full_name, "clone_url": (tmp_path / full_name).as_uri()}
+
+    repos = [repo("alice/core"), repo("bob/core"), repo("carol/docs"), repo("dave/deleted")]
+    d = DesignDataset(tmp_path / "db")
+    r = GithubReposDatasetRetriever(d, repos, n_workers=1)
+    r.get_dataset()
+
+    stats = r.fetch_stats
+    assert (stats.n_repos, stats.n_fetched, stats.n_duplicates, stats.n_without_sources, stats.n_failed) == (
+        4,
+        2,
+        1,
+        1,
+        1,
+    )
+    assert r.duplicate_of == {"github__bob__core": "github__alice__core"}
+    assert stats.bytes_saved > 0
+    sources = sorted(fp.name for fp in d.get_design_source_files("github__alice__core"))
+    assert sources == ["core.v", "defs.vh"]
+    assert not d.design_dir("github__bob__core").exists()
+    assert not d.design_dir("github__carol__docs").exists()
+
+    # a later run keeps the design of the first repo with each tree, even if
+    # the fork is fetched first
+    r = GithubReposDatasetRetriever(d, [repos[1], repos[0]], n_workers=2)
+    r.get_dataset()
+    assert r.duplicate_of == {"github__bob__core": "github__alice__core"}
+    assert (r.stats.n_designs_built, r.stats.n_designs_skipped) == (0, 1)
+
+
+class FailingFirstRepoRetriever(GithubReposDatasetRetriever):
+    def fetch_sources(self, gfd: GithubFastDownloader, design_name: str, *args: Any, **kwargs: Any) -> None:
+        if design_name == "github__alice__core":
+            raise ValueError("empty repo")
+        super().fetch_sources(gfd, design_name, *args, **kwargs)
+
+
+def test_github_repos_failed_first_repo_releases_tree(tmp_path: Path) -> None:
+    files = {"rtl/core.v": "module core(); endmodule\n"}
+    make_local_repo(tmp_path / "alice" / "core", files)
+    make_local_repo(tmp_path / "bob" / "core", files)
+    repos = [{"full_name": name, "clone_url": (tmp_path / name).as_uri()} for name in ["alice/core", "bob/core"]]
+
+    d = DesignDataset(tmp_path / "db")
+    r = FailingFirstRepoRetriever(d, repos, n_workers=1)
+    r.get_dataset()
+    assert r.fetch_stats.n_failed == 1
+    assert r.duplicate_of == {}
+    assert [design["design_name"] for design in d.index] == ["github__bob__core"]
@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+
+# generous enough for a slow CI machine, but well below the cost of
+# importing any of the heavy optional dependencies
+IMPORT_TIME_BUDGET_S = 0.25
+
+HEAVY_MODULES = ["github", "pandas", "networkx", "py7zr", "jinja2", "joblib", "tqdm"]
+
+IMPORT_SCRIPT = f"""
+import json
+import sys
+import time
+
+t_start = time.perf_counter()
+import digital_design_dataset.design_dataset
+elapsed = time.perf_counter() - t_start
+
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def run_import_script() -> dict:
+    p = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(p.stdout)
+
+
+def test_design_dataset_import_is_light() -> None:
+    result = run_import_script()
+    assert result["heavy"] == []
+
+
+def test_design_dataset_import_time() -> None:
+    # best of a few runs to filter out a cold disk cache
+    elapsed = min(run_import_script()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_TIME_BUDGET_S, f"import took {elapsed:.3f}s, budget is {IMPORT_TIME_BUDGET_S}s"
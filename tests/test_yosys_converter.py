@@ -0,0 +1,33 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from digital_design_dataset.data_sources.yosys_converter import YosysBatchConverter, YosysJob
+
+yosys_bin = shutil.which("yosys")
+
+BLIF_AND = """.model and2
+.inputs a b
+.outputs y
+.names a b y
+11 1
+.end
+"""
+
+
+@pytest.mark.skipif(yosys_bin is None, reason="yosys not found in PATH")
+def test_yosys_batch_isolates_failures(tmp_path: Path) -> None:
+    jobs = []
+    for name in ["good_0", "broken", "good_1"]:
+        blif_fp = tmp_path / f"{name}.blif"
+        blif_fp.write_text(BLIF_AND if name != "broken" else ".model broken\n.names a\n.bogus\n")
+        verilog_fp = tmp_path / f"{name}.v"
+        script = f"read_blif -sop {blif_fp}\ntechmap t:$sop\nwrite_verilog {verilog_fp}"
+        jobs.append(YosysJob(name, script, [verilog_fp]))
+
+    results = YosysBatchConverter(yosys_bin, n_workers=1).run(jobs)
+    assert [r.job.name for r in results] == ["good_0", "broken", "good_1"]
+    assert [r.ok for r in results] == [True, False, True]
+    assert "ERROR" in results[1].error
+    assert "module and2" in (tmp_path / "good_1.v").read_text()
@@ -0,0 +1,60 @@
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from digital_design_dataset.design_dataset import DesignDataset
+from digital_design_dataset.flows.flows import YosysAIGFlow, YosysFrontendFlow
+from digital_design_dataset.flows.yosys_frontend import read_design_script
+
+yosys_bin = shutil.which("yosys")
+
+
+def test_read_design_script(tmp_path: Path) -> None:
+    sources = [tmp_path / "a.v", tmp_path / "b.v"]
+    script = read_design_script(sources)
+    assert script.count("read_verilog") == 2  # noqa: PLR2004
+    assert script.endswith("hierarchy -check -auto-top;\n")
+
+    script = read_design_script(sources, tmp_path / "design__pre.rtlil")
+    assert "read_verilog" not in script
+    assert script.startswith(f"read_rtlil {(tmp_path / 'design__pre.rtlil').resolve()};\n")
+
+
+class RecordingFrontendFlow(YosysFrontendFlow):
+    def __init__(self, design_dataset: DesignDataset) -> None:
+        super().__init__(design_dataset)
+        self.overwrites: list[bool] = []
+
+    def build_flow_single(self, design: dict[str, Any], overwrite: bool = False) -> None:
+        self.overwrites.append(overwrite)
+
+
+def test_frontend_rtlil_overwrite(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    d.build_design_scaffolding("and2", "test", "test", [])
+    design = d.index[0]
+
+    flow = RecordingFrontendFlow(d)
+    assert flow.frontend_rtlil(design) == flow.flow_dir("test__and2") / "design__pre.rtlil"
+    flow.frontend_rtlil(design, overwrite=True)
+    assert flow.overwrites == [False, True]
+
+
+@pytest.mark.skipif(yosys_bin is None, reason="yosys not found in PATH")
+def test_yosys_frontend_shared(tmp_path: Path) -> None:
+    d = DesignDataset(tmp_path / "db")
+    with d.stage_design("test__and2", "test", []) as staged:
+        (staged.source_dir / "and2.v").write_text("module and2(input a, b, output y);\nassign y = a & b;\nendmodule\n")
+
+    flow = YosysAIGFlow(d)
+    flow.build_flow(progress=False)
+    frontend_dir = flow.frontend_flow.flow_dir("test__and2")
+    assert (frontend_dir / "design__pre.rtlil").exists()
+    assert (flow.flow_dir("test__and2") / "aig_verilog.v").exists()
+    assert not (flow.flow_dir("test__and2") / "design__pre.rtlil").exists()
+
+    # the next synthesis flow reads the same elaborated design
+    flow.frontend_flow.designs_to_build()
+    assert flow.frontend_flow.cache_stats.hits == 1
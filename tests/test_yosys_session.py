@@ -0,0 +1,43 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from digital_design_dataset.flows.yosys_session import which_yosys, yosys_session
+
+yosys_bin = shutil.which("yosys")
+
+
+def test_which_yosys_missing() -> None:
+    with pytest.raises(FileNotFoundError):
+        which_yosys("yosys-does-not-exist")
+
+
+@pytest.mark.skipif(yosys_bin is None, reason="yosys not found in PATH")
+def test_yosys_session_reuse(tmp_path: Path) -> None:
+    good_fp = tmp_path / "good.v"
+    good_fp.write_text("module good(input a, output y);\nassign y = ~a;\nendmodule\n")
+    bad_fp = tmp_path / "bad.v"
+    bad_fp.write_text("module bad(\n")
+
+    session = yosys_session()
+    assert yosys_session() is session
+
+    ls_fp = tmp_path / "ls.txt"
+    session.run(f"read_verilog {good_fp}\ntee -o {ls_fp} ls\n")
+    assert "good" in ls_fp.read_text()
+
+    # the design is reset between scripts
+    session.run(f"tee -o {ls_fp} ls\n")
+    assert "good" not in ls_fp.read_text()
+
+    with pytest.raises(RuntimeError):
+        session.run("hierarchy -top missing\n")
+    with pytest.raises(RuntimeError):
+        session.run(f"read_verilog {bad_fp}\n")
+
+    session.run(f"read_verilog {good_fp}\ntee -o {ls_fp} ls\n")
+    assert "good" in ls_fp.read_text()
+    assert session.n_runs == 5  # noqa: PLR2004
+    # a new process only after the syntax error ended the previous one
+    assert session.n_starts <= 2  # noqa: PLR2004
@@ -1,3 +1,4 @@
+import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -46,3 +47,20 @@ def load_common_test_env_vars(env_fp: Path) -> tuple[str | None, Path, int]:
         raise ValueError("N_JOBS must be greater than 0")
 
     return (gh_token, test_path, n_jobs)
+
+
+def make_local_repo(repo_dir: Path, files: dict[str, str]) -> None:
+    repo_dir.mkdir(parents=True, exist_ok=True)
+
+    def git(*args: str) -> None:
+        subprocess.run(["git", "-C", str(repo_dir), *args], check=True, capture_output=True)
+
+    if not (repo_dir / ".git").exists():
+        git("init", "-b", "main")
+        git("config", "uploadpack.allowFilter", "true")
+        git("config", "uploadpack.allowAnySHA1InWant", "true")
+    for rel_path, text in files.items():
+        (repo_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (repo_dir / rel_path).write_text(text)
+    git("add", ".")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-m", "update")